@@ -0,0 +1,38 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# Compares an element-wise loop over a List with the same operation on an Array.
+# Run from the repository root: python -m benchmarks.bench_array
+from time import perf_counter
+from src.cobralang import lexer, parser
+from src.cobralang.interpreter.interpreter import Context
+from src.cobralang.interpreter.datatypes import List, Array, Integer
+
+LIST_SIZE = 10 ** 4
+ARRAY_SIZE = 10 ** 6
+
+LIST_LOOP = """
+let i = 0
+while i < len(values) {
+    values[i] = values[i] * 2 + 1
+    i += 1
+}
+"""
+ARRAY_OPS = "values = values * 2 + 1"
+
+
+def parse(text: str):
+    return parser.Parser(lexer.Lexer(text, "<bench>").tokenize(), "<bench>").parse()
+
+
+def bench(label: str, values, code: str):
+    ctx = Context()
+    ctx.scopes[0].variables["values"] = values
+    program = parse(code)
+    start = perf_counter()
+    program.run(ctx)
+    elapsed = perf_counter() - start
+    print(f"{label:>6}: {len(values):>8} elements in {elapsed * 1000:10.2f} ms ({elapsed / len(values) * 1e9:10.1f} ns/element)")
+
+
+if __name__ == "__main__":
+    bench("List", List([Integer(i) for i in range(LIST_SIZE)]), LIST_LOOP)
+    bench("Array", Array(range(ARRAY_SIZE)), ARRAY_OPS)
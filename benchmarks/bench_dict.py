@@ -0,0 +1,45 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# Lookup-heavy Dict workload (a word counter) and the memory used per entry.
+# Run from the repository root: python -m benchmarks.bench_dict
+import tracemalloc
+from time import perf_counter
+from src.cobralang import lexer, parser
+from src.cobralang.interpreter.interpreter import Context
+from src.cobralang.interpreter.datatypes import Dict, List, Integer, String
+
+WORDS = 20_000
+ENTRIES = 100_000
+
+COUNTER = """
+let counts = {}
+for w in words {
+    if w in counts {
+        counts[w] += 1
+    } else {
+        counts[w] = 1
+    }
+}
+len(counts)
+"""
+
+
+def parse(text: str):
+    return parser.Parser(lexer.Lexer(text, "<bench>").tokenize(), "<bench>").parse()
+
+
+if __name__ == "__main__":
+    ctx = Context()
+    ctx.scopes[0].variables["words"] = List([String(f"word{i % 1000}") for i in range(WORDS)])
+    program = parse(COUNTER)
+    start = perf_counter()
+    program.run(ctx)
+    elapsed = perf_counter() - start
+    print(f"counter: {WORDS} words in {elapsed * 1000:.1f} ms ({WORDS / elapsed:,.0f} words/s)")
+
+    tracemalloc.start()
+    table = Dict({})
+    for i in range(ENTRIES):
+        table[Integer(i)] = Integer(i)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"memory: {size / ENTRIES:.0f} bytes/entry over {ENTRIES} Integer: Integer entries")
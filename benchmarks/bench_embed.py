@@ -0,0 +1,37 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# Per request cost of an embedded script: lexing and parsing it for every request, and running a compiled program.
+# Run from the repository root: python -m benchmarks.bench_embed
+from time import perf_counter
+from src.cobralang import lexer, parser
+from src.cobralang.api import Interpreter
+
+SOURCE = """
+fn score(order) {
+    let total = 0
+    for item in order {
+        total += item * rate
+    }
+    return total
+}
+score(order)
+"""
+REQUESTS = 2000
+
+
+def bench(label: str, handle):
+    start = perf_counter()
+    for i in range(REQUESTS):
+        result = handle({"order": [i, 2, 3], "rate": 2})
+    elapsed = perf_counter() - start
+    print(f"{label:>10}: {elapsed / REQUESTS * 1e6:10.2f} us/request -> {result}")
+
+
+def reparse(variables: dict):
+    ctx = Interpreter().context(variables)
+    return parser.Parser(lexer.Lexer(SOURCE, "<bench>").tokenize(), "<bench>").parse().run(ctx)
+
+
+if __name__ == "__main__":
+    program = Interpreter().compile(SOURCE)
+    bench("reparse", reparse)
+    bench("compiled", lambda variables: program.run(variables=variables))
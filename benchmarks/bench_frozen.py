@@ -0,0 +1,30 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# Importing the utils module from its source and from the frozen standard library bundle.
+# Run from the repository root: python -m benchmarks.bench_frozen
+from time import perf_counter
+from src.cobralang import lexer, parser, frozen
+
+REPEAT = 200
+
+
+def bench(label: str, load):
+    start = perf_counter()
+    for _ in range(REPEAT):
+        parser.parsed_modules.clear()
+        load()
+    elapsed = perf_counter() - start
+    print(f"{label:>8}: {elapsed / REPEAT * 1e6:10.2f} us/import")
+
+
+def from_source():
+    original = frozen.frozen_program
+    frozen.frozen_program = lambda name: None
+    try:
+        parser.Parser(lexer.Lexer("import utils", "<bench>").tokenize(), "<bench>").parse()
+    finally:
+        frozen.frozen_program = original
+
+
+if __name__ == "__main__":
+    bench("source", from_source)
+    bench("frozen", lambda: parser.Parser(lexer.Lexer("import utils", "<bench>").tokenize(), "<bench>").parse())
@@ -0,0 +1,66 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# Peak memory of a three stage pipeline built from generators against the same pipeline building a list per stage.
+# Run from the repository root: python -m benchmarks.bench_generator
+import tracemalloc
+from time import perf_counter
+from src.cobralang import lexer, parser
+from src.cobralang.interpreter.interpreter import Context
+
+N = 200_000
+
+GENERATORS = """
+fn evens(source) {
+    for x in source {
+        if x % 2 == 0 {
+            yield x
+        }
+    }
+}
+fn squares(source) {
+    for x in source {
+        yield x * x
+    }
+}
+sum(squares(evens(range(n))))
+"""
+LISTS = """
+fn evens(source) {
+    let out = []
+    for x in source {
+        if x % 2 == 0 {
+            append(out, x)
+        }
+    }
+    return out
+}
+fn squares(source) {
+    let out = []
+    for x in source {
+        append(out, x * x)
+    }
+    return out
+}
+sum(squares(evens(list(range(n)))))
+"""
+
+
+def parse(text: str):
+    return parser.Parser(lexer.Lexer(text, "<bench>").tokenize(), "<bench>").parse()
+
+
+def bench(label: str, text: str):
+    ctx = Context()
+    parse(f"let n = {N}").run(ctx)
+    program = parse(text)
+    tracemalloc.start()
+    start = perf_counter()
+    result = program.run(ctx)
+    elapsed = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>10}: peak {peak / 1024:10.1f} KiB, {elapsed * 1000:8.1f} ms -> {result}")
+
+
+if __name__ == "__main__":
+    bench("generators", GENERATORS)
+    bench("lists", LISTS)
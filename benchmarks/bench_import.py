@@ -0,0 +1,43 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# Importing one small helper from a module with an expensive initializer, selectively and by importing everything.
+# Run from the repository root: python -m benchmarks.bench_import
+import os
+import tempfile
+from time import perf_counter
+from src.cobralang import lexer, parser
+from src.cobralang.interpreter.interpreter import Context
+
+MODULE = """
+let table = [x * x for x in range(200000)]
+fn lookup(i) {
+    return table[i]
+}
+fn add(a, b) {
+    return a + b
+}
+"""
+
+
+def parse(text: str):
+    return parser.Parser(lexer.Lexer(text, "<bench>").tokenize(), "<bench>").parse()
+
+
+def bench(label: str, text: str):
+    program = parse(text)
+    start = perf_counter()
+    result = program.run(Context())
+    elapsed = perf_counter() - start
+    print(f"{label:>12}: {elapsed * 1000:8.2f} ms -> {result}")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            with open("library.cb", "w") as file:
+                file.write(MODULE)
+            bench("from import", "from library import fn add\nadd(1, 2)")
+            bench("import", "import library\nadd(1, 2)")
+        finally:
+            os.chdir(cwd)
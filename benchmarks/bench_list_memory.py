@@ -0,0 +1,22 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# Measures the memory used by a large numeric List, compact versus boxed storage.
+# Run from the repository root: python -m benchmarks.bench_list_memory
+import tracemalloc
+from src.cobralang.interpreter.datatypes import List, Integer, String
+
+SIZE = 10 ** 6
+
+
+def measure(label: str, build):
+    tracemalloc.start()
+    value = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>8}: {size / 2 ** 20:8.2f} MiB for {len(value)} elements")
+    return value
+
+
+if __name__ == "__main__":
+    measure("compact", lambda: List([Integer(i) for i in range(SIZE)]))
+    # a single foreign element forces the boxed representation
+    measure("boxed", lambda: List([Integer(i) for i in range(SIZE)] + [String("")]))
@@ -0,0 +1,36 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# Compares the native math module with the interpreted math.cb it replaced.
+# Run from the repository root: python -m benchmarks.bench_math
+from pathlib import Path
+from time import perf_counter
+from src.cobralang import lexer, parser
+from src.cobralang.interpreter.interpreter import Context
+
+MATH_CB = Path(__file__).parent.parent.joinpath("src", "cobralang", "interpreter", "builtins", "math.cb")
+CALLS = ("sqrt(2.0)", "ln(5.0)", "log(8.0, 2.0)", "sin(1.0)", "cos(1.0)", "tan(1.0)", "asin(0.5)", "acos(0.5)", "atan(0.5)")
+REPEAT = 200
+
+
+def parse(text: str):
+    return parser.Parser(lexer.Lexer(text, "<bench>").tokenize(), "<bench>").parse()
+
+
+def bench(label: str, import_program, repeat: int = REPEAT):
+    ctx = Context()
+    start = perf_counter()
+    import_program.run(ctx)
+    import_time = perf_counter() - start
+    print(f"{label:>8} import: {import_time * 1000:10.3f} ms")
+    for call in CALLS:
+        program = parse(call)
+        start = perf_counter()
+        for _ in range(repeat):
+            result = program.run(ctx)
+        elapsed = perf_counter() - start
+        print(f"{label:>8} {call:<14} {elapsed / repeat * 1e6:10.2f} us/call  -> {result}")
+
+
+if __name__ == "__main__":
+    with open(MATH_CB) as file:
+        bench("math.cb", parse(file.read()))
+    bench("native", parse("import math"))
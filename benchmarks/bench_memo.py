@@ -0,0 +1,34 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# Recursive fibonacci without caching, with @cache and with --auto-memo.
+# Run from the repository root: python -m benchmarks.bench_memo
+from time import perf_counter
+from src.cobralang import lexer, parser
+from src.cobralang.interpreter.interpreter import Context
+
+N = 20
+
+FIB = """
+fn fib(n) {
+    if n <= 1 {
+        return n
+    }
+    return fib(n - 1) + fib(n - 2)
+}
+"""
+
+
+def parse(text: str, auto_memo: bool=False):
+    return parser.Parser(lexer.Lexer(text, "<bench>").tokenize(), "<bench>", auto_memo=auto_memo).parse()
+
+
+def bench(label: str, program):
+    start = perf_counter()
+    result = program.run(Context())
+    elapsed = perf_counter() - start
+    print(f"{label:>10}: {elapsed * 1000:10.2f} ms -> {result}")
+
+
+if __name__ == "__main__":
+    bench("plain", parse(FIB + f"fib({N})"))
+    bench("@cache", parse("@cache" + FIB + f"fib({N})"))
+    bench("auto-memo", parse(FIB + f"fib({N})", auto_memo=True))
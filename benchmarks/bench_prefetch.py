@@ -0,0 +1,46 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# Parsing a program with a wide import tree, one module at a time and with the concurrent import prefetch.
+# Run from the repository root: python -m benchmarks.bench_prefetch
+import os
+import tempfile
+from time import perf_counter
+from src.cobralang import lexer, parser
+
+WIDTH = 4
+DEPTH = 3
+BODY = "".join(f"fn f{i}(a, b) {{\n    let c = [a * x + b for x in range(10)]\n    return sum(c) + {i}\n}}\n" for i in range(20))
+
+
+def write_tree(prefix: str="m", depth: int=DEPTH) -> list[str]:
+    # each module imports WIDTH children, DEPTH levels deep
+    names = [f"{prefix}{i}" for i in range(WIDTH)]
+    for name in names:
+        children = write_tree(name + "_", depth - 1) if depth > 1 else []
+        with open(f"{name}.cb", "w") as file:
+            file.write("".join(f"import {child}\n" for child in children) + BODY)
+    return names
+
+
+def bench(label: str, text: str, prefetch):
+    parser.parsed_modules.clear()
+    original = parser.prefetch_modules
+    parser.prefetch_modules = prefetch
+    try:
+        start = perf_counter()
+        parser.Parser(lexer.Lexer(text, "<bench>").tokenize(), "<bench>").parse()
+        elapsed = perf_counter() - start
+    finally:
+        parser.prefetch_modules = original
+    print(f"{label:>10}: {elapsed * 1000:8.2f} ms for {len(parser.parsed_modules)} modules")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            text = "".join(f"import {name}\n" for name in write_tree())
+            bench("serial", text, lambda *args, **kwargs: None)
+            bench("prefetch", text, parser.prefetch_modules)
+        finally:
+            os.chdir(cwd)
@@ -0,0 +1,33 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# Loops whose bodies declare nothing (scope elided) and declare a variable (scope taken from the pool).
+# Run from the repository root: python -m benchmarks.bench_scope
+import tracemalloc
+from time import perf_counter
+from src.cobralang import lexer, parser
+from src.cobralang.interpreter.interpreter import Context
+
+N = 200_000
+
+VARIANTS = {
+    "no declarations": "let i = 0\nlet t = 0\nwhile i < n {\n    if i % 2 == 0 {\n        t += i\n    }\n    i += 1\n}\nt",
+    "let in body": "let i = 0\nlet t = 0\nwhile i < n {\n    let j = i % 2\n    t += j\n    i += 1\n}\nt",
+}
+
+
+def parse(text: str):
+    return parser.Parser(lexer.Lexer(text, "<bench>").tokenize(), "<bench>").parse()
+
+
+if __name__ == "__main__":
+    for label, text in VARIANTS.items():
+        ctx = Context()
+        parse(f"let n = {N}").run(ctx)
+        program = parse(text)
+        start = perf_counter()
+        result = program.run(ctx)
+        elapsed = perf_counter() - start
+        tracemalloc.start()
+        program.run(ctx)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:>15}: {elapsed * 1000:8.1f} ms, peak {peak / 1024:8.1f} KiB -> {result}")
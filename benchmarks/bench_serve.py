@@ -0,0 +1,39 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# Per job cost of a small script: starting the runner for every job, and submitting it to a running server.
+# Run from the repository root: python -m benchmarks.bench_serve
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from time import perf_counter
+from src.cobralang import serve
+
+SOURCE = "let xs = [i * i for i in range(10)]\nsum(xs)"
+ROOT = Path(__file__).parent.parent
+
+
+def bench(label: str, submit, jobs: int):
+    submit()
+    start = perf_counter()
+    for _ in range(jobs):
+        result = submit()
+    elapsed = perf_counter() - start
+    print(f"{label:>10}: {elapsed / jobs * 1e6:10.2f} us/job -> {result}")
+
+
+def spawn():
+    return subprocess.run([sys.executable, str(ROOT.joinpath("src", "cobralang.py")), "-c", SOURCE], capture_output=True, text=True,
+                          env={**os.environ, "PYTHONPATH": str(ROOT)}, check=True).stdout.strip()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        server = serve.Server(Path(directory, "cobra.sock"), workers=1)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        bench("spawn", spawn, 20)
+        with serve.Client(server.path) as client:
+            bench("submit", lambda: client.submit(SOURCE)["result"], 2000)
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,43 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# Starting a small script on top of a heavy prelude: running the prelude every time, and forking a snapshot of it.
+# Run from the repository root: python -m benchmarks.bench_snapshot
+from time import perf_counter
+from src.cobralang.api import Interpreter
+
+PRELUDE = """
+import math
+import utils
+let rates = {}
+for i in range(2000) {
+    rates[i] = i * 0.01
+}
+let codes = [i * 7 % 1000 for i in range(5000)]
+fn price(item, qty) {
+    return rates[item] * qty
+}
+"""
+SCRIPT = "price(42, 3) + floor(2.5)"
+REPEAT = 200
+
+
+def bench(label: str, start_context):
+    program = interpreter.compile(SCRIPT)
+    start = perf_counter()
+    for _ in range(REPEAT):
+        result = program.run(start_context())
+    elapsed = perf_counter() - start
+    print(f"{label:>10}: {elapsed / REPEAT * 1e6:10.2f} us/run -> {result}")
+
+
+def with_prelude():
+    ctx = interpreter.context()
+    prelude.run(ctx)
+    return ctx
+
+
+if __name__ == "__main__":
+    interpreter = Interpreter()
+    prelude = interpreter.compile(PRELUDE)
+    snapshot = with_prelude().snapshot()
+    bench("prelude", with_prelude)
+    bench("fork", snapshot.fork)
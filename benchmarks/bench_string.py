@@ -0,0 +1,46 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# Builds a large string piece by piece with += and with a string builder.
+# Run from the repository root: python -m benchmarks.bench_string
+from time import perf_counter
+from src.cobralang import lexer, parser
+from src.cobralang.interpreter.interpreter import Context
+
+CONCAT = """
+let s = ""
+let i = 0
+while i < count {
+    s += piece
+    i += 1
+}
+len(s)
+"""
+BUILDER = """
+let b = string_builder()
+let i = 0
+while i < count {
+    append(b, piece)
+    i += 1
+}
+len(build(b))
+"""
+
+
+def parse(text: str):
+    return parser.Parser(lexer.Lexer(text, "<bench>").tokenize(), "<bench>").parse()
+
+
+def bench(label: str, code: str, count: int, piece: str):
+    ctx = Context()
+    parse(f"let count = {count}\nlet piece = \"{piece}\"").run(ctx)
+    program = parse(code)
+    start = perf_counter()
+    size = program.run(ctx).value
+    elapsed = perf_counter() - start
+    print(f"{label:>8}: {size / 2 ** 20:6.2f} MiB in {elapsed:8.3f} s ({elapsed / count * 1e6:6.2f} us/piece)")
+
+
+if __name__ == "__main__":
+    piece = "x" * 99 + "\\n"
+    for count in (25_000, 50_000, 100_000):
+        bench("+=", CONCAT, count, piece)
+        bench("builder", BUILDER, count, piece)
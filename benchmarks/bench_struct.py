@@ -0,0 +1,60 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# Memory per record and field access speed of struct records against the equivalent Dicts.
+# Run from the repository root: python -m benchmarks.bench_struct
+import tracemalloc
+from time import perf_counter
+from src.cobralang import lexer, parser
+from src.cobralang.interpreter.interpreter import Context
+from src.cobralang.interpreter.datatypes import List, Integer
+
+RECORDS = 20_000
+
+STRUCT = """
+struct Point { x, y, z }
+let points = []
+for i in numbers {
+    append(points, Point(i, i, i))
+}
+"""
+DICT = """
+let points = []
+for i in numbers {
+    append(points, {"x": i, "y": i, "z": i})
+}
+"""
+STRUCT_SUM = """
+let total = 0
+for p in points {
+    total += p.x + p.y + p.z
+}
+"""
+DICT_SUM = """
+let total = 0
+for p in points {
+    total += p["x"] + p["y"] + p["z"]
+}
+"""
+
+
+def parse(text: str):
+    return parser.Parser(lexer.Lexer(text, "<bench>").tokenize(), "<bench>").parse()
+
+
+def bench(label: str, build: str, access: str):
+    ctx = Context()
+    ctx.scopes[0].variables["numbers"] = List([Integer(i) for i in range(RECORDS)])
+    program = parse(build)
+    tracemalloc.start()
+    program.run(ctx)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    program = parse(access)
+    start = perf_counter()
+    program.run(ctx)
+    elapsed = perf_counter() - start
+    print(f"{label:>6}: {size / RECORDS:6.0f} bytes/record, {RECORDS * 3 / elapsed:12,.0f} field reads/s")
+
+
+if __name__ == "__main__":
+    bench("struct", STRUCT, STRUCT_SUM)
+    bench("dict", DICT, DICT_SUM)
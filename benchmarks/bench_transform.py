@@ -0,0 +1,48 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+# A map/filter transform written as a hand-written loop, with the native map and filter builtins and as a comprehension.
+# Run from the repository root: python -m benchmarks.bench_transform
+from time import perf_counter
+from src.cobralang import lexer, parser
+from src.cobralang.interpreter.interpreter import Context
+
+N = 50_000
+
+SETUP = """
+fn keep(x) {
+    return x % 3 != 0
+}
+fn square(x) {
+    return x * x
+}
+"""
+VARIANTS = {
+    "loop": """
+let out = []
+let i = 0
+while i < n {
+    if i % 3 != 0 {
+        append(out, i * i)
+    }
+    i += 1
+}
+len(out)
+""",
+    "builtins": "len(map(square, filter(keep, range(n))))",
+    "comprehension": "len([i * i for i in range(n) if i % 3 != 0])",
+}
+
+
+def parse(text: str):
+    return parser.Parser(lexer.Lexer(text, "<bench>").tokenize(), "<bench>").parse()
+
+
+if __name__ == "__main__":
+    for label, text in VARIANTS.items():
+        ctx = Context()
+        parse(f"let n = {N}").run(ctx)
+        parse(SETUP).run(ctx)
+        program = parse(text)
+        start = perf_counter()
+        result = program.run(ctx)
+        elapsed = perf_counter() - start
+        print(f"{label:>13}: {elapsed * 1000:8.1f} ms -> {result}")
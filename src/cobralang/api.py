@@ -0,0 +1,191 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+"""
+Embedding Cobra in Python.
+
+An Interpreter compiles source once into a CompiledProgram, which can then be run any number of times, each run only
+executing the already parsed and optimized tree. Python values and callables can be injected as globals, and results
+come back as Python values:
+
+    interpreter = Interpreter(functions={"double": lambda x: x * 2})
+    program = interpreter.compile("fn area(r) {\n    return 3 * r * r\n}\ndouble(area(radius))")
+    program.run(variables={"radius": 2})  # 24
+
+The same program can be evaluated over many records at once, results are streamed back in order:
+
+    program.run_batch([{"radius": 1}, {"radius": 2}])  # 6, 24
+    program.run_batch(columns={"radius": range(100000)})
+
+A script that calls exit() ends its run, not the host: the run raises ScriptExit with the code the script gave.
+
+    try:
+        interpreter.run("exit(3)")
+    except ScriptExit as e:
+        e.code  # 3
+"""
+import pickle
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+from . import lexer, parser
+from .interpreter.interpreter import Context
+from .interpreter.nodes import Function, Program
+from .interpreter.datatypes import Value, Generator
+from .interpreter.builtins.builtins import auto_cast, auto_cast_param, register_auto
+from .interpreter.memo import LRUCache
+
+
+def to_python(value: Value):
+    # the Python value of a result, values with no Python counterpart (functions, structs, ...) are returned as is
+    if isinstance(value, Generator):
+        return [to_python(i) for i in value]
+    try:
+        return auto_cast_param(value)
+    except Exception:
+        return value
+
+
+class ScriptExit(Exception):
+    def __init__(self, code):
+        super().__init__(f"The script exited with code {code}")
+        self.code = code
+
+
+def execute(program: Program, ctx: Context) -> Value:
+    # exit() raises SystemExit to end the cobra process, an embedded run turns it into ScriptExit
+    try:
+        return program.run(ctx)
+    except SystemExit as e:
+        raise ScriptExit(e.code) from None
+
+
+def to_function(name: str, function: Callable | Function) -> Function:
+    if isinstance(function, Function):
+        return function
+    registry = {}
+    register_auto(function, registry)
+    out, = registry.values()
+    out.name = name
+    return out
+
+
+class CompiledProgram:
+    # A parsed and optimized program, running it never lexes or parses again
+    def __init__(self, interpreter: "Interpreter", program: Program, filename: str):
+        self.interpreter = interpreter
+        self.program = program
+        self.filename = filename
+
+    def __repr__(self):
+        return f"CompiledProgram({self.filename})"
+
+    def run(self, ctx: Context=None, variables: dict=None, functions: dict=None, raw: bool=False):
+        # runs in a fresh context unless one is given, raw returns the Cobra value instead of converting it
+        if ctx is None:
+            ctx = self.interpreter.context(variables, functions)
+        else:
+            self.interpreter.bind(ctx, variables, functions)
+        out = execute(self.program, ctx)
+        return out if raw else to_python(out)
+
+    def run_batch(self, records: Iterable[dict]=None, columns: dict[str, Iterable]=None, workers: int=1, chunksize: int=512) -> Iterator:
+        # Runs the program once for every record (a dict of variables), or for every row of columns (variable name ->
+        # values), and yields the results in order as they are produced. With more than one worker, chunks of records
+        # are run in worker processes, which needs the program and the injected values and functions to pickle.
+        if columns is not None:
+            records = (dict(zip(columns, row)) for row in zip(*columns.values()))
+        if workers <= 1:
+            return map(Batch(self).run, records)
+        return self.run_parallel(iter(records), workers, chunksize)
+
+    def run_parallel(self, records: Iterator[dict], workers: int, chunksize: int) -> Iterator:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(workers, initializer=start_worker, initargs=(pickle.dumps(self),)) as pool:
+            # only a few chunks are in flight at a time, so records can come from a stream of any length
+            pending = deque()
+            while True:
+                while len(pending) < 2 * workers:
+                    chunk = list(islice(records, chunksize))
+                    if not chunk:
+                        break
+                    pending.append(pool.submit(run_chunk, chunk))
+                if not pending:
+                    return
+                yield from pending.popleft().result()
+
+
+class Batch:
+    # The prepared context (the injected values and functions) is snapshotted once and every record runs in a fork of
+    # it, which is cheaper than building a new context and leaves nothing of one record to the next: values it changes,
+    # globals it sets and the namespaces of the modules it imports all stay in its own fork.
+    def __init__(self, program: CompiledProgram):
+        self.program = program.program
+        self.snapshot = program.interpreter.context().snapshot()
+
+    def run(self, record: dict):
+        ctx = self.snapshot.fork()
+        for name, value in record.items():
+            ctx.scopes[0].variables[name] = auto_cast(value)
+        return to_python(execute(self.program, ctx))
+
+
+# the batch run by this worker process (see CompiledProgram.run_parallel)
+worker_batch = None
+
+
+def start_worker(program: bytes):
+    global worker_batch
+    worker_batch = Batch(pickle.loads(program))
+
+
+def run_chunk(records: list[dict]) -> list:
+    return [worker_batch.run(record) for record in records]
+
+
+class Interpreter:
+    # variables and functions are injected into every context the interpreter makes
+    def __init__(self, variables: dict=None, functions: dict=None, auto_memo: bool=False, cache_size: int=128):
+        self.variables = dict(variables) if variables is not None else {}
+        # as given, to pickle the interpreter (see __reduce__)
+        self.python_functions = dict(functions) if functions is not None else {}
+        self.functions = {name: to_function(name, function) for name, function in self.python_functions.items()}
+        self.auto_memo = auto_memo
+        # programs compiled by run(), by source
+        self.compiled = LRUCache(cache_size)
+
+    def __repr__(self):
+        return f"Interpreter({list(self.variables)}, {list(self.functions)})"
+
+    def __reduce__(self):
+        # wrapped Python functions don't pickle, the interpreter is rebuilt from what it was given
+        return Interpreter, (self.variables, self.python_functions, self.auto_memo, self.compiled.maxsize)
+
+    def compile(self, source: str, filename: str="<string>") -> CompiledProgram:
+        tokens = lexer.Lexer(source, filename=filename).tokenize()
+        return CompiledProgram(self, parser.Parser(tokens, filename=filename, auto_memo=self.auto_memo).parse(), filename)
+
+    def compile_file(self, path: str | Path) -> CompiledProgram:
+        path = Path(path)
+        if path.suffix == ".cbz":
+            from . import bundle
+            return CompiledProgram(self, bundle.load(path), f"<{path.name}>")
+        with open(path, "r") as f:
+            return self.compile(f.read(), f"<{path.name}>")
+
+    def context(self, variables: dict=None, functions: dict=None) -> Context:
+        ctx = Context()
+        # converted for each context, so a run that mutates a list doesn't change it for the next one
+        self.bind(ctx, self.variables, self.functions)
+        return self.bind(ctx, variables, functions)
+
+    def bind(self, ctx: Context, variables: dict=None, functions: dict=None) -> Context:
+        ctx.scopes[0].variables.update({name: auto_cast(value) for name, value in (variables or {}).items()})
+        ctx.scopes[0].functions.update({name: to_function(name, function) for name, function in (functions or {}).items()})
+        return ctx
+
+    def run(self, source: str, ctx: Context=None, variables: dict=None, functions: dict=None, raw: bool=False):
+        program = self.compiled.get(source)
+        if program is None:
+            program = self.compile(source)
+            self.compiled.put(source, program)
+        return program.run(ctx, variables, functions, raw)
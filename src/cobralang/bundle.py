@@ -0,0 +1,124 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+"""
+Single file program bundles (.cbz).
+
+A bundle is a zip archive holding the parsed and optimized program of an entry script and of every module it
+imports, each pickled into a member of its own, and a manifest.json naming the entry point. Modules are referenced
+between members instead of being copied into every program that imports them, and standard library modules are taken
+from the frozen bundle (see frozen) at load time. Running a bundle parses no source at all:
+
+    cobra bundle entry.cb -o app.cbz
+    cobra app.cbz
+"""
+import io
+import json
+import pickle
+from pathlib import Path
+from zipfile import ZipFile, ZIP_DEFLATED
+from . import lexer, frozen, optimizer
+from .parser import Parser
+from .optimizer import walk
+from .interpreter import nodes
+from .interpreter.builtins import all_builtins
+
+
+format_version = 1
+entry_member = "entry.pickle"
+
+
+class Pickler(pickle.Pickler):
+    # module programs other than the one being pickled are written as references to their member
+    def __init__(self, file, root: nodes.Program, members: dict[int, str]):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.root = root
+        self.members = members
+
+    def persistent_id(self, obj):
+        if obj is not self.root and isinstance(obj, nodes.Program):
+            return self.members.get(id(obj))
+        return None
+
+
+class Unpickler(frozen.Unpickler):
+    def __init__(self, file, load_member):
+        super().__init__(file)
+        self.load_member = load_member
+
+    def persistent_load(self, member: str):
+        return self.load_member(member)
+
+
+def stdlib_name(node: nodes.Import) -> str | None:
+    # the name of the frozen standard library module an import refers to, None for a file module
+    source = all_builtins.get(node.name)
+    if isinstance(source, Path) and node.filename == str(source.absolute()) and node.name in frozen.load_stdlib():
+        return node.name
+    return None
+
+
+def module_imports(program: nodes.Program) -> tuple[dict[int, str], dict[str, nodes.Import]]:
+    # every module program reachable from program: id -> member name, and member name -> the import that parsed it
+    members, imports = {}, {}
+
+    def collect(program: nodes.Program):
+        for node in walk(program, into_functions=True):
+            if not isinstance(node, nodes.Import) or not isinstance(node.program, nodes.Program) or id(node.program) in members:
+                continue
+            name = stdlib_name(node)
+            if name is not None:
+                members[id(node.program)] = f"stdlib:{name}"
+                continue
+            stem = Path(node.filename).stem
+            member, count = f"modules/{stem}.pickle", 1
+            while member in imports:
+                count += 1
+                member = f"modules/{stem}_{count}.pickle"
+            members[id(node.program)] = member
+            imports[member] = node
+            collect(node.program)
+
+    collect(program)
+    return members, imports
+
+
+def build(entry: Path, output: Path, auto_memo: bool=False) -> dict:
+    # imports are resolved the way the runner resolves them, relative to the working directory
+    entry = Path(entry)
+    with open(entry, "r") as f:
+        code = f.read()
+    filename = f"<{entry.name}>"
+    program = Parser(lexer.Lexer(code, filename=filename).tokenize(), filename=filename, auto_memo=auto_memo).parse()
+    members, imports = module_imports(program)
+    manifest = {
+        "format": format_version,
+        "entry": entry_member,
+        "source": entry.name,
+        "auto_memo": auto_memo,
+        "modules": {member: Path(node.filename).name for member, node in imports.items()},
+    }
+    with ZipFile(output, "w", ZIP_DEFLATED) as archive:
+        for member, module in [(entry_member, program), *((member, node.program) for member, node in imports.items())]:
+            data = io.BytesIO()
+            Pickler(data, module, members).dump(module)
+            archive.writestr(member, data.getvalue())
+        archive.writestr("manifest.json", json.dumps(manifest, indent=4))
+    return manifest
+
+
+def load(path: Path) -> nodes.Program:
+    with ZipFile(path, "r") as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+        if manifest.get("format") != format_version:
+            raise ValueError(f"{path} is a version {manifest.get('format')} bundle, this interpreter reads version {format_version}")
+        loaded = {}
+
+        def load_member(member: str) -> nodes.Program:
+            if member not in loaded:
+                if member.startswith("stdlib:"):
+                    program = frozen.frozen_program(member.removeprefix("stdlib:"))
+                    loaded[member] = optimizer.memoize_pure_functions(program) if manifest["auto_memo"] else program
+                else:
+                    loaded[member] = Unpickler(io.BytesIO(archive.read(member)), load_member).load()
+            return loaded[member]
+
+        return load_member(manifest["entry"])
@@ -0,0 +1,262 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+"""
+The command line runner behind src/cobralang.py:
+
+    cobra [file.cb | app.cbz]   run a script or a bundle
+    cobra -c "print(1)"         run the given code
+    cobra bundle entry.cb       build a bundle (see bundle)
+    cobra serve                 start a script execution server (see serve)
+    cobra submit [file.cb]      run a script on the server, -c to run the given code
+    cobra                       start the repl
+
+Importing this module does nothing by itself, main() does the work. What only some commands need (bundles, the memo
+store, the repl) is imported by those commands, so starting the interpreter stays cheap. TestStartup in
+tests/test_cli.py holds `cobra -c` to a startup time budget over Python's own startup.
+"""
+import logging
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from . import lexer, parser
+from .interpreter.interpreter import Context
+
+
+log_levels = {
+    'NONE': 51,
+    'CRITICAL': 50,
+    'ERROR': 40,
+    'WARNING': 30,
+    'INFO': 20,
+    'DEBUG': 10,
+}
+
+
+def build_argparser() -> ArgumentParser:
+    argparser = ArgumentParser(
+        prog="CobraLang Interpreter",
+        description="A simple interpreter for the CobraLang programming language.",
+    )
+    argparser.add_argument('filepath', nargs="?", default=None, help="The path to the file (or .cbz bundle) to be interpreted. Run 'bundle <file>' to build a bundle.", type=str)
+    argparser.add_argument('-c', dest="code", default=None, help="Run the given code instead of a file.", type=str)
+    argparser.add_argument('--logging_level', default="NONE", help="The logging level to use. Defaults to NONE (no logs).", choices=log_levels.keys(), type=str)
+    argparser.add_argument('--auto-memo', action="store_true", help="Cache the results of functions found to have no side effects.")
+    argparser.add_argument('--clear-memo', action="store_true", help="Remove every result stored by @persist functions.")
+    argparser.add_argument('--logging_path', default=None, help="The path to the log file. Leave unspecified to log to console.", type=str)
+    return argparser
+
+
+def build_bundle_argparser() -> ArgumentParser:
+    argparser = ArgumentParser(
+        prog="cobra bundle",
+        description="Parse a program and every module it imports into a single file bundle that runs without parsing.",
+    )
+    argparser.add_argument('filepath', help="The path to the entry script.", type=str)
+    argparser.add_argument('-o', '--output', default=None, help="The bundle to write. Defaults to the entry script with a .cbz extension.", type=str)
+    argparser.add_argument('--auto-memo', action="store_true", help="Cache the results of functions found to have no side effects.")
+    return argparser
+
+
+def build_serve_argparser() -> ArgumentParser:
+    argparser = ArgumentParser(
+        prog="cobra serve",
+        description="Run scripts submitted over a Unix socket in a pool of warm worker processes.",
+    )
+    argparser.add_argument('--socket', default=None, help="The socket to listen on. Defaults to cobra-<uid>.sock in the temporary directory.", type=str)
+    argparser.add_argument('--workers', default=None, help="The number of worker processes. Defaults to the number of CPUs.", type=int)
+    argparser.add_argument('--timeout', default=None, help="The timeout in seconds of jobs that don't give their own. Defaults to none.", type=float)
+    argparser.add_argument('--auto-memo', action="store_true", help="Cache the results of functions found to have no side effects.")
+    return argparser
+
+
+def build_submit_argparser() -> ArgumentParser:
+    argparser = ArgumentParser(
+        prog="cobra submit",
+        description="Run a script on a server started with 'cobra serve', with its output and errors printed here.",
+    )
+    argparser.add_argument('filepath', nargs="?", default=None, help="The path to the file (or .cbz bundle) to be run.", type=str)
+    argparser.add_argument('-c', dest="code", default=None, help="Run the given code instead of a file.", type=str)
+    argparser.add_argument('--socket', default=None, help="The socket of the server. Defaults to cobra-<uid>.sock in the temporary directory.", type=str)
+    argparser.add_argument('--timeout', default=None, help="The timeout in seconds of this job. Defaults to the server's.", type=float)
+    return argparser
+
+
+def configure_logging(level: str, path: str=None) -> logging.Logger:
+    log = logging.getLogger("CobraLang")
+    log.setLevel(log_levels[level])
+    if log.handlers:
+        return log
+    formatter = logging.Formatter("%(asctime)s [%(name)s] %(levelname)s: %(message)s")
+    if path is None:
+        handler = logging.StreamHandler()
+    else:
+        logging_path = Path(path).absolute()
+        if not logging_path.parent.is_dir():
+            raise FileNotFoundError(f"Logging path not found: {logging_path}")
+        handler = logging.FileHandler(logging_path)
+    handler.setFormatter(formatter)
+    log.addHandler(handler)
+    return log
+
+
+def compile_source(code: str, filename: str, log: logging.Logger, auto_memo: bool=False):
+    tokens = lexer.Lexer(code, filename=filename, logger=log, logging_level=log.getEffectiveLevel()).tokenize()
+    return parser.Parser(tokens, filename=filename, logger=log, logging_level=log.getEffectiveLevel(), auto_memo=auto_memo).parse()
+
+
+def run_program(program, log: logging.Logger):
+    try:
+        output = program.run(Context())
+        if output is not None:
+            print(output)
+    except Exception as e:
+        log.exception(e)
+        raise e
+
+
+def bundle_main(argv: list[str]) -> int:
+    from . import bundle
+    args = build_bundle_argparser().parse_args(argv)
+    output = Path(args.output) if args.output is not None else Path(args.filepath).with_suffix(".cbz")
+    manifest = bundle.build(Path(args.filepath), output, auto_memo=args.auto_memo)
+    print(f"Bundled {manifest['source']} and {len(manifest['modules'])} module(s) into {output}")
+    return 0
+
+
+def serve_main(argv: list[str]) -> int:
+    import signal
+    from . import serve
+    args = build_serve_argparser().parse_args(argv)
+    # stopped like Ctrl+C, so the workers and the socket file are cleaned up
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    with serve.Server(args.socket or serve.default_socket, args.workers, args.timeout, args.auto_memo) as server:
+        print(f"Serving on {server.path} with {server.pool.size} worker(s), press Ctrl+C to stop")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def submit_main(argv: list[str]) -> int:
+    from . import serve
+    argparser = build_submit_argparser()
+    args = argparser.parse_args(argv)
+    if (args.code is None) == (args.filepath is None):
+        argparser.error("give either a file or -c code")
+    path = args.socket or serve.default_socket
+    try:
+        client = serve.Client(path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"No server is listening on {path}, start one with 'cobra serve'", file=sys.stderr)
+        return 1
+    with client:
+        result = client.submit(source=args.code, path=args.filepath, timeout=args.timeout)
+    sys.stdout.write(result["stdout"])
+    sys.stderr.write(result["stderr"])
+    if result["result"] is not None:
+        print(result["result"])
+    if result["error"] is not None:
+        print(result["error"], file=sys.stderr)
+        return 1
+    # the code the script gave to exit(), if it called it
+    return result["exit_code"] or 0
+
+
+def repl(log: logging.Logger, auto_memo: bool=False):
+    from time import sleep, perf_counter
+    from .interpreter.nodes import Null
+    from .interpreter.builtins.builtins import info_function
+
+    def count_token(token_type: lexer.TokenKind, token_list: list[lexer.Token]) -> int:
+        return sum([1 for token in token_list if token.kind == token_type])
+
+    log.info("Entering repl mode...")
+    context = Context()
+    info_function()
+    while True:
+        try:
+            sleep(0.1)
+            code = input(">>> ")
+            if code == "":
+                continue
+            tmp = lexer.Lexer(code).tokenize()
+            while (count_token(lexer.TokenKind.LeftParen, tmp) > count_token(lexer.TokenKind.RightParen, tmp))\
+                    or (count_token(lexer.TokenKind.LeftBracket, tmp) > count_token(lexer.TokenKind.RightBracket, tmp))\
+                    or (count_token(lexer.TokenKind.LeftBrace, tmp) > count_token(lexer.TokenKind.RightBrace, tmp)):
+                new = input("... ")
+                code += "\n" + new
+                if new == "":
+                    break
+                tmp = lexer.Lexer(code).tokenize()
+            program = compile_source(code, "<stdin>", log, auto_memo)
+            sleep(0.1)
+            log.debug("Running program...")
+            start = perf_counter()
+            try:
+                output = program.run(context)
+            except KeyboardInterrupt as e:
+                print("KeyboardInterrupt")
+                continue
+            end = perf_counter()
+            if end - start > 0.2:
+                print(f"Program ran in {end - start:.2f}s")
+            if output is not None and not isinstance(output, Null):
+                print(output)
+        except Exception as e:
+            log.exception(e)
+            sleep(0.1)
+            print(e)
+
+
+def main(argv: list[str]=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["bundle"]:
+        return bundle_main(argv[1:])
+    if argv[:1] == ["serve"]:
+        return serve_main(argv[1:])
+    if argv[:1] == ["submit"]:
+        return submit_main(argv[1:])
+    args = build_argparser().parse_args(argv)
+    log = configure_logging(args.logging_level, args.logging_path)
+
+    if log.getEffectiveLevel() <= 10:
+        log.debug(f"Debug mode enabled. Note that this will not show what the interpreter is doing, only what the parser/lexer is doing.")
+
+    log.info("CobraLang runner started successfully")
+    log.debug(f"{args!r}")
+
+    if args.clear_memo:
+        from .interpreter.memo import persistent_store
+        persistent_store.clear()
+        log.info(f"Cleared persistent memo cache at {persistent_store.path}")
+        if args.filepath is None and args.code is None:
+            return 0
+
+    if args.code is not None:
+        run_program(compile_source(args.code, "<string>", log, args.auto_memo), log)
+    elif args.filepath is not None:
+        log.info("File specified, attempting to open...")
+        filepath = Path(args.filepath).absolute()
+
+        if not filepath.is_file():
+            log.error(f"File not found: {filepath}")
+            raise FileNotFoundError(f"File not found: {filepath}")
+
+        if filepath.suffix == ".cbz":
+            from . import bundle
+            log.info("Bundle specified, loading its precompiled program...")
+            program = bundle.load(filepath)
+        else:
+            with open(filepath, 'r') as file:
+                code = file.read()
+            log.info("File opened successfully, attempting to parse...")
+            try:
+                program = compile_source(code, f"<{filepath.name}>", log, args.auto_memo)
+            except Exception as e:
+                log.exception(e)
+                raise e
+        log.info("File parsed successfully, attempting to run...")
+        run_program(program, log)
+    else:
+        repl(log, args.auto_memo)
+    return 0
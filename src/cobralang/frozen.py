@@ -0,0 +1,98 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+"""
+Precompiled (pickled) Cobra programs.
+
+The standard library modules written in Cobra are frozen into stdlib.frozen, next to their sources, so importing one
+costs an unpickle instead of locating, reading, lexing and parsing the file. A module whose source no longer matches
+the digest frozen with it is parsed from the source instead, rebuild the bundle after changing one of them to get it
+frozen again, from the repository root:
+
+    python -m src.cobralang.frozen
+"""
+import hashlib
+import io
+import pickle
+from pathlib import Path
+from .interpreter.builtins import all_builtins
+
+
+format_version = 1
+stdlib_bundle_path = Path(__file__).parent.joinpath("interpreter", "builtins", "stdlib.frozen")
+# the package the pickled classes are loaded from: "cobralang" under the runner, "src.cobralang" when imported from
+# the repository root, whichever one did the freezing
+package = __package__
+
+
+class Unpickler(pickle.Unpickler):
+    def find_class(self, module: str, name: str):
+        head, found, tail = module.partition("cobralang.")
+        if found and head in ("", "src."):
+            module = f"{package}.{tail}"
+        return super().find_class(module, name)
+
+
+def dumps(program) -> bytes:
+    return pickle.dumps(program, pickle.HIGHEST_PROTOCOL)
+
+
+def loads(data: bytes):
+    return Unpickler(io.BytesIO(data)).load()
+
+
+def source_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def is_current(name: str, digest: str) -> bool:
+    # whether a frozen module was built from its source as it is now, a module shipped without its source is trusted
+    source = all_builtins.get(name)
+    if not isinstance(source, Path):
+        return False
+    try:
+        return source_digest(source) == digest
+    except OSError:
+        return True
+
+
+# name -> (sha256 of the source, pickled program) of the modules that are up to date, read on first use
+stdlib_modules = None
+
+
+def load_stdlib() -> dict[str, tuple[str, bytes]]:
+    global stdlib_modules
+    if stdlib_modules is None:
+        try:
+            with open(stdlib_bundle_path, "rb") as f:
+                bundle = pickle.load(f)
+            modules = bundle["modules"] if bundle["version"] == format_version else {}
+            stdlib_modules = {name: entry for name, entry in modules.items() if is_current(name, entry[0])}
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+            # without a usable bundle the modules are parsed from source
+            stdlib_modules = {}
+    return stdlib_modules
+
+
+def frozen_program(name: str):
+    # a fresh copy of the frozen program of a standard library module, None if it isn't frozen
+    entry = load_stdlib().get(name)
+    return loads(entry[1]) if entry is not None else None
+
+
+def freeze(path: Path=stdlib_bundle_path) -> dict[str, tuple[str, bytes]]:
+    from . import lexer, optimizer
+    from .parser import Parser
+    modules = {}
+    for name, source in all_builtins.items():
+        if isinstance(source, Path):
+            with open(source, "r") as f:
+                code = f.read()
+            program = Parser(lexer.Lexer(code, filename=f"<{source.name}>").tokenize(), filename=f"<{source.name}>").parse()
+            modules[name] = (source_digest(source), dumps(optimizer.index_dependencies(program)))
+    with open(path, "wb") as f:
+        pickle.dump({"version": format_version, "modules": modules}, f, pickle.HIGHEST_PROTOCOL)
+    return modules
+
+
+if __name__ == "__main__":
+    for module in freeze():
+        print(f"Froze {module} into {stdlib_bundle_path}")
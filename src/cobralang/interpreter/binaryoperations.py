@@ -1,5 +1,11 @@
 # This code is licensed under the MIT License (see LICENSE file for details)
 from .interpreter import Context, Node
+from .datatypes import Boolean, native_key
+import operator
+
+
+def contains(a, b):
+    return Boolean(a in b)
 
 
 class BinaryOp(Node):
@@ -18,79 +24,105 @@ class BinaryOp(Node):
 
 class And(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, "and", lambda a, b: a and b)
+        super().__init__(left, right, "and")
+
+    def run(self, ctx: Context):
+        # the right side is only evaluated when the left one doesn't decide the result
+        left = self.left.run(ctx)
+        return self.right.run(ctx) if left else left
 
 
 class Or(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, "or", lambda a, b: a or b)
+        super().__init__(left, right, "or")
+
+    def run(self, ctx: Context):
+        left = self.left.run(ctx)
+        return left if left else self.right.run(ctx)
 
 
 class GreaterThan(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, ">", lambda a, b: a > b)
+        super().__init__(left, right, ">", operator.gt)
 
 
 class GreaterThanOrEqual(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, ">=", lambda a, b: a >= b)
+        super().__init__(left, right, ">=", operator.ge)
 
 
 class LessThan(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, "<", lambda a, b: a < b)
+        super().__init__(left, right, "<", operator.lt)
 
 
 class LessThanOrEqual(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, "<=", lambda a, b: a <= b)
+        super().__init__(left, right, "<=", operator.le)
 
 
 class Equals(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, "==", lambda a, b: a == b)
+        super().__init__(left, right, "==", operator.eq)
 
 
 class NotEquals(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, "!=", lambda a, b: a != b)
+        super().__init__(left, right, "!=", operator.ne)
 
 
 class Add(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, "+", lambda a, b: a + b)
+        super().__init__(left, right, "+", operator.add)
 
 
 class Subtract(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, "-", lambda a, b: a - b)
+        super().__init__(left, right, "-", operator.sub)
 
 
 class Multiply(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, "*", lambda a, b: a * b)
+        super().__init__(left, right, "*", operator.mul)
 
 
 class Power(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, "**", lambda a, b: a ** b)
+        super().__init__(left, right, "**", operator.pow)
 
 
 class Divide(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, "/", lambda a, b: a / b)
+        super().__init__(left, right, "/", operator.truediv)
 
 
 class FloorDivide(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, "//", lambda a, b: a // b)
+        super().__init__(left, right, "//", operator.floordiv)
 
 
 class Modulo(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, "%", lambda a, b: a % b)
+        super().__init__(left, right, "%", operator.mod)
 
 
 class In(BinaryOp):
     def __init__(self, left: Node, right: Node):
-        super().__init__(left, right, "in", lambda a, b: a in b)
+        super().__init__(left, right, "in", contains)
+
+
+class InConstantSet(Node):
+    # x in [literal, ...], with the literals hashed once ahead of time (see optimizer.fold_constant_membership)
+    def __init__(self, left: Node, right: Node, keys: frozenset):
+        self.left = left
+        self.right = right
+        self.keys = keys
+
+    def __repr__(self):
+        return f"{self.left} in {self.right}"
+
+    def run(self, ctx: Context):
+        try:
+            return Boolean(native_key(self.left.run(ctx)) in self.keys)
+        except TypeError:
+            return Boolean(False)
@@ -1,8 +1,9 @@
 # This code is licensed under the MIT License (see LICENSE file for details)
 from .builtins import std_functions
+from .mathmodule import math_module
 from pathlib import Path
 path = str(Path(__file__).parent.parent.parent.parent.parent.absolute())
 all_builtins = {
-    "math":Path(path+"/src/cobralang/interpreter/builtins/math.cb"),
+    "math":math_module,
     "utils":Path(path+"/src/cobralang/interpreter/builtins/utils.cb"),
 }
@@ -4,7 +4,6 @@ from typing import Callable
 from ..datatypes import *
 import inspect
 from time import time
-from random import randint
 from pathlib import Path
 from src import __version__, __author__, __repo__, __license__
 
@@ -28,9 +27,9 @@ class BuiltInStatementBlock(StatementBlock):
         return out
 
 
-def register_function(name: str, args: list[str]=None, varargs: str | None=None, kwargs=None, varkwargs: str | None=None):
+def register_function(name: str, args: list[str]=None, varargs: str | None=None, kwargs=None, varkwargs: str | None=None, registry: dict=None):
     def inner(func: Callable):
-        std_functions[name] = Function(name, args, varargs, kwargs, varkwargs, BuiltInStatementBlock(func))
+        (std_functions if registry is None else registry)[name] = Function(name, args, varargs, kwargs, varkwargs, BuiltInStatementBlock(func))
         return func
     if args is None:
         args = []
@@ -39,13 +38,15 @@ def register_function(name: str, args: list[str]=None, varargs: str | None=None,
     return inner
 
 
-def register_auto(func: Callable):
+def register_auto(func: Callable, registry: dict=None):
     name = func.__name__.replace("_function", "")
     args = inspect.signature(func)
     pos_args = []
     var_args = None
     kwargs = {}
     var_kwargs = None
+    # parameters annotated with a Value type are passed through as-is instead of being converted to Python values
+    raw_args = {arg.name for arg in args.parameters.values() if isinstance(arg.annotation, type) and issubclass(arg.annotation, Value | Function)}
     for arg in args.parameters.values():
         if arg.kind == inspect.Parameter.POSITIONAL_OR_KEYWORD:
             if arg.default == inspect.Parameter.empty:
@@ -67,14 +68,14 @@ def register_auto(func: Callable):
         if len(tuple(args.parameters))>0 and tuple(args.parameters.keys())[0] == "ctx":
             _args.append(ctx)
         for _arg in pos_args:
-            _args.append(get_arg(ctx, _arg))
+            _args.append(get_arg(ctx, _arg, _arg not in raw_args))
         if var_args is not None:
             try:
-                _args.extend(get_arg(ctx, var_args))
+                _args.extend(get_arg(ctx, var_args, var_args not in raw_args))
             except KeyError:
                 pass
         for _arg in kwargs:
-            _kwargs[_arg] = get_arg(ctx, _arg)
+            _kwargs[_arg] = get_arg(ctx, _arg, _arg not in raw_args)
         if var_kwargs is not None:
             try:
                 _kwargs.update(get_arg(ctx, var_kwargs))
@@ -83,7 +84,7 @@ def register_auto(func: Callable):
         out = auto_cast(func(*_args, **_kwargs))
         return out
     wrapper.__doc__ = func.__doc__
-    register_function(name, pos_args, var_args, kwargs, var_kwargs)(wrapper)
+    register_function(name, pos_args, var_args, kwargs, var_kwargs, registry)(wrapper)
     return func
 
 
@@ -100,7 +101,7 @@ def type_of(item):
         case Tuple():
             return "Tuple(" + ", ".join([type_of(v) for v in item]) + ")"
         case Dict():
-            return "Dict(" + ", ".join([type_of(k) + ": " + type_of(v) for k, v in item.value.items()]) + ")"
+            return "Dict(" + ", ".join([type_of(k) + ": " + type_of(v) for k, v in item.items()]) + ")"
         case _:
             return item.__class__.__name__.__repr__() + "(" + str(item) + ")"
 
@@ -109,24 +110,41 @@ def get_arg(ctx: Context, name: str, value_of=True):
     return auto_cast_param(ctx[name]) if value_of else ctx[name]
 
 
+def call(ctx: Context, function: Function, *args: Value) -> Value:
+    # calls back into a Cobra (or builtin) function from a native loop
+    if not isinstance(function, Function):
+        raise Exception(f"{type_of(function)} is not a function")
+    out = function.run(ctx, list(args), {})
+    return Null() if out is None else out
+
+
 def auto_cast(value):
     match value:
+        case bool():
+            return Boolean(value)
         case int():
             return Integer(value)
         case float():
             return Float(value)
         case str():
             return String(value)
-        case bool():
-            return Boolean(value)
         case list():
             return List([auto_cast(x) for x in value])
         case dict():
             return Dict({auto_cast(k): auto_cast(v) for k, v in value.items()})
         case tuple():
             return Tuple(tuple(auto_cast(x) for x in value))
+        case set() | frozenset():
+            return Set(set(value))
+        case range():
+            return Range(value)
+        case complex():
+            # complex results (e.g. sqrt(-1)) are carried by Float, the same way the ** operator does
+            return Float(value)
         case x if x is None:
             return Null()
+        case Value():
+            return value
         case x if isinstance(x, Node):
             return value
         case _:
@@ -144,11 +162,22 @@ def auto_cast_param(value):
         case Boolean():
             return bool(value.value)
         case List():
-            return [auto_cast_param(x.value) for x in value]
+            return [auto_cast_param(x) for x in value]
         case Tuple():
-            return tuple(auto_cast_param(x.value) for x in value)
+            return tuple(auto_cast_param(x) for x in value)
         case Dict():
-            return {auto_cast_param(k.value): auto_cast_param(v.value) for k, v in value.value.items()}
+            return {auto_cast_param(k): auto_cast_param(v) for k, v in value.items()}
+        case Array():
+            return value.value
+        case Set():
+            return set(value.value)
+        case Range():
+            return value.value
+        case Generator():
+            # converted lazily, so builtins that consume an iterable stream the generator
+            return map(auto_cast_param, value)
+        case Record():
+            return {name: auto_cast_param(v) for name, v in zip(value.type.fields, value.values)}
         case Null():
             return None
         case _:
@@ -169,14 +198,15 @@ def print_function(*args, sep=" ", end="\n", flush=True):
 
 
 @register_auto
-def exit_function(code=0):
+def exit_function(*args, code=0):
     """
-    Exit the program.
+    Exit the program, exit(), exit(code) or exit(code=code).
 
     code: The exit code.
     """
-    # exit(code=0)
-    exit(code)
+    if len(args) > 1:
+        raise Exception(f"exit expected at most 1 argument, got {len(args)}")
+    exit(args[0] if args else code)
 
 
 @register_auto
@@ -196,7 +226,7 @@ def dump_function(ctx: Context, only_current=False, show_vars=True, show_funcs=T
             print(" " * space_count + "Variables: [\n" + "".join([f"{' ' * space_count}\t{name}={value}\n" for name, value in scope.variables.items()]) + " " * space_count + "]")
         if show_funcs:
             funcs = []
-            for name, value in scope.functions.items():
+            for name, value in ({**ctx.builtins, **scope.functions} if scope is ctx.scopes[0] else scope.functions).items():
                 if isinstance(value.body, BuiltInStatementBlock) and not show_builtins:
                     continue
                 func = f"{name}({', '.join(value.posargs) or '_'}, {value.varargs or '_'}, {','.join([f'{k}={v!r}' for k, v in value.kwargs.items()]) or '_'}, {value.varkwargs or '_'})"
@@ -290,7 +320,7 @@ def get_functions_function(ctx: Context):
     """
     Get all functions in the current context.
     """
-    functions = {}
+    functions = dict(ctx.builtins)
     for scope in ctx.scopes:
         for name, value in scope.functions.items():
             functions[name] = value
@@ -330,7 +360,7 @@ def input_function(prompt=""):
 
 
 @register_auto
-def insert_function(iterable, index, value):
+def insert_function(iterable: Value, index, value: Value):
     """
     Insert a value into a list.
 
@@ -342,18 +372,49 @@ def insert_function(iterable, index, value):
 
 
 @register_auto
-def append_function(iterable, value):
+def append_function(iterable: Value, value: Value):
     """
-    Append a value to a list.
+    Append a value to a list, set or string builder.
 
-    iterable: The list to append to.
+    iterable: The list, set or string builder to append to.
     value: The value to append.
     """
     iterable.append(value)
 
 
 @register_auto
-def pop_function(iterable, index):
+def remove_function(iterable: Value, value: Value):
+    """
+    Remove a value from a set.
+
+    iterable: The set to remove from.
+    value: The value to remove.
+    """
+    iterable.remove(value)
+
+
+@register_auto
+def string_builder_function(value=""):
+    """
+    Create a string builder, add pieces to it with append() and get the result with build().
+
+    value: The initial contents.
+    """
+    return StringBuilder(value)
+
+
+@register_auto
+def build_function(builder: Value):
+    """
+    Get the string built by a string builder.
+
+    builder: The string builder.
+    """
+    return builder.build()
+
+
+@register_auto
+def pop_function(iterable: Value, index):
     """
     Pop a value from a list.
 
@@ -372,7 +433,14 @@ def type_function(ctx, value, recursive=False):
     """
     # type(value)
     value = get_arg(ctx, "value", value_of=False)
-    return value.__class__.__name__ if not recursive else type_of(value)
+    if recursive:
+        return type_of(value)
+    if isinstance(value, ListView | TupleView | StringView):
+        # slices are views internally, but have the type of the value they were sliced from
+        return value.__class__.__base__.__name__
+    if isinstance(value, Record):
+        return value.type.name
+    return value.__class__.__name__
 
 
 @register_auto
@@ -415,13 +483,28 @@ def bool_function(value):
     return Boolean(bool(value))
 
 
+@register_auto
 def list_function(value):
     """
     Convert a value to a list.
 
     value: The value to convert.
     """
-    return List(list(value))
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return list(value)
+
+
+@register_auto
+def range_function(*args):
+    """
+    Create a lazy range of integers, range(stop), range(start, stop) or range(start, stop, step).
+
+    args: The start, stop and step of the range.
+    """
+    if not 1 <= len(args) <= 3:
+        raise Exception(f"range expected 1 to 3 arguments, got {len(args)}")
+    return range(*args)
 
 
 @register_auto
@@ -431,11 +514,23 @@ def tuple_function(value):
 
     value: The value to convert.
     """
-    return Tuple(tuple(value))
+    return tuple(value)
 
 
 @register_auto
-def len_function(value):
+def set_function(*iterable):
+    """
+    Create a set, empty or from the elements of an iterable.
+
+    iterable: The iterable to take the elements from.
+    """
+    if len(iterable) > 1:
+        raise Exception(f"set expected at most 1 argument, got {len(iterable)}")
+    return set(iterable[0]) if iterable else set()
+
+
+@register_auto
+def len_function(value: Value):
     """
     Get the length of a value.
 
@@ -445,6 +540,212 @@ def len_function(value):
     return Integer(len(value))
 
 
+@register_auto
+def next_function(generator: Generator):
+    """
+    Run a generator up to its next yield and get the yielded value.
+
+    generator: The generator to resume.
+    """
+    try:
+        return next(generator)
+    except StopIteration:
+        raise Exception("Generator is exhausted") from None
+
+
+@register_auto
+def reload_function(ctx: Context, name):
+    """
+    Run an imported module again and bind its names in the current scope. Imports run a module only once, this
+    is for the rare case that needs it to run again.
+
+    name: The name the module was imported by.
+    """
+    modules = [module for module in ctx.modules.values() if module.name == name]
+    if not modules:
+        raise Exception(f"Module {name} has not been imported")
+    for module in modules:
+        module.reset()
+        module.load(ctx)
+        ctx.scopes[-2].functions.update(module.namespace.functions)
+        ctx.scopes[-2].variables.update(module.namespace.variables)
+
+
+@register_auto
+def cache_clear_function(ctx: Context, function: Function):
+    """
+    Empty the cache of a function marked with @cache (or cached by --auto-memo) and reset its statistics.
+
+    function: The cached function.
+    """
+    if getattr(function, "memo", None) is None:
+        raise Exception(f"{getattr(function, 'name', function)} is not a cached function")
+    # a @persist function that hasn't run yet still has results on disk to remove
+    function.prepare_memo(ctx)
+    function.memo.clear()
+
+
+@register_auto
+def cache_info_function(function: Function):
+    """
+    Get the hits, misses, evictions, size and maxsize of a cached function's cache.
+
+    function: The cached function.
+    """
+    if getattr(function, "memo", None) is None:
+        raise Exception(f"{getattr(function, 'name', function)} is not a cached function")
+    return function.memo.info()
+
+
+@register_auto
+def array_function(value, dtype=None):
+    """
+    Convert a list or tuple of numbers to an array, which supports element-wise operators. Requires numpy.
+
+    value: The value to convert.
+    dtype: The numpy element type to use, for example "int64" or "float64".
+    """
+    return Array(value, dtype)
+
+
+@register_auto
+def sum_function(iterable):
+    """
+    Get the sum of an array or any iterable of numbers.
+
+    iterable: The numbers to sum.
+    """
+    if hasattr(iterable, "tolist"):
+        return iterable.sum().item()
+    return sum(iterable)
+
+
+@register_auto
+def min_function(ctx, iterable, key: Function=None):
+    """
+    Get the smallest element of an array or any iterable.
+
+    iterable: The elements to compare.
+    key: A function that gets the value to compare from an element.
+    """
+    if hasattr(iterable, "tolist"):
+        if not isinstance(key, Function):
+            return iterable.min().item()
+        iterable = iterable.tolist()
+    if isinstance(key, Function):
+        return min(iterable, key=lambda x: auto_cast_param(call(ctx, key, auto_cast(x))))
+    return min(iterable)
+
+
+@register_auto
+def max_function(ctx, iterable, key: Function=None):
+    """
+    Get the largest element of an array or any iterable.
+
+    iterable: The elements to compare.
+    key: A function that gets the value to compare from an element.
+    """
+    if hasattr(iterable, "tolist"):
+        if not isinstance(key, Function):
+            return iterable.max().item()
+        iterable = iterable.tolist()
+    if isinstance(key, Function):
+        return max(iterable, key=lambda x: auto_cast_param(call(ctx, key, auto_cast(x))))
+    return max(iterable)
+
+
+@register_auto
+def mean_function(iterable):
+    """
+    Get the arithmetic mean of an array or any iterable of numbers.
+
+    iterable: The numbers to average.
+    """
+    if hasattr(iterable, "tolist"):
+        return iterable.mean().item()
+    from statistics import fmean
+    return fmean(iterable)
+
+
+@register_auto
+def map_function(ctx, function: Function, iterable: Value):
+    """
+    Call a function on every element of an iterable and get a list of the results.
+
+    function: The function to call with each element.
+    iterable: The elements to transform.
+    """
+    return List([call(ctx, function, x) for x in iterable])
+
+
+@register_auto
+def filter_function(ctx, function: Function, iterable: Value):
+    """
+    Get a list of the elements of an iterable for which a function returns a truthy value.
+
+    function: The function to test each element with.
+    iterable: The elements to filter.
+    """
+    return List([x for x in iterable if call(ctx, function, x)])
+
+
+@register_auto
+def reduce_function(ctx, function: Function, iterable: Value, initial: Value=None):
+    """
+    Combine the elements of an iterable from left to right with a function of two arguments.
+
+    function: The function to combine the accumulated value and the next element with.
+    iterable: The elements to combine.
+    initial: The starting value, the first element is used when not given.
+    """
+    items = iter(iterable)
+    out = initial
+    if isinstance(out, Null):
+        try:
+            out = next(items)
+        except StopIteration:
+            raise Exception("reduce of an empty iterable with no initial value") from None
+    for x in items:
+        out = call(ctx, function, out, x)
+    return out
+
+
+@register_auto
+def any_function(ctx, iterable: Value, key: Function=None):
+    """
+    Check whether any element of an iterable is truthy.
+
+    iterable: The elements to check.
+    key: A function to test each element with instead of the element itself.
+    """
+    if isinstance(key, Function):
+        return any(call(ctx, key, x) for x in iterable)
+    return any(iterable)
+
+
+@register_auto
+def all_function(ctx, iterable: Value, key: Function=None):
+    """
+    Check whether every element of an iterable is truthy.
+
+    iterable: The elements to check.
+    key: A function to test each element with instead of the element itself.
+    """
+    if isinstance(key, Function):
+        return all(call(ctx, key, x) for x in iterable)
+    return all(iterable)
+
+
+@register_auto
+def zip_function(*iterables: Value):
+    """
+    Pair up the elements of several iterables, stopping at the shortest.
+
+    iterables: The iterables to combine.
+    """
+    return List([Tuple(x) for x in zip(*iterables)])
+
+
 @register_auto
 def random_function(minimum=0, maximum=1):
     """
@@ -453,18 +754,20 @@ def random_function(minimum=0, maximum=1):
     min: The minimum value.
     max: The maximum value.
     """
+    from random import randint
     return Integer(randint(minimum, maximum))
 
 
 @register_auto
-def choice_function(iterable):
+def choice_function(iterable: Value):
     """
     Get a random element from an iterable.
 
     iterable: The iterable to get a random element from.
     """
     # choice(iterable)
-    return iterable[randint(0, len(iterable) - 1)]
+    from random import randint
+    return iterable[Integer(randint(0, len(iterable) - 1))]
 
 
 @register_auto
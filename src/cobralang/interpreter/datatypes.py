@@ -1,4 +1,6 @@
 # This code is licensed under the MIT License (see LICENSE file for details)
+from array import array
+from weakref import WeakValueDictionary
 from .interpreter import Context, Node
 
 
@@ -87,7 +89,21 @@ class DictionaryLiteral(Node):
         return f'{{{", ".join([str(i) for i in self.elements])}}}'
 
     def run(self, ctx: Context):
-        return Dict({item[0].run(ctx): item[1].run(ctx) for item in self.elements})
+        out = Dict({})
+        for key, value in self.elements:
+            out[key.run(ctx)] = value.run(ctx)
+        return out
+
+
+class SetLiteral(Node):
+    def __init__(self, elements: list):
+        self.elements = elements
+
+    def __repr__(self):
+        return f'{{{", ".join([str(i) for i in self.elements])}}}'
+
+    def run(self, ctx: Context):
+        return Set({native_key(i.run(ctx)) for i in self.elements})
 
 
 class SliceLiteral(Node):
@@ -103,46 +119,226 @@ class SliceLiteral(Node):
 
 
 class Value:
+    __slots__ = ()
+
     def __init__(self, value):
         self.value = value
 
+    def __iter__(self):
+        # iterable values yield their elements as Values, one at a time (see ForStatement)
+        raise TypeError(f"{self.__class__.__name__} is not iterable")
+
 
 class List(Value):
+    # Homogeneous Integer, Float and Boolean lists are stored unboxed in an array.array (see compact_typecodes),
+    # elements are boxed on access. Storing any other kind of value switches the list to a plain list of Values.
+    views = None
+
     def __init__(self, value: list):
-        super().__init__(value)
+        self.kind = None
+        self.items = value
+        if value:
+            self.compact()
+
+    @property
+    def value(self):
+        self.detach_views()
+        if self.kind is not None:
+            self.generalize()
+        return self.items
+
+    @value.setter
+    def value(self, value: list):
+        self.__init__(value)
+
+    def compact(self):
+        kind = type(self.items[0])
+        if kind not in compact_typecodes or any(type(i) is not kind for i in self.items):
+            return
+        try:
+            self.items = array(compact_typecodes[kind], [i.value for i in self.items])
+        except (TypeError, OverflowError):
+            return
+        self.kind = kind
+
+    def generalize(self):
+        self.items = list(self)
+        self.kind = None
+
+    def box(self, item):
+        if self.kind is Boolean:
+            return Boolean(item != 0)
+        return self.kind(item)
+
+    def __getstate__(self):
+        # views only live as long as the process, a pickled list doesn't keep them
+        state = vars(self).copy()
+        state.pop("views", None)
+        return state
+
+    def detach_views(self):
+        # views share this list's storage, so they take their own copy before it changes
+        if self.views:
+            for view in list(self.views.values()):
+                view.materialize()
 
     def __repr__(self):
-        return f'[{", ".join([str(i) for i in self.value])}]'
+        return f'[{", ".join([str(i) for i in self])}]'
 
     def __str__(self):
         return self.__repr__()
 
     def __bool__(self):
-        return len(self.value) != 0
+        return len(self.items) != 0
 
     def __add__(self, other: Value):
-        return List(self.value + other.value)
+        if self.kind is not None and self.kind is getattr(other, 'kind', None):
+            out = List([])
+            out.kind, out.items = self.kind, self.items + other.items
+            return out
+        return List(list(self) + list(other))
 
     def __getitem__(self, item: Value):
-        return self.value[item.value]
+        if isinstance(item, Slice):
+            return ListView(self, range(len(self.items))[item.value])
+        if self.kind is not None:
+            return self.box(self.items[item.value])
+        return self.items[item.value]
 
     def __setitem__(self, key: Value, value: Value):
-        self.value[key.value] = value
+        self.detach_views()
+        if self.kind is not None:
+            if type(value) is self.kind:
+                try:
+                    self.items[key.value] = value.value
+                    return
+                except (TypeError, OverflowError):
+                    pass
+            self.generalize()
+        self.items[key.value] = value
 
     def __len__(self):
-        return len(self.value)
+        return len(self.items)
 
     def __iter__(self):
-        return iter(self.value)
+        if self.kind is not None:
+            return map(self.box, self.items)
+        return iter(self.items)
 
     def __contains__(self, item: Node):
-        return item in self.value
+        if self.kind is None:
+            return item in self.items
+        if type(item) in compact_typecodes:
+            return item.value in self.items
+        return item in list(self)
 
     def __eq__(self, other):
-        return Boolean(self.value == other.value)
+        if not isinstance(other, List):
+            return Boolean(False)
+        if self.kind is not None and other.kind is not None:
+            return Boolean(self.items == other.items)
+        return Boolean(list(self) == list(other))
 
     def __ne__(self, other):
-        return Boolean(self.value != other.value)
+        return Boolean(not self.__eq__(other))
+
+    def append(self, value: Value):
+        self.detach_views()
+        if not self.items and type(value) in compact_typecodes:
+            self.kind, self.items = type(value), array(compact_typecodes[type(value)])
+        if self.kind is not None:
+            if type(value) is self.kind:
+                try:
+                    self.items.append(value.value)
+                    return
+                except (TypeError, OverflowError):
+                    pass
+            self.generalize()
+        self.items.append(value)
+
+    def insert(self, index: int, value: Value):
+        self.detach_views()
+        if self.kind is not None:
+            if type(value) is self.kind:
+                try:
+                    self.items.insert(index, value.value)
+                    return
+                except (TypeError, OverflowError):
+                    pass
+            self.generalize()
+        self.items.insert(index, value)
+
+    def pop(self, index: int):
+        self.detach_views()
+        if self.kind is not None:
+            return self.box(self.items.pop(index))
+        return self.items.pop(index)
+
+
+def range_to_slice(indices: range):
+    return slice(indices.start, indices.stop if indices.stop >= 0 else None, indices.step)
+
+
+class ListView(List):
+    # A slice of a List that reads through to the base list's storage instead of copying it. The first access to
+    # the view's own storage (any mutation, or .value) copies the slice out and turns the view into a plain List,
+    # the base list does the same to its views before it is mutated.
+    def __init__(self, base: List, indices: range):
+        if isinstance(base, ListView):
+            base, indices = base.base, base.indices[range_to_slice(indices)]
+        self.base = base
+        self.indices = indices
+        if base.views is None:
+            base.views = WeakValueDictionary()
+        base.views[id(self)] = self
+
+    def __getattr__(self, name):
+        if name in ('items', 'kind'):
+            self.materialize()
+            return getattr(self, name)
+        raise AttributeError(f"'ListView' object has no attribute '{name}'")
+
+    def __reduce__(self):
+        # pickled as a plain list, the copy has no base list to read through to
+        return List, (list(self),)
+
+    def materialize(self):
+        base, indices = self.base, self.indices
+        base.views.pop(id(self), None)
+        del self.base, self.indices
+        self.kind = base.kind
+        self.items = base.items[range_to_slice(indices)]
+        self.__class__ = List
+
+    def element(self, index: int):
+        if self.base.kind is not None:
+            return self.base.box(self.base.items[index])
+        return self.base.items[index]
+
+    def __bool__(self):
+        return len(self.indices) != 0
+
+    def __add__(self, other: Value):
+        return List(list(self) + list(other))
+
+    def __getitem__(self, item: Value):
+        if isinstance(item, Slice):
+            return ListView(self.base, self.indices[item.value])
+        return self.element(self.indices[item.value])
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        return map(self.element, self.indices)
+
+    def __contains__(self, item: Node):
+        return item in list(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, List):
+            return Boolean(False)
+        return Boolean(list(self) == list(other))
 
 
 class Tuple(Value):
@@ -162,6 +358,8 @@ class Tuple(Value):
         return Tuple(self.value + other.value)
 
     def __getitem__(self, item: Value):
+        if isinstance(item, Slice):
+            return TupleView(self, range(len(self.value))[item.value])
         return self.value[item.value]
 
     def __setitem__(self, key: Value, value: Value):
@@ -186,42 +384,201 @@ class Tuple(Value):
         return hash(self.value)
 
 
+class TupleView(Tuple):
+    # A slice of a Tuple that reads through to the base tuple, tuples are immutable so it only copies on .value
+    def __init__(self, base: Tuple, indices: range):
+        if isinstance(base, TupleView):
+            base, indices = base.base, base.indices[range_to_slice(indices)]
+        self.base = base
+        self.indices = indices
+
+    def __getattr__(self, name):
+        if name == 'value':
+            self.materialize()
+            return self.value
+        raise AttributeError(f"'TupleView' object has no attribute '{name}'")
+
+    def materialize(self):
+        self.value = self.base.value[range_to_slice(self.indices)]
+        del self.base, self.indices
+        self.__class__ = Tuple
+
+    def __repr__(self):
+        return f'({", ".join([str(i) for i in self])})'
+
+    def __bool__(self):
+        return len(self.indices) != 0
+
+    def __getitem__(self, item: Value):
+        if isinstance(item, Slice):
+            return TupleView(self.base, self.indices[item.value])
+        return self.base.value[self.indices[item.value]]
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        return (self.base.value[i] for i in self.indices)
+
+    def __contains__(self, item: Node):
+        return item in tuple(self)
+
+
 class Dict(Value):
+    # Entries are keyed by the native_key of the Value, keys are only wrapped again when iterating
     def __init__(self, value: dict):
-        super().__init__(value)
+        self.entries = {native_key(k): v for k, v in value.items()}
+
+    @property
+    def value(self):
+        return dict(self.items())
+
+    @value.setter
+    def value(self, value: dict):
+        self.__init__(value)
+
+    def items(self):
+        return ((wrap_key(k), v) for k, v in self.entries.items())
 
     def __repr__(self):
-        return f'{{{", ".join([f"{str(k)}: {str(v)}" for k, v in self.value.items()])}}}'
+        return f'{{{", ".join([f"{str(k)}: {str(v)}" for k, v in self.items()])}}}'
 
     def __str__(self):
         return self.__repr__()
 
     def __bool__(self):
-        return len(self.value) != 0
+        return len(self.entries) != 0
 
     def __getitem__(self, item: Value):
         try:
-            return self.value[item]
+            return self.entries[native_key(item)]
         except KeyError as e:
             raise KeyError(f'Key {item} not found in dictionary') from e
 
     def __setitem__(self, key: Value, value: Value):
-        self.value[key] = value
+        self.entries[native_key(key)] = value
 
     def __len__(self):
-        return len(self.value)
+        return len(self.entries)
 
     def __iter__(self):
-        return iter(self.value)
+        return map(wrap_key, self.entries)
 
     def __contains__(self, item: Node):
-        return item in self.value
+        return native_key(item) in self.entries
 
     def __eq__(self, other):
-        return Boolean(self.value == other.value)
+        return Boolean(isinstance(other, Dict) and self.entries == other.entries)
 
     def __ne__(self, other):
-        return Boolean(self.value != other.value)
+        return Boolean(not self.__eq__(other))
+
+
+class Set(Value):
+    # Elements are stored by their native_key, so hashing and equality are done on the underlying Python values
+    def __init__(self, value: set):
+        super().__init__(value)
+
+    def __repr__(self):
+        return f'{{{", ".join([str(i) for i in self])}}}' if self.value else 'set()'
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __bool__(self):
+        return len(self.value) != 0
+
+    def __len__(self):
+        return len(self.value)
+
+    def __iter__(self):
+        return map(wrap_key, self.value)
+
+    def __contains__(self, item: Value):
+        return native_key(item) in self.value
+
+    def __eq__(self, other):
+        return Boolean(isinstance(other, Set) and self.value == other.value)
+
+    def __ne__(self, other):
+        return Boolean(not self.__eq__(other))
+
+    def append(self, value: Value):
+        self.value.add(native_key(value))
+
+    def remove(self, value: Value):
+        try:
+            self.value.remove(native_key(value))
+        except KeyError as e:
+            raise KeyError(f'Value {value} not found in set') from e
+
+
+class Record(Value):
+    # An instance of a struct, the field values are stored in declaration order and found by index (see StructType)
+    __slots__ = ('type', 'values')
+
+    def __init__(self, struct_type, values: list):
+        self.type = struct_type
+        self.values = values
+
+    @property
+    def value(self):
+        return dict(zip(self.type.fields, self.values))
+
+    def __repr__(self):
+        return f'{self.type.name}({", ".join([f"{k}={v}" for k, v in zip(self.type.fields, self.values)])})'
+
+    def __str__(self):
+        return self.__repr__()
+
+    def index(self, field: str):
+        try:
+            return self.type.index[field]
+        except KeyError as e:
+            raise KeyError(f'Struct {self.type.name} has no field {field}') from e
+
+    def __getitem__(self, item: Value):
+        return self.values[self.index(item.value)]
+
+    def __setitem__(self, key: Value, value: Value):
+        self.values[self.index(key.value)] = value
+
+    def __eq__(self, other):
+        return Boolean(isinstance(other, Record) and self.type is other.type and self.values == other.values)
+
+    def __ne__(self, other):
+        return Boolean(not self.__eq__(other))
+
+
+def native_key(value: Value):
+    # The hashable Python value used to store a Value in a Set or as a Dict key. Primitives use their Python value
+    # (so 1, 1.0 and True are the same key, as in Python), any other hashable Value is used as its own key.
+    match value:
+        case String() | Integer() | Float() | Boolean() | Null():
+            return value.value
+        case Tuple():
+            return tuple(native_key(i) for i in value)
+        case _:
+            hash(value)
+            return value
+
+
+def wrap_key(key):
+    match key:
+        case Value():
+            return key
+        case bool():
+            return Boolean(key)
+        case int():
+            return Integer(key)
+        case str():
+            return String(key)
+        case tuple():
+            return Tuple(tuple(wrap_key(i) for i in key))
+        case None:
+            return Null()
+        case _:
+            return Float(key)
 
 
 class Integer(Value):
@@ -238,24 +595,36 @@ class Integer(Value):
         return float(self.value)
 
     def __bool__(self):
-        return self.value == 0
+        return self.value != 0
 
     def __add__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Integer(self.value + other.value)
 
     def __sub__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Integer(self.value - other.value)
 
     def __mul__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Integer(self.value * other.value)
 
     def __pow__(self, power, modulo=None):
+        if isinstance(power, Array):
+            return NotImplemented
         return Integer(self.value ** power.value)
 
     def __truediv__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Float(self.value / other.value)
 
     def __floordiv__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Integer(self.value // other.value)
 
     def __floor__(self):
@@ -265,21 +634,33 @@ class Integer(Value):
         return Integer(self.value // 1 + 1)
 
     def __lt__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Boolean(self.value < other.value)
 
     def __le__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Boolean(self.value <= other.value)
 
     def __gt__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Boolean(self.value > other.value)
 
     def __ge__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Boolean(self.value >= other.value)
 
     def __eq__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Boolean(self.value == other.value)
 
     def __mod__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Integer(self.value % other.value)
 
     def __pos__(self):
@@ -307,21 +688,33 @@ class Float(Value):
         return self.value != 0.0
 
     def __add__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Float(self.value + other.value)
 
     def __sub__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Float(self.value - other.value)
 
     def __mul__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Float(self.value * other.value)
 
     def __pow__(self, power, modulo=None):
+        if isinstance(power, Array):
+            return NotImplemented
         return Float(self.value ** power.value)
 
     def __truediv__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Float(self.value / other.value)
 
     def __floordiv__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Float(self.value // other.value)
 
     def __floor__(self):
@@ -331,21 +724,33 @@ class Float(Value):
         return Float(self.value // 1 + 1)
 
     def __lt__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Boolean(self.value < other.value)
 
     def __le__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Boolean(self.value <= other.value)
 
     def __gt__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Boolean(self.value > other.value)
 
     def __ge__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Boolean(self.value >= other.value)
 
     def __eq__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Boolean(self.value == other.value)
 
     def __mod__(self, other):
+        if isinstance(other, Array):
+            return NotImplemented
         return Float(self.value % other.value)
 
     def __pos__(self):
@@ -359,28 +764,65 @@ class Float(Value):
 
 
 class String(Value):
+    # Concatenation builds a rope: the pieces are collected in a chunk list that is shared with the string it was
+    # built from, and only joined into a single str the first time .value is needed (index, compare, print, ...).
+    # The string that owns the end of the chunk list appends to it in place, so s += piece is amortized O(1).
     def __init__(self, value: str):
-        super().__init__(value)
+        self.flat = value
+        self.chunks = None
+
+    @property
+    def value(self):
+        if self.chunks is not None:
+            self.flat = "".join(self.chunks[:self.count])
+            self.chunks = None
+        return self.flat
+
+    @value.setter
+    def value(self, value: str):
+        self.flat = value
+        self.chunks = None
 
     def __repr__(self):
         return self.value.__repr__()
 
     def __str__(self):
-        return String(self.value)
+        return self.value
 
     def __bool__(self):
-        return Boolean(self.value!="")
+        return len(self) != 0
 
     def __len__(self):
-        return Integer(len(self.value))
+        if self.chunks is not None:
+            return self.length
+        return len(self.flat)
 
     def __getitem__(self, item: Value):
+        if isinstance(item, Slice):
+            return StringView(self.value, range(len(self.value))[item.value])
         return String(self.value[item.value])
 
+    def __iter__(self):
+        return map(String, self.value)
+
     # rt
 
     def __add__(self, other):
-        return String(self.value + other.value)
+        piece = other.value
+        if not isinstance(piece, str):
+            return String(self.value + piece)
+        if self.chunks is None:
+            if len(self.flat) + len(piece) <= rope_threshold:
+                return String(self.flat + piece)
+            chunks = [self.flat, piece]
+        elif len(self.chunks) == self.count:
+            chunks = self.chunks
+            chunks.append(piece)
+        else:
+            chunks = self.chunks[:self.count] + [piece]
+        out = String(None)
+        out.chunks, out.count, out.length = chunks, len(chunks), len(self) + len(piece)
+        return out
 
     def __lt__(self, other):
         return Boolean(self.value < other.value)
@@ -395,6 +837,63 @@ class String(Value):
         return hash(self.value)
 
 
+# strings shorter than this are concatenated directly instead of starting a rope
+rope_threshold = 64
+
+
+class StringView(String):
+    # A slice of a string that keeps the base str and an index range, it only copies the characters out when .value
+    # is needed (comparison, concatenation, printing, ...)
+    def __init__(self, base: str, indices: range):
+        self.base = base
+        self.indices = indices
+
+    @property
+    def value(self):
+        flat = self.base[range_to_slice(self.indices)]
+        del self.base, self.indices
+        self.__class__ = String
+        self.value = flat
+        return flat
+
+    def __bool__(self):
+        return len(self.indices) != 0
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __add__(self, other):
+        # reading .value turns the view into a plain String first
+        return String(self.value) + other
+
+    def __getitem__(self, item: Value):
+        if isinstance(item, Slice):
+            return StringView(self.base, self.indices[item.value])
+        return String(self.base[self.indices[item.value]])
+
+
+class StringBuilder(Value):
+    def __init__(self, value: str=""):
+        super().__init__([value] if value else [])
+        self.length = len(value)
+
+    def __repr__(self):
+        return f'StringBuilder({self.length})'
+
+    def __len__(self):
+        return self.length
+
+    def append(self, value: Value):
+        piece = value.value if isinstance(value, String) else str(value)
+        self.value.append(piece)
+        self.length += len(piece)
+
+    def build(self):
+        if len(self.value) > 1:
+            self.value[:] = ["".join(self.value)]
+        return String(self.value[0] if self.value else "")
+
+
 class Boolean(Value):
     def __init__(self, value: bool):
         super().__init__(value)
@@ -421,6 +920,9 @@ class Boolean(Value):
         return hash(self.value)
 
 
+compact_typecodes = {Integer: 'q', Float: 'd', Boolean: 'b'}
+
+
 class Null(Value):
     def __init__(self):
         super().__init__(value=None)
@@ -428,9 +930,8 @@ class Null(Value):
     def __repr__(self):
         return 'Null'
 
-    # rt
     def __bool__(self):
-        return Boolean(False)
+        return False
 
     def __eq__(self, other):
         return Boolean(self.value == other.value)
@@ -438,24 +939,203 @@ class Null(Value):
 
 class Slice(Value):
     def __init__(self, start: Value, stop: Value):
-        match start:
-            case Integer():
-                start = start.value
-            case Null():
-                start = 0
-            case _:
-                start = start
-        match stop:
-            case Integer():
-                stop = stop.value
-            case Null():
-                stop = -1
-            case _:
-                stop = stop
         super().__init__(value=slice(start.value, stop.value))
 
     def __repr__(self):
-        return f'{self.value[0]}:{self.value[1]}'
+        return f'{self.value.start}:{self.value.stop}'
 
     def __str__(self):
         return self.__repr__()
+
+
+class Range(Value):
+    # A lazy sequence of integers, only the bounds are stored and each Integer is created when it is reached
+    def __init__(self, value: range):
+        super().__init__(value)
+
+    def __repr__(self):
+        if self.value.step == 1:
+            return f'range({self.value.start}, {self.value.stop})'
+        return f'range({self.value.start}, {self.value.stop}, {self.value.step})'
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __bool__(self):
+        return len(self.value) != 0
+
+    def __len__(self):
+        return len(self.value)
+
+    def __iter__(self):
+        return map(Integer, self.value)
+
+    def __getitem__(self, item: Value):
+        if isinstance(item, Slice):
+            return Range(self.value[item.value])
+        return Integer(self.value[item.value])
+
+    def __setitem__(self, key: Value, value: Value):
+        raise TypeError('Ranges are immutable')
+
+    def __contains__(self, item: Value):
+        return isinstance(item, Integer) and item.value in self.value
+
+    def __eq__(self, other):
+        return Boolean(isinstance(other, Range) and self.value == other.value)
+
+    def __ne__(self, other):
+        return Boolean(not self.__eq__(other))
+
+    def __hash__(self):
+        return hash(self.value)
+
+
+class Generator(Value):
+    # The suspended frame of a generator function, it runs up to the next yield each time a value is requested
+    def __init__(self, value):
+        super().__init__(value)
+
+    def __repr__(self):
+        return '<generator>'
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __iter__(self):
+        return self.value
+
+    def __next__(self):
+        return next(self.value)
+
+
+def box_scalar(value):
+    match value:
+        case bool():
+            return Boolean(value)
+        case int():
+            return Integer(value)
+        case _:
+            return Float(value)
+
+
+def require_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("Array values require numpy, install it with 'pip install numpy'") from e
+    return numpy
+
+
+class Array(Value):
+    def __init__(self, value, dtype=None):
+        super().__init__(require_numpy().asarray(value, dtype=dtype))
+
+    def __repr__(self):
+        return f'array({self.value.tolist()})'
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __bool__(self):
+        return self.value.size != 0
+
+    def __len__(self):
+        return len(self.value)
+
+    def __iter__(self):
+        return (box_scalar(i) for i in self.value.tolist())
+
+    def __getitem__(self, item: Value):
+        out = self.value[item.value]
+        if isinstance(out, require_numpy().ndarray):
+            return Array(out)
+        return box_scalar(out.item())
+
+    def __setitem__(self, key: Value, value: Value):
+        self.value[key.value] = value.value
+
+    def __contains__(self, item: Value):
+        return bool((self.value == item.value).any())
+
+    def to_list(self):
+        return List([box_scalar(i) for i in self.value.tolist()])
+
+    @staticmethod
+    def operand(other: Value):
+        if isinstance(other, (Array, Integer, Float, Boolean)):
+            return other.value
+        raise TypeError(f'Unsupported operand for Array: {other.__class__.__name__}')
+
+    def __add__(self, other):
+        return Array(self.value + self.operand(other))
+
+    def __radd__(self, other):
+        return Array(self.operand(other) + self.value)
+
+    def __sub__(self, other):
+        return Array(self.value - self.operand(other))
+
+    def __rsub__(self, other):
+        return Array(self.operand(other) - self.value)
+
+    def __mul__(self, other):
+        return Array(self.value * self.operand(other))
+
+    def __rmul__(self, other):
+        return Array(self.operand(other) * self.value)
+
+    def __pow__(self, power, modulo=None):
+        return Array(self.value ** self.operand(power))
+
+    def __rpow__(self, other):
+        return Array(self.operand(other) ** self.value)
+
+    def __truediv__(self, other):
+        return Array(self.value / self.operand(other))
+
+    def __rtruediv__(self, other):
+        return Array(self.operand(other) / self.value)
+
+    def __floordiv__(self, other):
+        return Array(self.value // self.operand(other))
+
+    def __rfloordiv__(self, other):
+        return Array(self.operand(other) // self.value)
+
+    def __mod__(self, other):
+        return Array(self.value % self.operand(other))
+
+    def __rmod__(self, other):
+        return Array(self.operand(other) % self.value)
+
+    def __lt__(self, other):
+        return Array(self.value < self.operand(other))
+
+    def __le__(self, other):
+        return Array(self.value <= self.operand(other))
+
+    def __gt__(self, other):
+        return Array(self.value > self.operand(other))
+
+    def __ge__(self, other):
+        return Array(self.value >= self.operand(other))
+
+    def __eq__(self, other):
+        return Array(self.value == self.operand(other))
+
+    def __ne__(self, other):
+        return Array(self.value != self.operand(other))
+
+    def __neg__(self):
+        return Array(-self.value)
+
+    def __pos__(self):
+        return Array(+self.value)
+
+
+def is_mutable(value: Value) -> bool:
+    # whether the value, or a value a tuple of it holds, can be changed in place
+    if isinstance(value, (List, Dict, Set, Record, StringBuilder, Array)):
+        return True
+    return isinstance(value, Tuple) and any(is_mutable(i) for i in value)
@@ -1,4 +1,5 @@
 # This code is licensed under the MIT License (see LICENSE file for details)
+from __future__ import annotations
 from abc import ABC, abstractmethod
 
 
@@ -6,6 +7,8 @@ class Scope:
     def __init__(self):
         self.variables = {}
         self.functions = {}
+        # a pinned scope is referenced from outside its context (e.g. by a generator) and is never reused
+        self.pinned = False
 
     def __repr__(self):
         return f"Scope({self.variables}, {self.functions})"
@@ -14,7 +17,13 @@ class Scope:
 class Context:
     def __init__(self):
         self.scopes = [Scope()]
-        self.register_builtins()
+        # file modules that have been imported, by path
+        self.modules = {}
+        # popped scopes are cleared and kept here, so pushing a scope in a loop doesn't allocate
+        self.scope_pool = []
+        # the builtins are shared by every context and looked up after its scopes, instead of being copied into each
+        from .builtins import std_functions
+        self.builtins = std_functions
 
     def clear_context(self, keep_functions=True, no_warning=False):
         if not no_warning and len(self.scopes) > 2:
@@ -23,18 +32,34 @@ class Context:
             scope.variables = {}
             if not keep_functions:
                 self.scopes[0].functions = {}
-        self.register_builtins()
 
-    def register_builtins(self):
-        from .builtins import std_functions
-        for name, function in std_functions.items():
-            self.scopes[0].functions[name] = function
+    def load_module(self, name: str, path: str, program: Node, names: list[str]=None) -> Scope:
+        # names limits what has to be run to the statements those names depend on, None runs the whole module
+        from .nodes import Module
+        module = self.modules.get(path)
+        if module is None:
+            module = self.modules[path] = Module(name, path, program)
+        module.load(self, names)
+        return module.namespace
+
+    def snapshot(self):
+        # freezes the scopes, fork the snapshot for contexts that start from them (see snapshot.Snapshot)
+        from .snapshot import Snapshot
+        return Snapshot(self)
 
     def push_scope(self):
-        self.scopes.append(Scope())
+        self.scopes.append(self.scope_pool.pop() if self.scope_pool else Scope())
 
     def pop_scope(self):
-        self.scopes.pop()
+        scope = self.scopes.pop()
+        if not scope.pinned:
+            scope.variables.clear()
+            scope.functions.clear()
+            self.scope_pool.append(scope)
+
+    def pin_scopes(self):
+        for scope in self.scopes:
+            scope.pinned = True
 
     def push_function(self, key, value):
         self.current_scope().functions[key] = value
@@ -43,6 +68,8 @@ class Context:
         for scope in self.scopes[::-1]:
             if name in scope.functions:
                 return scope.functions[name]
+        if name in self.builtins:
+            return self.builtins[name]
         raise KeyError(f"Function {name} not found")
 
     def current_scope(self):
@@ -78,3 +105,8 @@ class Node(ABC):
     @abstractmethod
     def run(self, ctx: Context):
         pass
+
+    def generate(self, ctx: Context):
+        # Runs the node inside a generator function, nodes that can contain a yield override this to suspend there
+        self.run(ctx)
+        yield from ()
@@ -0,0 +1,225 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from time import time
+import os
+import pickle
+from .datatypes import Value, native_key
+
+
+class LRUCache:
+    # Results of a cached function (see @cache and --auto-memo), the least recently used entry is evicted once the
+    # cache holds more than maxsize entries. A maxsize of None never evicts.
+    def __init__(self, maxsize: int | None=128):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        return f"LRUCache({self.maxsize})"
+
+    def get(self, key, default=None):
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        if self.maxsize is not None and len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self.entries), "maxsize": self.maxsize}
+
+
+def memo_key(args: list[Value], kwargs: dict[str, Value]):
+    # raises TypeError for unhashable arguments (lists, dicts, ...), calls with those are not cached
+    # the type is part of the key so f(1), f(1.0) and f(True) are cached separately
+    return (tuple((arg.__class__, native_key(arg)) for arg in args),
+            tuple(sorted((name, arg.__class__, native_key(arg)) for name, arg in kwargs.items())))
+
+
+# where @persist results are kept, shared by every script run as the same user
+persistent_cache_path = Path(os.environ.get("COBRA_MEMO_PATH", Path.home().joinpath(".cache", "cobralang", "memo.sqlite3")))
+# once the stored results take more than this many bytes, the least recently used ones are removed
+persistent_cache_bytes = 64 * 1024 * 1024
+
+
+class PersistentStore:
+    # The sqlite database behind @persist, opened on first use. The bytes stored are kept as a running total in the
+    # memo_size table, updated by the same transaction as the entries, and the last use of the entries read from disk
+    # is written with the next put (or when the process exits) instead of costing a commit per hit.
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.connection = None
+        self.lock = Lock()
+        # (function, args) -> when it was last read, not yet written
+        self.used = {}
+
+    def connect(self):
+        if self.connection is None:
+            # imported here, most scripts never use @persist
+            import atexit
+            import sqlite3
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS memo (function TEXT, args BLOB, value BLOB, size INTEGER, used REAL, PRIMARY KEY (function, args))")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS memo_used ON memo (used)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS memo_size (total INTEGER)")
+            with self.transaction() as connection:
+                # stores written before the total was kept start from the sum of their entries
+                if connection.execute("SELECT total FROM memo_size").fetchone() is None:
+                    connection.execute("INSERT INTO memo_size VALUES ((SELECT COALESCE(SUM(size), 0) FROM memo))")
+            atexit.register(self.close)
+        return self.connection
+
+    @contextmanager
+    def transaction(self):
+        # an immediate transaction, the entries and the total change together even with several processes writing
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def get(self, function: str, args: bytes):
+        with self.lock:
+            row = self.connect().execute("SELECT value FROM memo WHERE function = ? AND args = ?", (function, args)).fetchone()
+            if row is None:
+                return None
+            self.used[(function, args)] = time()
+            return row[0]
+
+    def write_used(self, connection):
+        if self.used:
+            connection.executemany("UPDATE memo SET used = ? WHERE function = ? AND args = ?", [(used, function, args) for (function, args), used in self.used.items()])
+            self.used.clear()
+
+    def flush(self):
+        with self.lock:
+            if self.connection is not None and self.used:
+                with self.transaction() as connection:
+                    self.write_used(connection)
+
+    def close(self):
+        import atexit
+        self.flush()
+        with self.lock:
+            if self.connection is not None:
+                atexit.unregister(self.close)
+                self.connection.close()
+                self.connection = None
+
+    def put(self, function: str, args: bytes, value: bytes):
+        with self.lock:
+            self.connect()
+            with self.transaction() as connection:
+                self.write_used(connection)
+                size = len(args) + len(value)
+                old = connection.execute("SELECT size FROM memo WHERE function = ? AND args = ?", (function, args)).fetchone()
+                connection.execute("INSERT OR REPLACE INTO memo VALUES (?, ?, ?, ?, ?)", (function, args, value, size, time()))
+                total = connection.execute("SELECT total FROM memo_size").fetchone()[0] + size - (old[0] if old is not None else 0)
+                # remove the least recently used entries until the store fits again, a few at a time off the index
+                while total > self.max_bytes:
+                    rows = connection.execute("SELECT rowid, size FROM memo ORDER BY used LIMIT 16").fetchall()
+                    if not rows:
+                        total = 0
+                    for rowid, size in rows:
+                        connection.execute("DELETE FROM memo WHERE rowid = ?", (rowid,))
+                        total -= size
+                        if total <= self.max_bytes:
+                            break
+                connection.execute("UPDATE memo_size SET total = ?", (total,))
+
+    def clear(self, function: str=None):
+        if function is None and not self.path.exists():
+            return
+        with self.lock:
+            self.connect()
+            self.used.clear()
+            with self.transaction() as connection:
+                if function is None:
+                    connection.execute("DELETE FROM memo")
+                    connection.execute("UPDATE memo_size SET total = 0")
+                else:
+                    connection.execute("UPDATE memo_size SET total = total - (SELECT COALESCE(SUM(size), 0) FROM memo WHERE function = ?)", (function,))
+                    connection.execute("DELETE FROM memo WHERE function = ?", (function,))
+
+
+persistent_store = PersistentStore(persistent_cache_path, persistent_cache_bytes)
+
+
+class PersistentCache(LRUCache):
+    # An LRUCache that also keeps its results on disk (see @persist), so later processes can reuse them. Entries
+    # belong to a digest of the function's source and of what it depends on (see optimizer.persistent_digest), set by
+    # the function on its first call: editing any of it starts a new set of entries. Until then only memory is used.
+    def __init__(self, maxsize: int | None=128):
+        super().__init__(maxsize)
+        self.digest = None
+        self.disk_hits = 0
+
+    def __repr__(self):
+        return f"PersistentCache({self.maxsize})"
+
+    def get(self, key, default=None):
+        value = super().get(key, missing)
+        if value is not missing or self.digest is None:
+            return default if value is missing else value
+        stored = persistent_store.get(self.digest, portable_key(key))
+        if stored is None:
+            return default
+        value = pickle.loads(stored)
+        super().put(key, value)
+        self.misses -= 1
+        self.disk_hits += 1
+        return value
+
+    def put(self, key, value):
+        super().put(key, value)
+        if self.digest is None:
+            return
+        try:
+            stored = pickle.dumps(value)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # values that can't be stored (generators, ...) are only cached in memory
+            return
+        persistent_store.put(self.digest, portable_key(key), stored)
+
+    def clear(self):
+        super().clear()
+        self.disk_hits = 0
+        if self.digest is not None:
+            persistent_store.clear(self.digest)
+
+    def info(self) -> dict:
+        return super().info() | {"disk_hits": self.disk_hits}
+
+
+# marks a miss in PersistentCache.get
+missing = object()
+
+
+def portable_key(key) -> bytes:
+    # memo_key with type names in place of the classes, so it can be compared across processes
+    args, kwargs = key
+    return pickle.dumps((tuple((cls.__name__, value) for cls, value in args), tuple((name, cls.__name__, value) for name, cls, value in kwargs)))
@@ -1,8 +1,14 @@
 # This code is licensed under the MIT License (see LICENSE file for details)
 from __future__ import annotations
+from copy import copy, deepcopy
 from .interpreter import Node, Context
 from .exceptions import ReturnException, StopException
-from .datatypes import Value, Null, Dict, Tuple, String, StringLiteral
+from .datatypes import Value, Null, Dict, Tuple, String, StringLiteral, Record, Generator, is_mutable
+from .memo import LRUCache, PersistentCache, memo_key
+
+
+# marks a cache miss, None is a valid cached result
+missing = object()
 
 
 class VariableReference(Node):
@@ -13,7 +19,15 @@ class VariableReference(Node):
         return self.name
 
     def run(self, ctx: Context):
-        return ctx[self.name]
+        try:
+            return ctx[self.name]
+        except KeyError:
+            # a function name used as a value, e.g. map(double, values)
+            try:
+                return ctx.get_function(self.name)
+            except KeyError:
+                pass
+            raise
 
 
 class Subscript(Node):
@@ -43,6 +57,45 @@ class Subscript(Node):
             return ctx[self.name.name]
 
 
+class ConditionalExpression(Node):
+    def __init__(self, condition: Node, body: Node, orelse: Node):
+        self.condition = condition
+        self.body = body
+        self.orelse = orelse
+
+    def __repr__(self):
+        return f"({self.body} if {self.condition} else {self.orelse})"
+
+    def run(self, ctx: Context):
+        return self.body.run(ctx) if self.condition.run(ctx) else self.orelse.run(ctx)
+
+
+class FieldAccess(Node):
+    def __init__(self, target: Node, name: str):
+        self.target = target
+        self.name = name
+        # the index of the field in the last struct type seen here, so repeated access skips the name lookup
+        self.cached_type = None
+        self.cached_index = None
+
+    def __repr__(self):
+        return f"{self.target}.{self.name}"
+
+    def index_of(self, record: Record):
+        if not isinstance(record, Record):
+            raise Exception(f"Cannot access field {self.name} of {record.__class__.__name__}")
+        if record.type is not self.cached_type:
+            self.cached_index = record.index(self.name)
+            self.cached_type = record.type
+        return self.cached_index
+
+    def run(self, ctx: Context):
+        record = self.target.run(ctx)
+        # the type is checked before .values is read, which only records have
+        index = self.index_of(record)
+        return record.values[index]
+
+
 class VariableDeclaration(Node):
     def __init__(self, name: str, value: Node):
         self.name = name
@@ -69,6 +122,10 @@ class Assignment(Node):
         elif isinstance(self.left, Subscript):
             target = self.left.get_target(ctx)
             target[self.left.index.run(ctx)] = self.right.run(ctx)
+        elif isinstance(self.left, FieldAccess):
+            record = self.left.target.run(ctx)
+            index = self.left.index_of(record)
+            record.values[index] = self.right.run(ctx)
         else:
             raise Exception(f"Invalid assignment target: {self}")
 
@@ -103,6 +160,14 @@ class Block(Node):
         finally:
             ctx.pop_scope()
 
+    def generate(self, ctx: Context):
+        ctx.push_scope()
+        try:
+            for statement in self.statements:
+                yield from statement.generate(ctx)
+        finally:
+            ctx.pop_scope()
+
 
 class StatementBlock(Block):
     def run(self, ctx: Context):
@@ -111,6 +176,10 @@ class StatementBlock(Block):
             out = statement.run(ctx)
         return out
 
+    def generate(self, ctx: Context):
+        for statement in self.statements:
+            yield from statement.generate(ctx)
+
 
 class Program(Block):
     def __init__(self, statements: list[Node]):
@@ -135,18 +204,34 @@ class Program(Block):
 
 
 class Function:
-    def __init__(self, name: str, posargs: list[str], varargs: str | None, kwargs: dict[str,Node], varkwargs: str | None, body: StatementBlock):
+    # digest of the source the function was parsed from (see parser.token_digest), None for builtins and structs
+    digest = None
+
+    def __init__(self, name: str, posargs: list[str], varargs: str | None, kwargs: dict[str,Node], varkwargs: str | None, body: StatementBlock, is_generator: bool=False, memo: LRUCache=None, digest: str=None):
         self.name = name
         self.posargs = posargs
         self.varargs = varargs
         self.kwargs = kwargs
         self.varkwargs = varkwargs
         self.body = body
+        self.is_generator = is_generator
+        self.memo = memo
+        self.digest = digest
 
     def __repr__(self):
         return f"Function({self.name}, {self.posargs}, {self.varargs}, {self.kwargs}, {self.varkwargs}, {self.body})"
 
-    def run(self, ctx: Context, args: list[Value], _kwargs: dict[str,Value]):
+    def __deepcopy__(self, memo):
+        # functions are code, copies of the values that hold them (records, lists of callbacks, ...) share them
+        return self
+
+    def bind(self, ctx: Context, args: list[Value], _kwargs: dict[str,Value]):
+        # pushes the function's scope and assigns the arguments to it
+        if len(args) == len(self.posargs) and not _kwargs and not self.kwargs and self.varkwargs is None:
+            # plain positional call, the common case for callbacks
+            ctx.push_scope()
+            ctx.current_scope().variables.update(zip(self.posargs, args))
+            return
         if len(args) < len(self.posargs):
             raise Exception(f"Function {self.name} expected {len(self.posargs)} arguments, got {len(args)}")
         ctx.push_scope()
@@ -164,7 +249,7 @@ class Function:
         if defined_kwargs:
             kwargs.update({k: _kwargs[k] for k in defined_kwargs})
         if undefined_kwargs:
-            kwargs.update({self.varkwargs: Dict({k: _kwargs[k] for k in undefined_kwargs})})
+            kwargs.update({self.varkwargs: Dict({String(k): _kwargs[k] for k in undefined_kwargs})})
         if varargs:
             # noinspection PyTypeChecker
             kwargs[self.varargs] = Tuple(varargs)
@@ -172,6 +257,38 @@ class Function:
             ctx.current_scope().variables[name] = arg
         for name, arg in kwargs.items():
             ctx.current_scope().variables[name] = arg
+
+    def run(self, ctx: Context, args: list[Value], _kwargs: dict[str,Value]):
+        if self.memo is None:
+            return self.execute(ctx, args, _kwargs)
+        self.prepare_memo(ctx)
+        try:
+            key = memo_key(args, _kwargs)
+        except TypeError:
+            return self.execute(ctx, args, _kwargs)
+        out = self.memo.get(key, missing)
+        if out is missing:
+            out = self.execute(ctx, args, _kwargs)
+            self.memo.put(key, out)
+        # every caller gets its own copy of a mutable result, changing it must not change what later calls return
+        return deepcopy(out) if is_mutable(out) else out
+
+    def prepare_memo(self, ctx: Context):
+        # results stored on disk belong to what the function depends on, worked out when it is first used
+        if isinstance(self.memo, PersistentCache) and self.memo.digest is None:
+            from ..optimizer import persistent_digest
+            self.memo.digest = persistent_digest(self, ctx)
+
+    def execute(self, ctx: Context, args: list[Value], _kwargs: dict[str,Value]):
+        if self.is_generator:
+            # the generator gets its own context over the caller's scopes, so its frame survives between resumes
+            ctx.pin_scopes()
+            frame = copy(ctx)
+            frame.scopes = ctx.scopes.copy()
+            frame.scope_pool = []
+            self.bind(frame, args, _kwargs)
+            return Generator(self.resume(frame))
+        self.bind(ctx, args, _kwargs)
         try:
             out = self.body.run(ctx)
             if not isinstance(out, Null):
@@ -182,6 +299,12 @@ class Function:
         finally:
             ctx.pop_scope()
 
+    def resume(self, frame: Context):
+        try:
+            yield from self.body.generate(frame)
+        except ReturnException:
+            return
+
 
 class FunctionDefinition(Node):
     def __init__(self, function: Function):
@@ -191,8 +314,47 @@ class FunctionDefinition(Node):
         return f"FunctionDeclaration({self.function})"
 
     def run(self, ctx: Context):
-        self.function.kwargs = {k: v.run(ctx) for k, v in self.function.kwargs.items()}
-        ctx.push_function(self.function.name, self.function)
+        # default values are evaluated into a copy of the function, the parsed one keeps their nodes for the next run
+        function = self.function
+        if function.kwargs:
+            function = copy(function)
+            function.kwargs = {k: v.run(ctx) for k, v in self.function.kwargs.items()}
+        ctx.push_function(function.name, function)
+
+
+class StructType(Function):
+    # Calling a struct builds a Record, the fields can be given by position or by name
+    def __init__(self, name: str, fields: list[str]):
+        super().__init__(name, fields, None, {}, None, StatementBlock([StringLiteral(f"Struct {name}({', '.join(fields)})")]))
+        self.fields = tuple(fields)
+        self.index = {field: i for i, field in enumerate(fields)}
+
+    def __repr__(self):
+        return f"StructType({self.name}, {self.fields})"
+
+    def run(self, ctx: Context, args: list[Value], _kwargs: dict[str,Value]):
+        if len(args) > len(self.fields):
+            raise Exception(f"Struct {self.name} expected at most {len(self.fields)} arguments, got {len(args)}")
+        values = list(args) + [None] * (len(self.fields) - len(args))
+        for name, value in _kwargs.items():
+            if name not in self.index:
+                raise Exception(f"Struct {self.name} has no field {name}")
+            values[self.index[name]] = value
+        missing = [field for field, value in zip(self.fields, values) if value is None]
+        if missing:
+            raise Exception(f"Struct {self.name} missing values for fields {missing}")
+        return Record(self, values)
+
+
+class StructDefinition(Node):
+    def __init__(self, struct: StructType):
+        self.struct = struct
+
+    def __repr__(self):
+        return f"StructDefinition({self.struct})"
+
+    def run(self, ctx: Context):
+        ctx.push_function(self.struct.name, self.struct)
 
 
 class FunctionCall(Node):
@@ -211,48 +373,135 @@ class FunctionCall(Node):
         return function.run(ctx, args, kwargs)
 
 
-class FromImportFn(Node):
-    def __init__(self, name: str, filename: str, program: Program, names: list[str]):
+class Module:
+    # A file module. It runs in a context of its own that only sees the builtins (but shares the module registry),
+    # once per importing context. A from-import only runs the top level statements the imported names depend on
+    # (see optimizer.index_dependencies), the rest runs when something needs it.
+    def __init__(self, name: str, path: str, program: Program):
+        self.name = name
+        self.path = path
+        self.program = program
+        self.ctx = None
+        self.namespace = None
+        self.executed = set()
+
+    def __repr__(self):
+        return f"Module({self.name}, {self.path})"
+
+    def reset(self):
+        self.ctx = None
+        self.namespace = None
+        self.executed = set()
+
+    def load(self, ctx: Context, names: list[str]=None):
+        if self.ctx is None:
+            self.ctx = Context()
+            self.ctx.modules = ctx.modules
+            self.ctx.push_scope()
+            # the namespace outlives this load, later from-imports run the rest of the module into it (circular
+            # imports never get here, parser.prefetch_modules rejects them)
+            self.namespace = self.ctx.current_scope()
+            self.namespace.pinned = True
+        statements = self.program.statements
+        needed = range(len(statements)) if names is None else self.reachable(names)
+        pending = [i for i in sorted(needed) if i not in self.executed]
+        if pending:
+            self.executed.update(pending)
+            Program([statements[i] for i in pending]).run(self.ctx)
+
+    def reachable(self, names: list[str]) -> set[int]:
+        dependencies = getattr(self.program, "dependencies", None)
+        if dependencies is None:
+            return set(range(len(self.program.statements)))
+        needed_names = set(names)
+        needed = set()
+        changed = True
+        while changed:
+            changed = False
+            for i, (defines, uses, always) in enumerate(dependencies):
+                # definitions of a needed name, and statements that otherwise touch one (e.g. append(table, x))
+                if i not in needed and (always or defines & needed_names or (not defines and uses & needed_names)):
+                    needed.add(i)
+                    needed_names |= uses
+                    changed = True
+        return needed
+
+
+class Import(Node):
+    def __init__(self, name: str, filename: str, program: Program):
         self.name = name
         self.filename = filename
         self.program = program
+
+    def __repr__(self):
+        return f"Import({self.name})"
+
+    def namespace(self, ctx: Context, names: list[str]=None):
+        if isinstance(self.program, NativeModule):
+            return self.program
+        return ctx.load_module(self.name, self.filename, self.program, names)
+
+    def run(self, ctx: Context):
+        namespace = self.namespace(ctx)
+        ctx.current_scope().functions.update(namespace.functions)
+        ctx.current_scope().variables.update(namespace.variables)
+
+
+class FromImportFn(Import):
+    def __init__(self, name: str, filename: str, program: Program, names: list[str]):
+        super().__init__(name, filename, program)
         self.functions = names
 
     def __repr__(self):
         return f"FromImportFn({self.name}, {self.functions})"
 
     def run(self, ctx: Context):
+        namespace = self.namespace(ctx, self.functions)
         try:
-            ctx.push_scope()
-            self.program.run(ctx)
             for name in self.functions:
-                ctx.scopes[-2].functions[name] = ctx.get_function(name)
+                ctx.current_scope().functions[name] = namespace.functions[name]
         except KeyError:
             raise Exception(f"Function(s) not found in module {self.name}")
-        finally:
-            ctx.pop_scope()
 
 
-class FromImportVar(Node):
+class FromImportVar(Import):
     def __init__(self, name: str, filename: str, program: Program, names: list[str]):
-        self.name = name
-        self.filename = filename
-        self.program = program
+        super().__init__(name, filename, program)
         self.variables = names
 
     def __repr__(self):
         return f"FromImportVar({self.name}, {self.variables})"
 
     def run(self, ctx: Context):
+        namespace = self.namespace(ctx, self.variables)
         try:
-            ctx.push_scope()
-            self.program.run(ctx)
             for name in self.variables:
-                ctx.scopes[-2].variables[name] = ctx[name]
+                ctx.current_scope().variables[name] = namespace.variables[name]
         except KeyError:
             raise Exception(f"Variable(s) not found in module {self.name} - {self.filename}")
-        finally:
-            ctx.pop_scope()
+
+
+class NativeModule(Node):
+    def __init__(self, name: str, functions: dict[str, Function]=None, variables: dict[str, Value]=None):
+        self.name = name
+        self.functions = functions if functions is not None else {}
+        self.variables = variables if variables is not None else {}
+
+    def __repr__(self):
+        return f"NativeModule({self.name})"
+
+    def __reduce__(self):
+        # pickled by name, the functions are Python code
+        return native_module, (self.name,)
+
+    def run(self, ctx: Context):
+        ctx.current_scope().functions.update(self.functions)
+        ctx.current_scope().variables.update(self.variables)
+
+
+def native_module(name: str) -> NativeModule:
+    from .builtins import all_builtins
+    return all_builtins[name]
 
 
 class Help(Node):
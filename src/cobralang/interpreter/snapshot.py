@@ -0,0 +1,114 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+from copy import deepcopy
+from .interpreter import Context, Scope
+from .nodes import Module
+from .datatypes import is_mutable
+
+
+def freeze(variables: dict, memo: dict) -> dict:
+    # values that can change (or hold one that can) are copied, functions held by them are shared (see
+    # Function.__deepcopy__). One memo is used for a whole snapshot, so a value bound under several names (e.g. by a
+    # from-import) is still one value in it.
+    return {name: deepcopy(value, memo) if is_mutable(value) else value for name, value in variables.items()}
+
+
+class Layer(dict):
+    # The names of a forked scope. Reads fall through to the snapshot's frozen dict until the fork assigns the name
+    # itself, and a value that can change is copied into the fork the first time it is read, so nothing the fork does
+    # can reach the snapshot or its other forks. The layers of a fork share one memo, like the snapshot's scopes.
+    def __init__(self, base: dict, memo: dict):
+        super().__init__()
+        self.base = base
+        self.memo = memo
+
+    def __repr__(self):
+        return f"Layer({dict(self)}, {self.base})"
+
+    def __missing__(self, key):
+        value = self.base[key]
+        if is_mutable(value):
+            value = self[key] = deepcopy(value, self.memo)
+        return value
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self.base
+
+    def __iter__(self):
+        # the snapshot's names in their order then the fork's new ones, listed up front since reading a value that
+        # can change adds it to the fork's own names
+        return iter(list(dict.fromkeys([*self.base, *dict.keys(self)])))
+
+    def __len__(self):
+        return len(self.base.keys() | dict.keys(self))
+
+    def keys(self):
+        return list(self)
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def copy(self):
+        return dict(self.items())
+
+
+def freeze_scopes(scopes: list[Scope], memo: dict) -> list[tuple[dict, dict]]:
+    return [(freeze(scope.variables, memo), dict(scope.functions)) for scope in scopes]
+
+
+def fork_scopes(frozen: list[tuple[dict, dict]], memo: dict) -> list[Scope]:
+    scopes = []
+    for variables, functions in frozen:
+        scope = Scope()
+        scope.variables = Layer(variables, memo)
+        scope.functions = Layer(functions, memo)
+        # forked scopes hold the snapshot's dicts, they are never cleared for reuse
+        scope.pinned = True
+        scopes.append(scope)
+    return scopes
+
+
+class FrozenModule:
+    # a file module as the snapshot found it, the frozen scopes of its context and which of its statements ran
+    def __init__(self, module: Module, memo: dict):
+        self.name, self.path, self.program = module.name, module.path, module.program
+        self.executed = frozenset(module.executed)
+        self.scopes = freeze_scopes(module.ctx.scopes, memo) if module.ctx is not None else None
+        self.namespace = module.ctx.scopes.index(module.namespace) if module.ctx is not None else None
+
+    def fork(self, modules: dict, memo: dict) -> Module:
+        module = Module(self.name, self.path, self.program)
+        if self.scopes is not None:
+            module.ctx = Context()
+            module.ctx.scopes = fork_scopes(self.scopes, memo)
+            module.ctx.modules = modules
+            module.namespace = module.ctx.scopes[self.namespace]
+            module.executed = set(self.executed)
+        return module
+
+
+class Snapshot:
+    # The frozen scopes of a context (see Context.snapshot). Forking one is cheap whatever the snapshot holds: the
+    # fork starts with empty scopes over the frozen ones and only copies what it reads and can change.
+    def __init__(self, ctx: Context):
+        memo = {}
+        self.scopes = freeze_scopes(ctx.scopes, memo)
+        # imported modules don't run again in a fork, their namespaces are frozen and forked like the scopes
+        self.modules = {path: FrozenModule(module, memo) for path, module in ctx.modules.items()}
+
+    def __repr__(self):
+        return f"Snapshot({len(self.scopes)} scopes)"
+
+    def fork(self) -> Context:
+        memo = {}
+        ctx = Context()
+        ctx.scopes = fork_scopes(self.scopes, memo)
+        ctx.modules = {}
+        for path, module in self.modules.items():
+            ctx.modules[path] = module.fork(ctx.modules, memo)
+        return ctx
@@ -2,6 +2,8 @@
 from .interpreter import Context, Node
 from .exceptions import ReturnException
 from .nodes import Block, StatementBlock, VariableDeclaration
+from .datatypes import List, Dict
+from itertools import islice
 
 
 class ReturnStatement(Node):
@@ -15,6 +17,20 @@ class ReturnStatement(Node):
         raise ReturnException(self.value.run(ctx))
 
 
+class YieldStatement(Node):
+    def __init__(self, value: Node):
+        self.value = value
+
+    def __repr__(self):
+        return f"yield {self.value}"
+
+    def run(self, ctx: Context):
+        raise Exception("yield can only be used inside a generator function")
+
+    def generate(self, ctx: Context):
+        yield self.value.run(ctx)
+
+
 class IfStatement(Node):
     def __init__(self, body: list[tuple[Node, Block]]):
         self.body = body
@@ -28,6 +44,12 @@ class IfStatement(Node):
                 body.run(ctx)
                 return
 
+    def generate(self, ctx: Context):
+        for condition, body in self.body:
+            if condition.run(ctx):
+                yield from body.generate(ctx)
+                return
+
 
 class WhileStatement(Node):
     def __init__(self, condition: Node, body: Block):
@@ -43,6 +65,10 @@ class WhileStatement(Node):
             out = self.body.run(ctx)
         return out
 
+    def generate(self, ctx: Context):
+        while self.condition.run(ctx):
+            yield from self.body.generate(ctx)
+
 
 class ForStatement(Node):
     def __init__(self, variables: list[Node], iterable: Node, body: StatementBlock):
@@ -54,17 +80,92 @@ class ForStatement(Node):
         return f"for {self.variables} in {self.iterable} {self.body}"
 
     def run(self, ctx: Context):
-        i = 0
-        iterable = self.iterable.run(ctx)
-        iter_len = len(iterable)
-        if iter_len % len(self.variables) != 0:
-            raise Exception("Iterable length must be divisible by the number of variables")
+        # values are pulled from the iterable one at a time, so lazy iterables (range, ...) are never materialized
+        items = iter(self.iterable.run(ctx))
         ctx.push_scope()
         try:
-            while i < iter_len:
-                for k in range(len(self.variables)):
-                    ctx.current_scope().variables[self.variables[k].name] = iterable.value[i + k]
-                i += len(self.variables)
+            if len(self.variables) == 1:
+                name = self.variables[0].name
+                for value in items:
+                    ctx.current_scope().variables[name] = value
+                    self.body.run(ctx)
+                return
+            for values in self.groups(items):
+                self.assign(ctx, values)
                 self.body.run(ctx)
         finally:
             ctx.pop_scope()
+
+    def generate(self, ctx: Context):
+        items = iter(self.iterable.run(ctx))
+        ctx.push_scope()
+        try:
+            for values in self.groups(items):
+                self.assign(ctx, values)
+                yield from self.body.generate(ctx)
+        finally:
+            ctx.pop_scope()
+
+    def groups(self, items):
+        # the values for each iteration of the loop, one per variable
+        if len(self.variables) == 1:
+            return zip(items)
+        return chunked(items, len(self.variables))
+
+    def assign(self, ctx: Context, values: tuple):
+        for variable, value in zip(self.variables, values):
+            ctx.current_scope().variables[variable.name] = value
+
+
+def chunked(items, n: int):
+    while values := tuple(islice(items, n)):
+        if len(values) != n:
+            raise Exception("Iterable length must be divisible by the number of variables")
+        yield values
+
+
+class ListComprehension(ForStatement):
+    def __init__(self, element: Node, variables: list[Node], iterable: Node, condition: Node | None):
+        super().__init__(variables, iterable, None)
+        self.element = element
+        self.condition = condition
+
+    def __repr__(self):
+        condition = "" if self.condition is None else f" if {self.condition}"
+        return f"[{self.element} for {self.variables} in {self.iterable}{condition}]"
+
+    def run(self, ctx: Context):
+        items = iter(self.iterable.run(ctx))
+        out = []
+        ctx.push_scope()
+        try:
+            for values in self.groups(items):
+                self.assign(ctx, values)
+                if self.condition is None or self.condition.run(ctx):
+                    out.append(self.element.run(ctx))
+        finally:
+            ctx.pop_scope()
+        return List(out)
+
+
+class DictComprehension(ListComprehension):
+    def __init__(self, key: Node, value: Node, variables: list[Node], iterable: Node, condition: Node | None):
+        super().__init__(key, variables, iterable, condition)
+        self.value = value
+
+    def __repr__(self):
+        condition = "" if self.condition is None else f" if {self.condition}"
+        return f"{{{self.element}: {self.value} for {self.variables} in {self.iterable}{condition}}}"
+
+    def run(self, ctx: Context):
+        items = iter(self.iterable.run(ctx))
+        out = Dict({})
+        ctx.push_scope()
+        try:
+            for values in self.groups(items):
+                self.assign(ctx, values)
+                if self.condition is None or self.condition.run(ctx):
+                    out[self.element.run(ctx)] = self.value.run(ctx)
+        finally:
+            ctx.pop_scope()
+        return out
@@ -1,8 +1,14 @@
 # This code is licensed under the MIT License (see LICENSE file for details)
 from .nodes import Node
+from .datatypes import Boolean
+import operator
 
 
-class UnaryOp:
+def negate(x):
+    return Boolean(not x)
+
+
+class UnaryOp(Node):
     def __init__(self, operand: Node, operator: str, operation):
         self.operand = operand
         self.operator = operator
@@ -17,14 +23,14 @@ class UnaryOp:
 
 class Not(UnaryOp):
     def __init__(self, operand: Node):
-        super().__init__(operand, "not", lambda x: not x)
+        super().__init__(operand, "not", negate)
 
 
 class Minus(UnaryOp):
     def __init__(self, operand: Node):
-        super().__init__(operand, "-", lambda x: -x)
+        super().__init__(operand, "-", operator.neg)
 
 
 class Plus(UnaryOp):
     def __init__(self, operand: Node):
-        super().__init__(operand, "+", lambda x: +x)
+        super().__init__(operand, "+", operator.pos)
@@ -96,16 +96,20 @@ class TokenKind(Enum):
     Semicolon = auto()
     Colon = auto()
     Comma = auto()
+    Dot = auto()
+    At = auto()
 
     # Statements
     Import = auto()
     From = auto()
     Return = auto()
+    Yield = auto()
     Break = auto()
     Let = auto()
     Fn = auto()
     Var = auto()
     For = auto()
+    Struct = auto()
 
     # Blocks
     If = auto()
@@ -132,10 +136,12 @@ keywords = {
     "import": TokenKind.Import,
     "from": TokenKind.From,
     "return": TokenKind.Return,
+    "yield": TokenKind.Yield,
     "break": TokenKind.Break,
     "let": TokenKind.Let,
     "fn": TokenKind.Fn,
     "var": TokenKind.Var,
+    "struct": TokenKind.Struct,
 
     # blocks
     "if": TokenKind.If,
@@ -155,6 +161,7 @@ single_character_tokens = {
     "]": TokenKind.RightBracket,
     ":": TokenKind.Colon,
     ",": TokenKind.Comma,
+    "@": TokenKind.At,
     "|": TokenKind.Or,
     "&": TokenKind.And,
 }
@@ -367,6 +374,10 @@ class Lexer:
                         single_character_tokens[char], position_end=make_position(), position_start=make_position()
                     ))
                     self.advance()
+                case "." if self.position.index + 1 >= len(self.text) or not self.text[self.position.index + 1].isdigit():
+                    self.logger.debug("Found ., pushing Dot token to stack")
+                    tokens.append(Token(TokenKind.Dot, position_end=make_position(), position_start=make_position()))
+                    self.advance()
                 case char if char.isdigit() or char == ".":
                     self.logger.debug("Found digit, parsing integer or float literal")
                     start = self.position
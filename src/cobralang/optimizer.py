@@ -0,0 +1,221 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+from hashlib import sha256
+from typing import Callable
+from .interpreter.interpreter import Node
+from .interpreter import nodes
+from .interpreter.nodes import Function, NativeModule, Block, StatementBlock
+from .interpreter.datatypes import ListLiteral, TupleLiteral, StringLiteral, IntegerLiteral, FloatLiteral, BooleanLiteral, NullLiteral, Set, native_key
+from .interpreter import binaryoperations
+from .interpreter.statements import ForStatement, YieldStatement
+from .interpreter.memo import LRUCache
+
+
+constant_literals = (StringLiteral, IntegerLiteral, FloatLiteral, BooleanLiteral, NullLiteral)
+# statements that add names to the scope they run in
+declarations = (nodes.VariableDeclaration, nodes.FunctionDefinition, nodes.StructDefinition, nodes.Import, nodes.NativeModule, nodes.Program)
+
+
+def transform(node, rewrite: Callable):
+    # Rewrites the tree bottom-up: children first, then rewrite(node) replaces the node itself.
+    match node:
+        case list():
+            return [transform(i, rewrite) for i in node]
+        case tuple():
+            return tuple(transform(i, rewrite) for i in node)
+        case dict():
+            return {k: transform(v, rewrite) for k, v in node.items()}
+        case NativeModule() | nodes.Import():
+            # modules are optimized when they are parsed
+            return node
+        case Node() | Function():
+            for name, child in vars(node).items():
+                setattr(node, name, transform(child, rewrite))
+            return rewrite(node) if isinstance(node, Node) else node
+    return node
+
+
+def fold_constant_membership(node: Node):
+    # x in [1, 2, 3] -> hash the literals once instead of building and scanning a list on every run
+    if isinstance(node, binaryoperations.In) and isinstance(node.right, ListLiteral | TupleLiteral) \
+            and all(isinstance(i, constant_literals) for i in node.right.elements):
+        keys = frozenset(native_key(i.run(None)) for i in node.right.elements)
+        return binaryoperations.InConstantSet(node.left, node.right, keys)
+    return node
+
+
+def elide_scope(node: Node):
+    # if/while bodies that declare nothing run in the enclosing scope instead of pushing one of their own
+    if type(node) is Block and not any(isinstance(i, declarations) for i in node.statements):
+        return StatementBlock(node.statements)
+    return node
+
+
+# builtins whose result only depends on their arguments
+pure_builtins = frozenset({"all", "any", "array", "bool", "filter", "float", "int", "len", "list", "map", "max", "mean", "min", "range", "reduce", "set", "str", "sum", "tuple", "type", "zip"})
+# builtins that call a function passed to them (by position or as key=), they are only as pure as that function
+higher_order_builtins = {"map": 0, "filter": 0, "reduce": 0, "min": "key", "max": "key", "any": "key", "all": "key"}
+auto_memo_size = 128
+
+
+def walk(node, into_functions: bool=False):
+    # every node in the tree, function definitions are yielded but their bodies are only entered with into_functions
+    match node:
+        case list() | tuple():
+            for i in node:
+                yield from walk(i, into_functions)
+        case dict():
+            for i in node.values():
+                yield from walk(i, into_functions)
+        case NativeModule() | nodes.Import():
+            yield node
+        case Function():
+            yield node
+            if into_functions:
+                for child in vars(node).values():
+                    yield from walk(child, into_functions)
+        case Node():
+            yield node
+            for child in vars(node).values():
+                yield from walk(child, into_functions)
+
+
+def local_names(function: Function) -> set[str]:
+    names = set(function.posargs) | set(function.kwargs) | {function.varargs, function.varkwargs}
+    for node in walk(function.body):
+        if isinstance(node, nodes.VariableDeclaration):
+            names.add(node.name)
+        elif isinstance(node, ForStatement):
+            names.update(variable.name for variable in node.variables)
+    return names
+
+
+def callback_of(call: nodes.FunctionCall):
+    position = higher_order_builtins[call.name]
+    if isinstance(position, int):
+        return call.args[position] if len(call.args) > position else None
+    return call.kwargs.get(position)
+
+
+def is_pure(function: Function, pure_names: set[str]) -> bool:
+    # pure: reads only its arguments, locals and constants, assigns only its locals, and calls only pure functions
+    if function.is_generator:
+        return False
+    local = local_names(function)
+    known = pure_names | pure_builtins
+    for node in walk(function.body):
+        match node:
+            case YieldStatement() | Function() | NativeModule() | nodes.Import():
+                return False
+            case nodes.Assignment() if not (isinstance(node.left, nodes.VariableReference) and node.left.name in local):
+                return False
+            case nodes.VariableReference() if node.name not in local and node.name not in known:
+                return False
+            case nodes.FunctionCall() if node.name not in known:
+                return False
+            case nodes.FunctionCall() if node.name in higher_order_builtins:
+                callback = callback_of(node)
+                if callback is not None and not (isinstance(callback, nodes.VariableReference) and callback.name not in local and callback.name in known):
+                    return False
+    return True
+
+
+def memoize_pure_functions(program: Node):
+    # caches every top level function that is found to be pure (--auto-memo)
+    definitions = [i.function for i in program.statements if isinstance(i, nodes.FunctionDefinition)]
+    names = [i.name for i in definitions]
+    # struct constructors and native module functions and constants are pure as well
+    constants = {i.struct.name for i in program.statements if isinstance(i, nodes.StructDefinition)}
+    constants.update(name for i in program.statements if isinstance(i, NativeModule) for name in [*i.functions, *i.variables])
+    # functions defined more than once can't be told apart by name
+    candidates = {i.name: i for i in definitions if names.count(i.name) == 1}
+    pure = set(candidates)
+    while True:
+        still_pure = {name for name in pure if is_pure(candidates[name], pure | constants)}
+        if still_pure == pure:
+            break
+        pure = still_pure
+    for name in pure:
+        if candidates[name].memo is None:
+            candidates[name].memo = LRUCache(auto_memo_size)
+    return program
+
+
+def index_dependencies(program: nodes.Program):
+    # for each top level statement of a module: the names it defines, the names it uses (function bodies included,
+    # since they look names up when they run) and whether it always has to run (see nodes.Module)
+    program.dependencies = []
+    for statement in program.statements:
+        match statement:
+            case nodes.FunctionDefinition():
+                defines = {statement.function.name}
+            case nodes.StructDefinition():
+                defines = {statement.struct.name}
+            case nodes.VariableDeclaration():
+                defines = {statement.name}
+            case _:
+                defines = set()
+        uses = set()
+        for node in walk(statement, into_functions=True):
+            match node:
+                case nodes.VariableReference():
+                    uses.add(node.name)
+                case nodes.FunctionCall():
+                    uses.add(node.name)
+        program.dependencies.append((defines, uses - defines, isinstance(statement, nodes.Import | NativeModule)))
+    return program
+
+
+def optimize(program: Node, auto_memo: bool=False):
+    program = transform(program, lambda node: elide_scope(fold_constant_membership(node)))
+    if auto_memo:
+        program = memoize_pure_functions(program)
+    return program
+
+
+def value_digest(value) -> str:
+    # sets print in hash order, which changes from one process to the next
+    if isinstance(value, Set):
+        return f"Set({sorted(map(repr, value))})"
+    return f"{type(value).__name__}({value!r})"
+
+
+def persistent_digest(function: Function, ctx) -> str:
+    # What the stored results of a @persist function depend on (see memo.PersistentCache): its source, the source of
+    # every user function it reaches as ctx resolves them, and the values of the globals they read when it is first
+    # called. Builtins and native modules are part of the interpreter and aren't hashed.
+    digest = sha256()
+    pending, seen = [function], set()
+
+    def reach(callee):
+        if isinstance(callee, Function) and callee is not ctx.builtins.get(callee.name):
+            pending.append(callee)
+
+    while pending:
+        function = pending.pop()
+        if id(function) in seen:
+            continue
+        seen.add(id(function))
+        described = function.digest if function.digest is not None else repr(getattr(function, "fields", None))
+        digest.update(f"fn {type(function).__name__} {function.name} {described}\n".encode())
+        local = local_names(function)
+        for node in walk(function.body):
+            if isinstance(node, nodes.FunctionCall):
+                try:
+                    reach(ctx.get_function(node.name))
+                except KeyError:
+                    pass
+            elif isinstance(node, nodes.VariableReference) and node.name not in local:
+                try:
+                    value = ctx[node.name]
+                except KeyError:
+                    # a function passed by name, e.g. map(double, values)
+                    try:
+                        reach(ctx.get_function(node.name))
+                    except KeyError:
+                        pass
+                    continue
+                if isinstance(value, Function):
+                    reach(value)
+                else:
+                    digest.update(f"let {node.name} {value_digest(value)}\n".encode())
+    return digest.hexdigest()
@@ -3,18 +3,146 @@ from . import lexer
 from .interpreter.datatypes import *
 from .interpreter.statements import *
 from .interpreter import nodes, binaryoperations, unaryoperations
+from .interpreter.memo import LRUCache, PersistentCache
+from . import optimizer, frozen
 from .interpreter.builtins import all_builtins
+from pathlib import Path
+from hashlib import sha256
 import logging
+import os
+
+
+# parsed module files, by path, modification time and auto_memo (see Parser.parse_module)
+parsed_modules = {}
+
+
+def import_paths(tokens: list[lexer.Token]) -> list[Path]:
+    # the files named by the import and from statements in a token stream
+    paths = []
+    for token, following in zip(tokens, tokens[1:]):
+        if token.kind in (lexer.TokenKind.Import, lexer.TokenKind.From) and following.kind == lexer.TokenKind.Identifier:
+            module = all_builtins.get(following.value)
+            if isinstance(module, nodes.NativeModule) or following.value in frozen.load_stdlib():
+                continue
+            paths.append(Path(module if module is not None else f"./{following.value}.cb").absolute())
+    return paths
+
+
+def token_digest(tokens: list[lexer.Token]) -> str:
+    # a digest of some source as its tokens: layout and comments don't change it, every parenthesis does
+    return sha256("\0".join(f"{token.kind.name}:{token.value}" for token in tokens).encode()).hexdigest()
+
+
+def find_cycle(graph: dict[Path, list[Path]]) -> list[Path] | None:
+    visiting, done = [], set()
+
+    def visit(path):
+        if path in visiting:
+            return visiting[visiting.index(path):] + [path]
+        if path in done or path not in graph:
+            return None
+        visiting.append(path)
+        for dependency in graph[path]:
+            cycle = visit(dependency)
+            if cycle is not None:
+                return cycle
+        visiting.pop()
+        done.add(path)
+        return None
+
+    for root in graph:
+        cycle = visit(root)
+        if cycle is not None:
+            return cycle
+    return None
+
+
+def read_module(path: Path) -> tuple[int, list[lexer.Token]]:
+    # may run in a worker process (see prefetch_modules)
+    mtime = path.stat().st_mtime_ns
+    with open(path, "r") as f:
+        code = f.read()
+    return mtime, lexer.Lexer(code, filename=f"<{path.name}>").tokenize()
+
+
+def read_or_none(path: Path) -> tuple[int, list[lexer.Token]] | None:
+    try:
+        return read_module(path)
+    except Exception:
+        return None
+
+
+# the bytes of source one level of the import graph needs before it is lexed in worker processes, below it starting
+# the workers costs more than lexing the level here (about 30 ms against 300 KB/s of lexing)
+parallel_threshold = 64 * 1024
+
+
+def prefetch_modules(roots: list[Path], auto_memo: bool=False, max_workers: int=None):
+    # Reads and lexes the whole import graph below roots, then parses the modules leaves first so each
+    # Parser.parse_module call (here and in the main parse) finds its module in parsed_modules. Levels of the graph
+    # with enough source are lexed in a process pool, parsing stays here since a module's tree holds the trees of the
+    # modules it imports. Failures are left for parse_module to raise where the import is.
+    def needs_parsing(path: Path):
+        return path.exists() and (str(path), path.stat().st_mtime_ns, auto_memo) not in parsed_modules
+
+    roots = [path for path in dict.fromkeys(roots) if needs_parsing(path)]
+    if not roots:
+        return
+    read_modules, graph = {}, {}
+    workers = max_workers or os.cpu_count() or 1
+    pool = None
+    try:
+        level = roots
+        while level:
+            results = map(read_or_none, level)
+            if workers > 1 and len(level) > 1 and sum(path.stat().st_size for path in level) >= parallel_threshold:
+                if pool is None:
+                    # imported here, it pulls in multiprocessing
+                    from concurrent.futures import ProcessPoolExecutor
+                    pool = ProcessPoolExecutor(workers)
+                results = pool.map(read_or_none, level)
+            for path, result in zip(level, results):
+                if result is not None:
+                    read_modules[path] = result
+                    graph[path] = [i for i in import_paths(result[1]) if needs_parsing(i)]
+            level = list(dict.fromkeys(i for path in level for i in graph.get(path, ()) if i not in graph))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    graph = {path: [i for i in dependencies if i in read_modules] for path, dependencies in graph.items()}
+    cycle = find_cycle(graph)
+    if cycle is not None:
+        raise ImportError(f"Circular import: {' -> '.join(path.name for path in cycle)}")
+    parsed = set()
+
+    def parse(path: Path):
+        if path in parsed:
+            return
+        parsed.add(path)
+        for dependency in graph[path]:
+            parse(dependency)
+        mtime, tokens = read_modules[path]
+        try:
+            program = Parser(tokens, filename=f"<{path.name}>", auto_memo=auto_memo).parse()
+        except Exception:
+            return
+        parsed_modules[(str(path), mtime, auto_memo)] = optimizer.index_dependencies(program)
+
+    for root in graph:
+        parse(root)
 
 
 class Parser:
-    def __init__(self, tokens: list[lexer.Token, ...], filename: str="<stdin>", logger: logging.Logger=None, logging_level: int=51, log_file: str=None):
+    def __init__(self, tokens: list[lexer.Token, ...], filename: str="<stdin>", logger: logging.Logger=None, logging_level: int=51, log_file: str=None, auto_memo: bool=False):
         self.tokens = tokens
         self.filename = filename
         self.log_file = log_file
+        self.auto_memo = auto_memo
         self.index = -1
         self.current_token = None
         self.next_token = None
+        # one entry per function being parsed, set once a yield is found in its body
+        self.generator_flags = []
         if logger is None:
             self.logger = logger
             self.logger = logging.getLogger("Parser")
@@ -64,7 +192,8 @@ class Parser:
             raise SyntaxError(f"{error_message}: {self.current_token} is not {kind}")
 
     def parse(self) -> nodes.Program:
-        return self.parse_program()
+        prefetch_modules(import_paths(self.tokens), self.auto_memo)
+        return optimizer.optimize(self.parse_program(), auto_memo=self.auto_memo)
 
     def parse_program(self) -> nodes.Program:
         block = []
@@ -101,6 +230,7 @@ class Parser:
                 return out
             case lexer.TokenKind.Fn:
                 self.logger.debug("Parsing function declaration")
+                start = self.index
                 self.advance()
                 name = self.current_token.value
                 self.consume(lexer.TokenKind.Identifier, "Expected identifier after 'fn' statement")
@@ -139,42 +269,96 @@ class Parser:
                         break
                 self.consume(lexer.TokenKind.RightParen, "Expected ')' after arguments in 'fn' statement")
                 self.consume(lexer.TokenKind.LeftBrace, "Expected '{' after arguments in 'fn' statement")
+                self.generator_flags.append(False)
                 body = nodes.StatementBlock(self.parse_block().statements)
+                is_generator = self.generator_flags.pop()
                 self.consume(lexer.TokenKind.RightBrace, "Expected '}' after function body in 'fn' statement")
-                out = nodes.FunctionDefinition(nodes.Function(name, args, varargs, {k:v for k,v in kwargs}, varkwargs, body))
+                digest = token_digest(self.tokens[start:self.index])
+                out = nodes.FunctionDefinition(nodes.Function(name, args, varargs, {k:v for k,v in kwargs}, varkwargs, body, is_generator, digest=digest))
+                self.logger.debug(f"Returning {out}")
+                return out
+            case lexer.TokenKind.At:
+                self.logger.debug("Parsing function annotation")
+                self.advance()
+                annotation = self.consume(lexer.TokenKind.Identifier, "Expected annotation name after '@'").value
+                if annotation not in ("cache", "memo", "persist"):
+                    raise SyntaxError(f"Unknown annotation @{annotation}")
+                maxsize = 128
+                if self.current_token is not None and self.current_token.kind == lexer.TokenKind.LeftParen:
+                    self.advance()
+                    if self.current_token is not None and self.current_token.kind == lexer.TokenKind.Identifier and self.current_token.value == "maxsize":
+                        self.advance()
+                        self.consume(lexer.TokenKind.Equal, "Expected '=' after 'maxsize'")
+                    size = self.parse_expression()
+                    if isinstance(size, IntegerLiteral):
+                        maxsize = size.value
+                    elif isinstance(size, NullLiteral):
+                        maxsize = None
+                    else:
+                        raise SyntaxError(f"Expected an integer or Null as the size of @{annotation}, got {size}")
+                    self.consume(lexer.TokenKind.RightParen, f"Expected ')' after @{annotation} size")
+                if self.current_token is None or self.current_token.kind != lexer.TokenKind.Fn:
+                    raise SyntaxError(f"Expected function definition after @{annotation}")
+                out = self.parse_statement()
+                if out.function.is_generator:
+                    raise SyntaxError(f"Generator function {out.function.name} can't be cached")
+                if annotation == "persist":
+                    out.function.memo = PersistentCache(maxsize)
+                else:
+                    out.function.memo = LRUCache(maxsize)
+                self.logger.debug(f"Returning {out}")
+                return out
+            case lexer.TokenKind.Struct:
+                self.logger.debug("Parsing struct declaration")
+                self.advance()
+                name = self.current_token.value
+                self.consume(lexer.TokenKind.Identifier, "Expected identifier after 'struct' statement")
+                self.consume(lexer.TokenKind.LeftBrace, "Expected '{' after identifier in 'struct' statement")
+                fields = []
+                while self.current_token is not None and self.current_token.kind != lexer.TokenKind.RightBrace:
+                    field = self.consume(lexer.TokenKind.Identifier, "Expected field name in 'struct' statement").value
+                    if field in fields:
+                        raise SyntaxError(f"Duplicate field {field} in struct {name}")
+                    fields.append(field)
+                    if self.current_token is not None and self.current_token.kind == lexer.TokenKind.Comma:
+                        self.advance()
+                    else:
+                        break
+                self.consume(lexer.TokenKind.RightBrace, "Expected '}' after fields in 'struct' statement")
+                out = nodes.StructDefinition(nodes.StructType(name, fields))
                 self.logger.debug(f"Returning {out}")
                 return out
             case lexer.TokenKind.Import:
                 self.logger.debug("Parsing import statement")
                 self.advance()
-                from pathlib import Path
-                if self.current_token is not None and self.current_token.value in all_builtins:
+                if self.current_token is not None and isinstance(all_builtins.get(self.current_token.value), nodes.NativeModule):
+                    out = all_builtins[self.current_token.value]
+                    self.advance()
+                    self.logger.debug(f"Returning {out}")
+                    return out
+                elif self.current_token is not None and self.current_token.value in all_builtins:
                     name = all_builtins[self.current_token.value]
                 elif self.current_token is not None:
                     name = "./" + self.current_token.value + ".cb"
                     self.logger.debug(f"Attempting to locate file {name}")
                 else:  # included so type hinting doesn't complain, will never use this value of name
                     name = None
-                self.consume(lexer.TokenKind.Identifier, "Expected identifier after 'import' statement")
+                module = self.consume(lexer.TokenKind.Identifier, "Expected identifier after 'import' statement").value
+                program = self.parse_frozen(module)
+                if program is not None:
+                    out = nodes.Import(module, str(Path(name).absolute()), program)
+                    self.logger.debug(f"Returning {out}")
+                    return out
                 path = Path(name).absolute()
                 if not path.exists():
                     raise FileNotFoundError(f"File {name} not found")
                 self.logger.debug(f"File {name} found")
-                self.logger.debug(f"Attempting to parse file {name}")
-                with open(path, "r") as f:
-                    code = f.read()
-                _lexer = lexer.Lexer(code, filename=f"<name>", logger=self.logger, logging_level=self.logger.getEffectiveLevel(), log_file=self.log_file)
-                # insert tokens into token list
-                # tmp = "[\n" + "\n".join([repr(token) for token in self.tokens]) + "\n]"
-                tokens = _lexer.tokenize()
-                self.tokens = self.tokens[:self.index] + tokens + self.tokens[self.index:]
-                self.advance(0)
-                self.logger.debug(f"File {name} added to token list")
-                return self.parse_statement()
+                out = nodes.Import(module, str(path), self.parse_module(path))
+                self.logger.debug(f"Returning {out}")
+                return out
             case lexer.TokenKind.From:
                 self.logger.debug("Parsing from statement")
                 self.advance()
-                from pathlib import Path
                 name = self.current_token.value
                 module = self.current_token.value
                 if module in all_builtins:
@@ -183,7 +367,13 @@ class Parser:
                     module = "./" + self.current_token.value + ".cb"
                 self.consume(lexer.TokenKind.Identifier, "Expected identifier after 'from' statement")
                 self.logger.debug(f"Attempting to locate file {module}")
-                path = Path(module).absolute()
+                frozen_program = self.parse_frozen(name)
+                path = Path(module).absolute() if not isinstance(module, nodes.NativeModule) else None
+                if frozen_program is not None:
+                    program, filename = frozen_program, str(path)
+                    path = None
+                if path is not None and not path.exists():
+                    raise FileNotFoundError(f"File {module} not found")
                 self.consume(lexer.TokenKind.Import, "Expected 'import' after 'from' statement")
                 if self.current_token is not None and self.current_token.kind == lexer.TokenKind.Fn:
                     func = True
@@ -204,14 +394,14 @@ class Parser:
                     self.consume(lexer.TokenKind.RightParen, "Expected ')' after from statement")
                 else:
                     names.append(self.parse_atom().name)
-                with open(path, "r") as f:
-                    code = f.read()
-                tokens = lexer.Lexer(code, filename=f"<{module}>", logger=self.logger, logging_level=self.logger.getEffectiveLevel(), log_file=self.log_file).tokenize()
-                program = Parser(tokens, logger=self.logger, logging_level=self.logger.getEffectiveLevel(), log_file=self.log_file).parse()
+                if isinstance(module, nodes.NativeModule):
+                    program, filename = module, module.name
+                elif path is not None:
+                    program, filename = self.parse_module(path), str(path)
                 if func:
-                    out = nodes.FromImportFn(name, module, program, names)
+                    out = nodes.FromImportFn(name, filename, program, names)
                 else:
-                    out = nodes.FromImportVar(name, module, program, names)
+                    out = nodes.FromImportVar(name, filename, program, names)
                 return out
             # case lexer.TokenKind.Print:
             #     self.logger.debug("Parsing print statement")
@@ -227,6 +417,15 @@ class Parser:
                 out = ReturnStatement(self.parse_expression())
                 self.logger.debug(f"Returning {out}")
                 return out
+            case lexer.TokenKind.Yield:
+                self.logger.debug("Parsing yield statement")
+                if not self.generator_flags:
+                    raise SyntaxError("'yield' outside of a function")
+                self.generator_flags[-1] = True
+                self.advance()
+                out = YieldStatement(self.parse_expression())
+                self.logger.debug(f"Returning {out}")
+                return out
             case lexer.TokenKind.Break:
                 self.logger.debug("Parsing break statement")
                 self.advance()
@@ -274,26 +473,62 @@ class Parser:
             case lexer.TokenKind.For:
                 self.logger.debug("Parsing for statement")
                 self.advance()
-                names = []
-                if self.current_token is not None and self.current_token.kind == lexer.TokenKind.LeftParen:
-                    self.advance()
-                    while self.current_token is not None and self.current_token.kind != lexer.TokenKind.RightParen:
-                        names.append(self.parse_expression())
-                        if self.current_token is not None and self.current_token.kind == lexer.TokenKind.Comma:
-                            self.advance()
-                        else:
-                            break
-                    self.consume(lexer.TokenKind.RightParen, "Expected ')' after for statement")
-                else:
-                    names.append(self.parse_atom())
-                self.consume(lexer.TokenKind.In, "Expected 'in' after for statement")
-                iterable = self.parse_expression()
+                names, iterable = self.parse_for_clause()
                 self.consume(lexer.TokenKind.LeftBrace, "Expected '{' after for statement")
                 body = nodes.StatementBlock(self.parse_block().statements)
                 self.consume(lexer.TokenKind.RightBrace, "Expected '}' after for statement")
                 return ForStatement(names, iterable, body)
         return self.parse_assignment()
 
+    def parse_module(self, path) -> nodes.Program:
+        # each module file is only parsed once, until it changes
+        key = (str(path), path.stat().st_mtime_ns, self.auto_memo)
+        if key not in parsed_modules:
+            self.logger.debug(f"Attempting to parse file {path}")
+            with open(path, "r") as f:
+                code = f.read()
+            tokens = lexer.Lexer(code, filename=f"<{path.name}>", logger=self.logger, logging_level=self.logger.getEffectiveLevel(), log_file=self.log_file).tokenize()
+            program = Parser(tokens, filename=f"<{path.name}>", logger=self.logger, logging_level=self.logger.getEffectiveLevel(), log_file=self.log_file, auto_memo=self.auto_memo).parse()
+            parsed_modules[key] = optimizer.index_dependencies(program)
+        return parsed_modules[key]
+
+    def parse_frozen(self, name: str) -> nodes.Program | None:
+        # standard library modules come precompiled (see frozen), None for everything else
+        key = (f"<frozen {name}>", frozen.format_version, self.auto_memo)
+        if key not in parsed_modules:
+            program = frozen.frozen_program(name)
+            if program is None:
+                return None
+            parsed_modules[key] = optimizer.memoize_pure_functions(program) if self.auto_memo else program
+        return parsed_modules[key]
+
+    def parse_for_clause(self, allow_conditional: bool=True) -> tuple[list[Node], Node]:
+        # the 'x in iterable' or '(a, b) in iterable' following 'for', in for statements and comprehensions
+        names = []
+        if self.current_token is not None and self.current_token.kind == lexer.TokenKind.LeftParen:
+            self.advance()
+            while self.current_token is not None and self.current_token.kind != lexer.TokenKind.RightParen:
+                names.append(self.parse_expression())
+                if self.current_token is not None and self.current_token.kind == lexer.TokenKind.Comma:
+                    self.advance()
+                else:
+                    break
+            self.consume(lexer.TokenKind.RightParen, "Expected ')' after for statement")
+        else:
+            names.append(self.parse_atom())
+        self.consume(lexer.TokenKind.In, "Expected 'in' after for statement")
+        return names, self.parse_expression() if allow_conditional else self.parse_or()
+
+    def parse_comprehension_clause(self) -> tuple[list[Node], Node, Node | None]:
+        self.consume(lexer.TokenKind.For, "Expected 'for' in comprehension")
+        # the iterable and condition can't be conditional expressions, the 'if' belongs to the comprehension
+        names, iterable = self.parse_for_clause(allow_conditional=False)
+        condition = None
+        if self.current_token is not None and self.current_token.kind == lexer.TokenKind.If:
+            self.advance()
+            condition = self.parse_or()
+        return names, iterable, condition
+
     def parse_assignment(self) -> Node:
         left = self.parse_expression()
         if self.current_token is not None and self.current_token.kind in (lexer.TokenKind.Equal, lexer.TokenKind.PlusEqual, lexer.TokenKind.MinusEqual, lexer.TokenKind.MultiplyEqual, lexer.TokenKind.DivideEqual, lexer.TokenKind.PlusPlus, lexer.TokenKind.MinusMinus, lexer.TokenKind.ModEqual):
@@ -328,22 +563,35 @@ class Parser:
         return left
 
     def parse_expression(self) -> Node:
-        left = self.parse_comparison()
-        if self.current_token is not None and self.current_token.kind == lexer.TokenKind.Or:
+        out = self.parse_or()
+        # a if condition else b, an 'if' on the next line starts an if statement instead
+        if self.current_token is not None and self.current_token.kind == lexer.TokenKind.If and not self.tokens[self.index-1].newline_after:
             self.advance()
-            right = self.parse_comparison()
-            out = binaryoperations.Or(left, right)
-        elif self.current_token is not None and self.current_token.kind == lexer.TokenKind.And:
+            condition = self.parse_or()
+            self.consume(lexer.TokenKind.Else, "Expected 'else' in conditional expression")
+            out = nodes.ConditionalExpression(condition, out, self.parse_expression())
+        return out
+
+    def parse_or(self) -> Node:
+        left = self.parse_and()
+        while self.current_token is not None and self.current_token.kind == lexer.TokenKind.Or:
             self.advance()
-            right = self.parse_comparison()
-            out = binaryoperations.And(left, right)
-        elif self.current_token is not None and self.current_token.kind == lexer.TokenKind.In:
+            left = binaryoperations.Or(left, self.parse_and())
+        return left
+
+    def parse_and(self) -> Node:
+        left = self.parse_membership()
+        while self.current_token is not None and self.current_token.kind == lexer.TokenKind.And:
             self.advance()
-            right = self.parse_comparison()
-            out = binaryoperations.In(left, right)
-        else:
-            out = left
-        return out
+            left = binaryoperations.And(left, self.parse_membership())
+        return left
+
+    def parse_membership(self) -> Node:
+        left = self.parse_comparison()
+        if self.current_token is not None and self.current_token.kind == lexer.TokenKind.In:
+            self.advance()
+            left = binaryoperations.In(left, self.parse_comparison())
+        return left
 
     def parse_comparison(self) -> Node:
         left = self.parse_additive()
@@ -404,17 +652,21 @@ class Parser:
 
     def parse_atom_subscript(self) -> Node:
         left = self.parse_atom()
-        while self.current_token is not None and self.current_token.kind == lexer.TokenKind.LeftBracket:
+        while self.current_token is not None and self.current_token.kind in (lexer.TokenKind.LeftBracket, lexer.TokenKind.Dot) and not self.tokens[self.index-1].newline_after:
+            if self.current_token.kind == lexer.TokenKind.Dot:
+                self.advance()
+                left = nodes.FieldAccess(left, self.consume(lexer.TokenKind.Identifier, "Expected field name after '.'").value)
+                continue
             self.advance()
-            start, stop = NullLiteral(), NullLiteral()
+            start, stop = NullLiteral(), None
             if self.current_token is not None and self.current_token.kind != lexer.TokenKind.Colon:
                 start = self.parse_expression()
-                stop = start
             if self.current_token is not None and self.current_token.kind == lexer.TokenKind.Colon:
                 self.advance()
+                stop = NullLiteral()
                 if self.current_token is not None and self.current_token.kind != lexer.TokenKind.RightBracket:
                     stop = self.parse_expression()
-            if start == stop:
+            if stop is None:
                 left = nodes.Subscript(left, start)
             else:
                 left = nodes.Subscript(left, SliceLiteral(start, stop))
@@ -523,6 +775,11 @@ class Parser:
                 elements = []
                 while self.current_token is not None and self.current_token.kind != lexer.TokenKind.RightBracket:
                     elements.append(self.parse_expression())
+                    if len(elements) == 1 and self.current_token is not None and self.current_token.kind == lexer.TokenKind.For:
+                        out = ListComprehension(elements[0], *self.parse_comprehension_clause())
+                        self.consume(lexer.TokenKind.RightBracket, "Expected ']' after list comprehension")
+                        self.logger.debug(f"Returning {out}")
+                        return out
                     if self.current_token is not None and self.current_token.kind == lexer.TokenKind.Comma:
                         self.advance()
                     else:
@@ -534,17 +791,28 @@ class Parser:
             case lexer.TokenKind.LeftBrace:
                 self.advance()
                 elements = []
+                is_set = False
                 while self.current_token is not None and self.current_token.kind != lexer.TokenKind.RightBrace:
                     key = self.parse_expression()
-                    self.consume(lexer.TokenKind.Colon, "Expected ':' after key in dictionary")
-                    value = self.parse_expression()
-                    elements.append((key, value))
+                    if not elements and self.current_token is not None and self.current_token.kind != lexer.TokenKind.Colon:
+                        is_set = True
+                    if is_set:
+                        elements.append(key)
+                    else:
+                        self.consume(lexer.TokenKind.Colon, "Expected ':' after key in dictionary")
+                        value = self.parse_expression()
+                        if not elements and self.current_token is not None and self.current_token.kind == lexer.TokenKind.For:
+                            out = DictComprehension(key, value, *self.parse_comprehension_clause())
+                            self.consume(lexer.TokenKind.RightBrace, "Expected '}' after dictionary comprehension")
+                            self.logger.debug(f"Returning {out}")
+                            return out
+                        elements.append((key, value))
                     if self.current_token is not None and self.current_token.kind == lexer.TokenKind.Comma:
                         self.advance()
                     else:
                         break
-                self.consume(lexer.TokenKind.RightBrace, "Expected '}' after dictionary")
-                out = DictionaryLiteral(elements)
+                self.consume(lexer.TokenKind.RightBrace, "Expected '}' after set" if is_set else "Expected '}' after dictionary")
+                out = SetLiteral(elements) if is_set else DictionaryLiteral(elements)
                 self.logger.debug(f"Returning {out}")
                 return out
         raise SyntaxError(f"Unexpected token: {self.current_token} {self.current_token.position_end}:{self.current_token.position_end}")
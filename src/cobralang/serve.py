@@ -0,0 +1,242 @@
+# This code is licensed under the MIT License (see LICENSE file for details)
+"""
+A script execution daemon, for running many short scripts without paying interpreter startup for each one.
+
+    cobra serve --workers 4           listen on the default socket
+    cobra submit script.cb            run a script on the server
+    cobra submit -c "print(1)"        run the given code on the server
+
+The server keeps a pool of worker processes which have the standard library loaded and cache every program they
+compile (by source, and by path and modification time for files), so a job only runs what is new. Each job runs in a
+fresh context with its stdout and stderr captured, and a job that runs past its timeout has its worker killed and
+replaced.
+
+Clients talk to the server over a Unix socket, one JSON object per line each way. A job names either the source or
+the path of the script to run, and optionally the directory its imports resolve from and a timeout in seconds:
+
+    {"source": "print(1)", "cwd": "/home/me", "timeout": 5}
+
+and is answered with:
+
+    {"ok": true, "result": null, "stdout": "1\\n", "stderr": "", "error": null, "exit_code": null, "elapsed": 0.00004}
+
+where exit_code is the code given to exit() by a script that called it (its job is ok when that code is 0).
+
+A connection can submit any number of jobs one after the other (see Client).
+"""
+import atexit
+import io
+import json
+import os
+import queue
+import socket
+import socketserver
+import tempfile
+from contextlib import redirect_stdout, redirect_stderr
+from pathlib import Path
+from time import perf_counter
+from .api import Interpreter, ScriptExit
+
+
+default_socket = Path(tempfile.gettempdir(), f"cobra-{os.getuid()}.sock")
+
+
+def failure(error: str) -> dict:
+    return {"ok": False, "result": None, "stdout": "", "stderr": "", "error": error, "exit_code": None, "elapsed": 0.0}
+
+
+def compile_job(interpreter: Interpreter, job: dict):
+    # compiled programs are cached by source, or by path and modification time so an edited file is compiled again
+    if job.get("source") is not None:
+        key = job["source"]
+    elif job.get("path") is not None:
+        path = Path(job["path"])
+        key = (str(path.absolute()), path.stat().st_mtime_ns)
+    else:
+        raise ValueError("A job needs either a source or a path")
+    program = interpreter.compiled.get(key)
+    if program is None:
+        program = interpreter.compile(key) if isinstance(key, str) else interpreter.compile_file(path)
+        interpreter.compiled.put(key, program)
+    return program
+
+
+def run_job(interpreter: Interpreter, job: dict) -> dict:
+    stdout, stderr = io.StringIO(), io.StringIO()
+    result, error, code = None, None, None
+    start = perf_counter()
+    try:
+        if job.get("cwd") is not None:
+            os.chdir(job["cwd"])
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            output = compile_job(interpreter, job).run(raw=True)
+        result = None if output is None else str(output)
+    except ScriptExit as e:
+        # the script ended itself, the worker goes on to the next job
+        code = e.code
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    ok = error is None and code in (None, 0)
+    return {"ok": ok, "result": result, "stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "error": error, "exit_code": code, "elapsed": perf_counter() - start}
+
+
+def worker_main(conn, auto_memo: bool, cache_size: int):
+    # the body of a worker process: warm up, then run the jobs sent down conn until the server closes it
+    from . import frozen
+    from .parser import Parser
+    interpreter = Interpreter(auto_memo=auto_memo, cache_size=cache_size)
+    for name in frozen.load_stdlib():
+        Parser([], auto_memo=auto_memo).parse_frozen(name)
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        conn.send(run_job(interpreter, job))
+
+
+class Worker:
+    # Not a daemon process, the imports of a job may be lexed in a process pool (see parser.prefetch_modules) which
+    # daemons can't start. The pool stops its workers when it closes, and a worker whose server went away without
+    # closing it exits once its end of the pipe closes.
+    def __init__(self, context, auto_memo: bool, cache_size: int):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child, auto_memo, cache_size))
+        self.process.start()
+        child.close()
+
+    def __repr__(self):
+        return f"Worker({self.process.pid})"
+
+    def stop(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    # Jobs go to whichever worker is idle, and wait for one when all of them are busy. Workers are started by a fork
+    # server which has this module imported, so replacing a killed worker doesn't import the interpreter again.
+    def __init__(self, workers: int, auto_memo: bool=False, cache_size: int=128):
+        import multiprocessing
+        self.context = multiprocessing.get_context("forkserver")
+        self.context.set_forkserver_preload([__name__])
+        self.auto_memo = auto_memo
+        self.cache_size = cache_size
+        self.size = workers
+        self.workers = set()
+        self.closed = False
+        self.idle = queue.SimpleQueue()
+        for _ in range(workers):
+            self.idle.put(self.start_worker())
+        # multiprocessing waits for non-daemon processes at exit, they are stopped first
+        atexit.register(self.close)
+
+    def __repr__(self):
+        return f"WorkerPool({self.size} workers)"
+
+    def start_worker(self) -> Worker:
+        worker = Worker(self.context, self.auto_memo, self.cache_size)
+        self.workers.add(worker)
+        return worker
+
+    def run(self, job: dict, timeout: float=None) -> dict:
+        worker = self.idle.get()
+        try:
+            worker.conn.send(job)
+            if timeout is None or worker.conn.poll(timeout):
+                result = worker.conn.recv()
+                self.idle.put(worker)
+                return result
+            error = f"TimeoutError: the job ran for more than {timeout}s"
+        except (EOFError, OSError) as e:
+            error = f"WorkerError: the worker running the job exited ({e!r})"
+        # whatever the job was doing is thrown away with its worker
+        worker.stop()
+        self.workers.discard(worker)
+        if not self.closed:
+            self.idle.put(self.start_worker())
+        return failure(error)
+
+    def close(self):
+        # busy workers are stopped too, their jobs fail
+        self.closed = True
+        atexit.unregister(self.close)
+        for worker in list(self.workers):
+            worker.stop()
+        self.workers.clear()
+
+
+class Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                job = json.loads(line)
+                if not isinstance(job, dict):
+                    raise ValueError("A job must be a JSON object")
+            except ValueError as e:
+                result = failure(f"{type(e).__name__}: {e}")
+            else:
+                result = self.server.pool.run(job, job.get("timeout", self.server.job_timeout))
+            self.wfile.write(json.dumps(result).encode() + b"\n")
+
+
+def remove_stale_socket(path: Path):
+    # a socket file left behind by a server that is gone is removed, one that still answers is an error
+    if not path.exists():
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except (ConnectionRefusedError, FileNotFoundError):
+        path.unlink(missing_ok=True)
+        return
+    finally:
+        probe.close()
+    raise OSError(f"A server is already listening on {path}")
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str | Path=default_socket, workers: int=None, timeout: float=None, auto_memo: bool=False):
+        self.path = Path(path)
+        remove_stale_socket(self.path)
+        super().__init__(str(self.path), Handler)
+        # the timeout of jobs that don't give their own, None for no timeout
+        self.job_timeout = timeout
+        self.pool = WorkerPool(workers or os.cpu_count() or 1, auto_memo)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.close()
+        self.path.unlink(missing_ok=True)
+
+
+class Client:
+    # one connection to a server, jobs are submitted one after the other
+    def __init__(self, path: str | Path=default_socket):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(str(path))
+        self.file = self.socket.makefile("rb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def submit(self, source: str=None, path: str | Path=None, cwd: str | Path=None, timeout: float=None) -> dict:
+        # relative paths are resolved here, the server runs from a directory of its own
+        job = {"source": source, "path": str(Path(path).absolute()) if path is not None else None, "cwd": str(Path(cwd or os.getcwd()).absolute())}
+        if timeout is not None:
+            job["timeout"] = timeout
+        self.socket.sendall(json.dumps(job).encode() + b"\n")
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("The server closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
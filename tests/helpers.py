@@ -0,0 +1,31 @@
+import os
+import tempfile
+import unittest
+from src.cobralang import parser
+from src.cobralang import lexer
+from src.cobralang.interpreter.interpreter import Context
+
+
+def parse(text: str, auto_memo: bool = False):
+    tokens = lexer.Lexer(text, "<stdin>").tokenize()
+    return parser.Parser(tokens, "<stdin>", auto_memo=auto_memo).parse()
+
+
+def run(text: str, ctx: Context = None, auto_memo: bool = False):
+    return parse(text, auto_memo).run(ctx if ctx is not None else Context())
+
+
+class DirectoryTestCase(unittest.TestCase):
+    # runs every test from a temporary directory, where the modules it imports are written
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def write(self, name: str, text: str):
+        with open(name, "w") as file:
+            file.write(text)
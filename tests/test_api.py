@@ -0,0 +1,94 @@
+import unittest
+from src.cobralang.api import Interpreter, ScriptExit
+from src.cobralang.interpreter.datatypes import Integer
+from tests.helpers import DirectoryTestCase
+
+
+class TestEmbedding(unittest.TestCase):
+    def test_compiled_program_runs_many_times(self):
+        program = Interpreter().compile("fn area(r) {\n    return 3 * r * r\n}\narea(radius)")
+        self.assertEqual([3, 12, 27], [program.run(variables={"radius": r}) for r in (1, 2, 3)])
+
+    def test_default_arguments_are_evaluated_each_run(self):
+        program = Interpreter().compile("fn f(a, b=scale * 2) {\n    return a + b\n}\n[f(1), f(1, b=0)]")
+        self.assertEqual([[3, 1], [5, 1]], [program.run(variables={"scale": s}) for s in (1, 2)])
+
+    def test_results_are_python_values(self):
+        interpreter = Interpreter()
+        self.assertEqual({"a": (1, 2.5), "b": [True, None, "c"]}, interpreter.run('{"a": (1, 2.5), "b": [True, Null, "c"]}'))
+        self.assertEqual({"x": 1}, interpreter.run("struct P { x }\nP(1)"))
+        self.assertEqual(Integer(2), interpreter.run("1 + 1", raw=True))
+
+    def test_injected_functions(self):
+        interpreter = Interpreter(variables={"scale": 10}, functions={"double": lambda x: x * 2})
+        self.assertEqual(40, interpreter.run("double(scale * 2)"))
+        self.assertEqual("abab", interpreter.run("twice(s)", variables={"s": "ab"}, functions={"twice": lambda s: s * 2}))
+
+    def test_injected_values_are_fresh_for_each_run(self):
+        interpreter = Interpreter(variables={"items": [1]})
+        program = interpreter.compile("append(items, 2)\nitems")
+        self.assertEqual([1, 2], program.run())
+        self.assertEqual([1, 2], program.run())
+
+    def test_provided_context_keeps_state(self):
+        interpreter = Interpreter()
+        ctx = interpreter.context()
+        interpreter.run("let total = 1", ctx)
+        interpreter.run("total += 2", ctx)
+        self.assertEqual(3, interpreter.run("total", ctx))
+
+    def test_exit_raises_script_exit(self):
+        interpreter = Interpreter()
+        for source, code in (("exit(3)", 3), ("exit(code=2)", 2), ("exit()", 0)):
+            with self.assertRaises(ScriptExit) as raised:
+                interpreter.run(f"print(1)\n{source}\nprint(2)")
+            self.assertEqual(code, raised.exception.code)
+        self.assertEqual(2, interpreter.run("1 + 1"))
+
+    def test_run_compiles_each_source_once(self):
+        interpreter = Interpreter()
+        for _ in range(3):
+            interpreter.run("1 + 1")
+        self.assertEqual(1, interpreter.compiled.misses)
+        self.assertEqual(2, interpreter.compiled.hits)
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.program = Interpreter(variables={"rate": 2, "seen": []}).compile("append(seen, x)\nlet total = x * rate\n[total, len(seen)]")
+
+    def test_records(self):
+        self.assertEqual([[2, 1], [4, 1], [6, 1]], list(self.program.run_batch([{"x": 1}, {"x": 2}, {"x": 3}])))
+
+    def test_columns(self):
+        self.assertEqual([[0, 1], [3, 1]], list(self.program.run_batch(columns={"x": [0, 1], "rate": [5, 3]})))
+
+    def test_results_stream(self):
+        results = self.program.run_batch({"x": i} for i in range(10 ** 9))
+        self.assertEqual([[0, 1], [2, 1]], [next(results), next(results)])
+
+    def test_records_do_not_see_each_other(self):
+        program = Interpreter().compile("if (x == 1) {\n    set_global(\"leaked\", 1)\n}\nleaked")
+        results = program.run_batch([{"x": 1}, {"x": 2}])
+        self.assertEqual(1, next(results))
+        with self.assertRaises(KeyError):
+            next(results)
+
+    def test_exit_in_a_record(self):
+        results = Interpreter().compile("if (x == 2) {\n    exit(x)\n}\nx").run_batch(columns={"x": [1, 2]})
+        self.assertEqual(1, next(results))
+        with self.assertRaises(ScriptExit):
+            next(results)
+
+    def test_workers(self):
+        results = list(self.program.run_batch(columns={"x": range(100)}, workers=2, chunksize=16))
+        self.assertEqual([[2 * x, 1] for x in range(100)], results)
+
+
+class TestBatchImports(DirectoryTestCase):
+    def test_module_state_is_fresh_for_each_record(self):
+        self.write("lib.cb", "let table = []\nfn add(x) {\n    append(table, x)\n    return len(table)\n}\n")
+        program = Interpreter().compile("import lib\nadd(x)")
+        records = [{"x": x} for x in range(3)]
+        self.assertEqual([1, 1, 1], [program.run(variables=record) for record in records])
+        self.assertEqual([1, 1, 1], list(program.run_batch(records)))
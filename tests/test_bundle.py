@@ -0,0 +1,36 @@
+import os
+from pathlib import Path
+from zipfile import ZipFile
+from src.cobralang import bundle
+from src.cobralang.interpreter.interpreter import Context
+from src.cobralang.interpreter import nodes
+from tests.helpers import DirectoryTestCase
+
+
+class TestBundle(DirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        for name, text in (("main.cb", "import helper\nfrom inner import var base\nfrom utils import fn join\njoin(\"-\", [str(twice(3)), str(base)])\n"),
+                           ("helper.cb", "import inner\nfn twice(x) {\n    return x * base\n}\n"),
+                           ("inner.cb", "let base = 2\n")):
+            self.write(name, text)
+
+    def test_bundle_runs_without_sources(self):
+        manifest = bundle.build(Path("main.cb"), Path("app.cbz"))
+        self.assertEqual({"modules/helper.pickle": "helper.cb", "modules/inner.pickle": "inner.cb"}, manifest["modules"])
+        for name in ("main.cb", "helper.cb", "inner.cb"):
+            os.remove(name)
+        self.assertEqual("6-2", bundle.load(Path("app.cbz")).run(Context()).value)
+
+    def test_modules_are_stored_once(self):
+        bundle.build(Path("main.cb"), Path("app.cbz"))
+        program = bundle.load(Path("app.cbz"))
+        imports = [i for i in program.statements if isinstance(i, nodes.Import)]
+        inner = imports[0].program.statements[0].program
+        self.assertIs(inner, imports[1].program)
+
+    def test_unknown_format_is_rejected(self):
+        with ZipFile("app.cbz", "w") as archive:
+            archive.writestr("manifest.json", '{"format": 0, "entry": "entry.pickle"}')
+        with self.assertRaises(ValueError):
+            bundle.load(Path("app.cbz"))
@@ -0,0 +1,55 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from time import perf_counter
+from src.cobralang import cli
+from src.cobralang.interpreter.interpreter import Context
+from tests.helpers import run
+
+
+class TestStartup(unittest.TestCase):
+    # the startup budget documented in the README: cobra -c 'print(1)' starts, runs and exits within this many seconds
+    # more than `python -c pass` takes on the same machine
+    BUDGET = 0.25
+    ROOT = Path(__file__).parent.parent
+
+    def cobra(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, str(self.ROOT.joinpath("src", "cobralang.py")), *args], capture_output=True, text=True,
+                              env={**os.environ, "PYTHONPATH": str(self.ROOT)}, check=True)
+
+    def best_time(self, command, runs: int=5) -> float:
+        # the fastest of a few runs, the others measure whatever else the machine was doing
+        timings = []
+        for _ in range(runs):
+            start = perf_counter()
+            command()
+            timings.append(perf_counter() - start)
+        return min(timings)
+
+    def test_c_runs_within_budget(self):
+        self.assertEqual("1\n", self.cobra("-c", "print(1)").stdout)
+        python = self.best_time(lambda: subprocess.run([sys.executable, "-c", "pass"], check=True))
+        cobra = self.best_time(lambda: self.cobra("-c", "print(1)"))
+        self.assertLess(cobra - python, self.BUDGET)
+
+    def test_importing_the_runner_is_cheap(self):
+        check = "import sys, src.cobralang.cli\nprint(sorted({'multiprocessing', 'zipfile', 'sqlite3', 'statistics', 'random'} & set(sys.modules)))"
+        result = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, cwd=self.ROOT, check=True)
+        self.assertEqual("[]\n", result.stdout)
+
+    def test_main(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(0, cli.main(["-c", "1 + 1"]))
+        self.assertEqual("2\n", output.getvalue())
+
+    def test_builtins_are_shared(self):
+        ctx = Context()
+        self.assertEqual({}, ctx.scopes[0].functions)
+        self.assertIs(Context().get_function("len"), ctx.get_function("len"))
+        self.assertEqual(5, run("fn len(x) {\n    return 5\n}\nlen([1])", ctx).value)
+        self.assertEqual(1, run("len([1])").value)
@@ -0,0 +1,39 @@
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+from src.cobralang import parser
+from src.cobralang import frozen
+from src.cobralang.interpreter.builtins import all_builtins
+from src.cobralang.interpreter.interpreter import Context
+from tests.helpers import parse, run
+
+
+class TestFrozen(unittest.TestCase):
+    def test_bundle_is_up_to_date(self):
+        stdlib = frozen.load_stdlib()
+        sources = {name: path for name, path in all_builtins.items() if isinstance(path, Path)}
+        self.assertEqual(set(sources), set(stdlib), "rebuild it with python -m src.cobralang.frozen")
+        for name, path in sources.items():
+            self.assertEqual(frozen.source_digest(path), stdlib[name][0], "rebuild it with python -m src.cobralang.frozen")
+
+    def test_import_loads_the_frozen_program(self):
+        self.assertEqual("a-b", run('import utils\njoin("-", split(" ", "a b"))').value)
+        self.assertEqual("a", run('from utils import fn join\njoin("-", ["a"])').value)
+        self.assertIn(("<frozen utils>", frozen.format_version, False), parser.parsed_modules)
+        self.assertNotIn(str(all_builtins["utils"]), {key[0] for key in parser.parsed_modules})
+
+    def test_edited_sources_are_parsed_instead(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = Path(directory, "utils.cb")
+            source.write_text("fn edited() {\n    return 1\n}\n")
+            # parsed_modules may hold the frozen program from an earlier test, a new process doesn't
+            with mock.patch.dict(all_builtins, {"utils": source}), mock.patch.object(frozen, "stdlib_modules", None), \
+                    mock.patch.dict(parser.parsed_modules, clear=True):
+                self.assertNotIn("utils", frozen.load_stdlib())
+                self.assertEqual(1, run("import utils\nedited()").value)
+
+    def test_programs_round_trip(self):
+        text = "import math\nstruct P { x }\nfn f(n) {\n    return -n + floor(1.5)\n}\n[f(P(2).x), not 0, 1 in [1, 2], 3 // 2]"
+        program = parse(text)
+        self.assertEqual("[-1, True, True, 1]", str(frozen.loads(frozen.dumps(program)).run(Context())))
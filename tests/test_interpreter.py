@@ -0,0 +1,340 @@
+import importlib.util
+import math
+import unittest
+from array import array
+from src.cobralang.interpreter.interpreter import Context
+from src.cobralang.interpreter.nodes import Block, StatementBlock
+from src.cobralang.interpreter.datatypes import Integer, Float, String, Boolean, Tuple, Dict, ListView, Range
+from src.cobralang.interpreter.binaryoperations import InConstantSet
+from tests.helpers import parse, run, DirectoryTestCase
+
+
+class TestMathModule(unittest.TestCase):
+    def test_functions_match_python_math(self):
+        for name, value in (("sqrt", 2.0), ("ln", 5.0), ("sin", 1.0), ("cos", 1.0), ("tan", 1.0), ("asin", 0.5), ("acos", 0.5), ("atan", 0.5)):
+            expected = getattr(math, "log" if name == "ln" else name)(value)
+            self.assertAlmostEqual(expected, run(f"import math\n{name}({value})").value, delta=1e-15)
+
+    def test_log_with_base(self):
+        self.assertAlmostEqual(3.0, run("import math\nlog(8, 2)").value, delta=1e-15)
+
+    def test_constants(self):
+        self.assertEqual(math.pi, run("from math import var pi\npi").value)
+        self.assertEqual((1 + math.sqrt(5)) / 2, run("from math import var phi\nphi").value)
+
+    def test_from_import_fn(self):
+        self.assertEqual(3, run("from math import fn (floor, add)\nadd(floor(1.5), 2)").value)
+
+    def test_domain_edge_cases_fall_back_to_complex(self):
+        self.assertEqual(2j, run("import math\nsqrt(-4)").value)
+
+
+@unittest.skipIf(importlib.util.find_spec("numpy") is None, "numpy is not installed")
+class TestArray(unittest.TestCase):
+    def test_elementwise_operators(self):
+        self.assertEqual([3, 5, 7], [i.value for i in run("let a = array([1, 2, 3])\nlist(a * 2 + 1)")])
+        self.assertEqual([9, 8, 7], [i.value for i in run("let a = array([1, 2, 3])\nlist(10 - a)")])
+        self.assertEqual([False, True, True], [i.value for i in run("let a = array([1, 2, 3])\nlist(a >= 2)")])
+
+    def test_reductions(self):
+        self.assertEqual(6, run("sum(array([1, 2, 3]))").value)
+        self.assertEqual(1, run("min(array([3, 1, 2]))").value)
+        self.assertEqual(3, run("max(array([3, 1, 2]))").value)
+        self.assertEqual(2.0, run("mean(array([1, 2, 3]))").value)
+
+    def test_subscript(self):
+        self.assertEqual(2, run("array([1, 2, 3])[1]").value)
+        self.assertEqual([2, 3], [i.value for i in run("list(array([1, 2, 3])[1:])")])
+
+
+class TestCompactList(unittest.TestCase):
+    def test_homogeneous_lists_are_compact(self):
+        self.assertIsInstance(run("[1, 2, 3]").items, array)
+        self.assertIsInstance(run("[1.5, 2.5]").items, array)
+        self.assertIsInstance(run("[True, False]").items, array)
+        self.assertIsInstance(run('[1, "a"]').items, list)
+
+    def test_append_builds_compact_list(self):
+        out = run("let l = []\nappend(l, 1)\nappend(l, 2)\nl")
+        self.assertIsInstance(out.items, array)
+        self.assertEqual([1, 2], [i.value for i in out])
+
+    def test_foreign_value_generalizes(self):
+        out = run('let l = [1, 2]\nappend(l, "a")\nl[0] = 1.5\nl')
+        self.assertIsInstance(out.items, list)
+        self.assertEqual([1.5, 2, "a"], [i.value for i in out])
+
+    def test_elements_are_boxed(self):
+        self.assertIsInstance(run("[1, 2][1]"), Integer)
+        self.assertIsInstance(run("[True][0]"), Boolean)
+        self.assertEqual(True, run("[True][0]").value)
+        self.assertEqual(3, run("let l = [1, 2, 3]\nlen(l)").value)
+
+
+class TestSliceViews(unittest.TestCase):
+    def test_list_slice_is_a_view(self):
+        out = run("let l = [1, 2, 3, 4, 5]\nl[1:4][1:]")
+        self.assertIsInstance(out, ListView)
+        self.assertEqual([3, 4], [i.value for i in out])
+
+    def test_slices_keep_copy_semantics(self):
+        out = run("let l = [1, 2, 3]\nlet v = l[:2]\nl[0] = 9\nv[1] = 7\n(l, v)")
+        self.assertEqual([9, 2, 3], [i.value for i in out.value[0]])
+        self.assertEqual([1, 7], [i.value for i in out.value[1]])
+
+    def test_tuple_and_string_slices(self):
+        self.assertEqual((2, 3), tuple(i.value for i in run("(1, 2, 3)[1:]")))
+        self.assertEqual("wor", run('"hello world"[6:][:3]').value)
+        self.assertEqual(True, run('"hello world"[6:] == "world"').value)
+        self.assertEqual("List", run("type([1, 2][1:])").value)
+
+
+class TestRopeString(unittest.TestCase):
+    def test_concatenation_builds_a_rope(self):
+        out = run('let s = ""\nlet i = 0\nwhile i < 20 {\n    s += "abcdefghij"\n    i += 1\n}\ns')
+        self.assertIsNotNone(out.chunks)
+        self.assertEqual(200, len(out))
+        self.assertEqual("abcdefghij" * 20, out.value)
+        self.assertIsNone(out.chunks)
+
+    def test_shared_prefix_is_not_changed(self):
+        out = run('let s = "' + "a" * 100 + '"\nlet t = s + "b"\nlet u = s + "c"\n(t, u)')
+        self.assertEqual("a" * 100 + "b", out.value[0].value)
+        self.assertEqual("a" * 100 + "c", out.value[1].value)
+
+    def test_string_builder(self):
+        self.assertEqual("ab1", run('let b = string_builder(value="a")\nappend(b, "b")\nappend(b, 1)\nbuild(b)').value)
+
+
+class TestSet(unittest.TestCase):
+    def test_literal_and_membership(self):
+        self.assertEqual(True, run('let s = {1, "a", (1, 2)}\n(1, 2) in s').value)
+        self.assertEqual(False, run('let s = {1, "a"}\n"b" in s').value)
+        self.assertIsInstance(run("{}"), Dict)
+
+    def test_set_builtins(self):
+        out = run("let s = set([1, 1, 2])\nappend(s, 3)\nremove(s, 1)\ns")
+        self.assertEqual({2, 3}, {i.value for i in out})
+
+    def test_constant_membership_is_precomputed(self):
+        program = parse("x in [1, 2, 3]")
+        self.assertIsInstance(program.statements[0], InConstantSet)
+        self.assertEqual(True, run("let x = 2\nx in [1, 2, 3]").value)
+        self.assertEqual(False, run('let x = "2"\nx in [1, 2, 3]').value)
+        self.assertEqual(False, run("let x = [1]\nx in [1, 2, 3]").value)
+
+
+class TestDict(unittest.TestCase):
+    def test_entries_are_keyed_by_native_values(self):
+        out = run('let d = {1: "one", "k": 2, (1, 2): 3}\nd["k"] = 5\nd')
+        self.assertEqual({1: "one", "k": 5, (1, 2): 3}, {k: v.value for k, v in out.entries.items()})
+
+    def test_keys_are_wrapped_on_iteration(self):
+        keys = list(run('{1: 1, "a": 2, 1.5: 3, True: 4, (1, 2): 5}'))
+        self.assertEqual([Integer, String, Float, Tuple], [type(k) for k in keys])
+
+    def test_counter(self):
+        out = run('let counts = {}\nfor w in ["a", "b", "a"] {\n    if w in counts {\n        counts[w] += 1\n    } else {\n        counts[w] = 1\n    }\n}\ncounts')
+        self.assertEqual({"a": 2, "b": 1}, {k: v.value for k, v in out.entries.items()})
+
+
+class TestStruct(unittest.TestCase):
+    def test_construct_and_access(self):
+        out = run("struct Point { x, y }\nlet p = Point(1, y=2)\np.x += 10\n(p.x, p.y, p[\"y\"], type(p))")
+        self.assertEqual((11, 2, 2, "Point"), tuple(i.value for i in out))
+
+    def test_field_assignment_and_equality(self):
+        self.assertEqual(True, run("struct P { a, b }\nlet p = P(1, 2)\np.b = 3\np == P(1, 3)").value)
+
+    def test_field_access_cache_follows_the_struct_type(self):
+        out = run("struct A { x, y }\nstruct B { y, x }\nlet out = []\nfor r in [A(1, 2), B(3, 4)] {\n    append(out, r.x)\n}\nout")
+        self.assertEqual([1, 4], [i.value for i in out])
+
+    def test_errors(self):
+        with self.assertRaises(Exception):
+            run("struct P { a, b }\nP(1)")
+        with self.assertRaises(Exception):
+            run("struct P { a }\nP(1, c=2)")
+        with self.assertRaises(Exception):
+            run("struct P { a }\nP(1).b")
+
+    def test_field_of_a_value_that_is_not_a_record(self):
+        with self.assertRaisesRegex(Exception, "Cannot access field x of List"):
+            run("[1].x")
+        with self.assertRaisesRegex(Exception, "Cannot access field x of Integer"):
+            run("let n = 1\nn.x = 2")
+
+
+class TestIteration(unittest.TestCase):
+    def test_range_is_lazy(self):
+        out = run("range(0, 100000000, 2)")
+        self.assertIsInstance(out, Range)
+        self.assertEqual(50000000, len(out))
+        self.assertEqual((True, False, 4), tuple(i.value for i in run("let r = range(10)\n(3 in r, 10 in r, r[4])")))
+
+    def test_for_over_range(self):
+        self.assertEqual(4950, run("let t = 0\nfor i in range(100) {\n    t += i\n}\nt").value)
+
+    def test_for_over_string_and_dict(self):
+        self.assertEqual(["a", "b"], [i.value for i in run('let out = []\nfor c in "ab" {\n    append(out, c)\n}\nout')])
+        self.assertEqual(["x", "y"], [i.value for i in run('let out = []\nfor k in {"x": 1, "y": 2} {\n    append(out, k)\n}\nout')])
+
+    def test_for_unpacking(self):
+        out = run("let out = []\nfor (a, b) in range(6) {\n    append(out, a * b)\n}\nout")
+        self.assertEqual([0, 6, 20], [i.value for i in out])
+        with self.assertRaises(Exception):
+            run("for (a, b) in range(3) {\n    a\n}")
+
+    def test_non_iterable(self):
+        with self.assertRaises(TypeError):
+            run("for i in 5 {\n    i\n}")
+
+
+class TestGenerator(unittest.TestCase):
+    PIPELINE = "fn evens(source) {\n    for x in source {\n        if x % 2 == 0 {\n            yield x\n        }\n    }\n}\nfn squares(source) {\n    for x in source {\n        yield x * x\n    }\n}\n"
+
+    def test_pipeline(self):
+        self.assertEqual([0, 4, 16, 36, 64], [i.value for i in run(self.PIPELINE + "list(squares(evens(range(10))))")])
+        self.assertEqual(120, run(self.PIPELINE + "sum(squares(evens(range(10))))").value)
+
+    def test_suspends_between_values(self):
+        out = run("let log = []\nfn g() {\n    append(log, 1)\n    yield 1\n    append(log, 2)\n    yield 2\n}\nlet it = g()\n(next(it), len(log))")
+        self.assertEqual((1, 1), tuple(i.value for i in out))
+
+    def test_return_ends_generator(self):
+        self.assertEqual([1], [i.value for i in run("fn g() {\n    yield 1\n    return 0\n    yield 2\n}\nlist(g())")])
+        with self.assertRaises(Exception):
+            run("fn g() {\n    yield 1\n}\nlet it = g()\nnext(it)\nnext(it)")
+
+    def test_yield_outside_function(self):
+        with self.assertRaises(SyntaxError):
+            run("yield 1")
+
+
+class TestTransforms(unittest.TestCase):
+    FUNCTIONS = "fn double(x) {\n    return x * 2\n}\nfn odd(x) {\n    return x % 2 == 1\n}\nfn add(a, b) {\n    return a + b\n}\n"
+
+    def values(self, text):
+        return [i.value for i in run(self.FUNCTIONS + text)]
+
+    def test_map_filter_reduce(self):
+        self.assertEqual([0, 2, 4], self.values("map(double, range(3))"))
+        self.assertEqual([1, 3], self.values("filter(odd, [1, 2, 3])"))
+        self.assertEqual(10, run(self.FUNCTIONS + "reduce(add, range(5))").value)
+        self.assertEqual(7, run(self.FUNCTIONS + "reduce(add, [], initial=7)").value)
+
+    def test_any_all_min_max_zip(self):
+        self.assertEqual([True, False, 1, 3], self.values("[any([1, 2], key=odd), all([1, 2], key=odd), min([3, 1, 2]), max([3, 1, 4], key=odd)]"))
+        self.assertEqual([(1, "a"), (2, "b")], [tuple(j.value for j in i) for i in run('zip([1, 2, 3], "ab")')])
+
+    def test_list_comprehension(self):
+        self.assertEqual([0, 1, 9, 16], self.values("[x * x for x in range(5) if x != 2]"))
+        self.assertEqual([3, 7], self.values("[a + b for (a, b) in [1, 2, 3, 4]]"))
+
+    def test_dict_comprehension(self):
+        out = run('{k: len(k) for k in ["a", "bb"]}')
+        self.assertEqual({"a": 1, "bb": 2}, {k: v.value for k, v in out.entries.items()})
+
+
+class TestLogic(unittest.TestCase):
+    def test_short_circuit(self):
+        self.assertEqual(False, run("let x = [0]\nlet i = 1\ni < len(x) and x[i] == 0").value)
+        self.assertEqual(True, run("let x = []\nlen(x) == 0 or x[0]").value)
+        self.assertEqual(3, run("1 and 2 and 3").value)
+        self.assertEqual("d", run('0 or Null or "d"').value)
+
+    def test_truthiness(self):
+        self.assertEqual([False, True, False, True, True], [i.value for i in run('[bool(0), bool(2), bool(Null), not 0, not ""]')])
+
+    def test_conditional_expression(self):
+        self.assertEqual("big", run('let i = 2\n"big" if i > 1 else "small"').value)
+        self.assertEqual(3, run("1 if False else 2 if False else 3").value)
+        self.assertEqual([0, 1, 0], [i.value for i in run("[a if a % 2 else 0 for a in range(4) if a != 3]")])
+
+    def test_conditional_only_runs_chosen_branch(self):
+        self.assertEqual(1, run("let x = []\n1 if len(x) == 0 else x[0]").value)
+
+    def test_if_statement_after_expression(self):
+        self.assertEqual(2, run("let x = 1\nif x {\n    x = 2\n}\nx").value)
+
+
+class TestScopes(unittest.TestCase):
+    def test_blocks_without_declarations_are_elided(self):
+        program = parse("let i = 0\nwhile i < 3 {\n    i += 1\n}\nif i {\n    let j = i\n}")
+        self.assertIs(StatementBlock, type(program.statements[1].body))
+        self.assertIs(Block, type(program.statements[2].body[0][1]))
+
+    def test_declarations_stay_local(self):
+        with self.assertRaises(KeyError):
+            run("let i = 0\nwhile i < 3 {\n    let j = i\n    i += 1\n}\nj")
+        self.assertEqual(3, run("let i = 0\nwhile i < 3 {\n    let j = i\n    i = j + 1\n}\ni").value)
+
+    def test_scopes_are_reused(self):
+        ctx = Context()
+        run("let i = 0\nwhile i < 100 {\n    let j = i\n    i += 1\n}", ctx)
+        self.assertEqual(1, len(ctx.scopes))
+        self.assertEqual(1, len(ctx.scope_pool))
+
+    def test_generator_scopes_are_not_reused(self):
+        out = run("fn g() {\n    yield x\n}\nfn make() {\n    let x = 1\n    return g()\n}\nlet it = make()\nfn other() {\n    let x = 2\n}\nother()\nnext(it)")
+        self.assertEqual(1, out.value)
+
+
+class TestModules(DirectoryTestCase):
+    MODULE = "let runs = []\nappend(runs, 1)\nfn triple(x) {\n    return x * 3\n}\n"
+
+    def setUp(self):
+        super().setUp()
+        self.write("counter.cb", self.MODULE)
+
+    def test_module_runs_once(self):
+        text = "fn f(x) {\n    from counter import fn triple\n    from counter import var runs\n    append(runs, x)\n    return triple(x)\n}\n"
+        out = run(text + "f(1)\nf(2)\nimport counter\n(triple(3), runs)")
+        self.assertEqual(9, out.value[0].value)
+        self.assertEqual([1, 1, 2], [i.value for i in out.value[1]])
+
+    def test_registry_is_per_context(self):
+        ctx = Context()
+        run("import counter", ctx)
+        self.assertEqual(["counter"], [i.name for i in ctx.modules.values()])
+        self.assertEqual({}, Context().modules)
+
+    def test_reload(self):
+        out = run('from counter import var runs\nappend(runs, 2)\nreload("counter")\nruns')
+        self.assertEqual([1], [i.value for i in out])
+        with self.assertRaises(Exception):
+            run('reload("missing")')
+
+
+class TestSelectiveImport(DirectoryTestCase):
+    MODULE = ("let table = [x * x for x in range(1000)]\nappend(table, -1)\nlet scale = 2\nfn helper(x) {\n    return x * scale\n}\n"
+              "fn uses_table(i) {\n    return table[i]\n}\nfn other() {\n    return 0\n}\nprint(\"side effect\")\n")
+
+    def setUp(self):
+        super().setUp()
+        self.write("lib.cb", self.MODULE)
+
+    def namespace(self, ctx):
+        module, = ctx.modules.values()
+        return module.namespace
+
+    def test_only_reached_statements_run(self):
+        ctx = Context()
+        run("from lib import fn helper", ctx)
+        namespace = self.namespace(ctx)
+        self.assertEqual({"helper"}, set(namespace.functions))
+        self.assertEqual({"scale"}, set(namespace.variables))
+
+    def test_statements_touching_a_needed_variable_run(self):
+        ctx = Context()
+        run("from lib import fn uses_table", ctx)
+        namespace = self.namespace(ctx)
+        self.assertEqual({"uses_table"}, set(namespace.functions))
+        self.assertEqual(-1, namespace.variables["table"][Integer(1000)].value)
+
+    def test_later_imports_run_the_rest_once(self):
+        ctx = Context()
+        run("from lib import fn helper\nfrom lib import var table\nimport lib", ctx)
+        namespace = self.namespace(ctx)
+        self.assertEqual({"helper", "uses_table", "other"}, set(namespace.functions))
+        self.assertEqual(1001, len(namespace.variables["table"]))
@@ -0,0 +1,109 @@
+import tempfile
+import unittest
+from pathlib import Path
+from src.cobralang.interpreter import memo
+from tests.helpers import parse, run
+
+
+class TestMemo(unittest.TestCase):
+    FIB = "fn fib(n) {\n    if n <= 1 {\n        return n\n    }\n    return fib(n - 1) + fib(n - 2)\n}\n"
+
+    def info(self, out):
+        return {k: v.value for k, v in out.entries.items()}
+
+    def test_cache_annotation(self):
+        self.assertEqual(23416728348467685, run("@cache\n" + self.FIB + "fib(80)").value)
+        info = self.info(run("@memo(maxsize=4)\n" + self.FIB + "fib(20)\ncache_info(fib)"))
+        self.assertEqual((4, 4), (info["size"], info["maxsize"]))
+        self.assertGreater(info["evictions"], 0)
+
+    def test_cache_clear(self):
+        info = self.info(run("@cache\n" + self.FIB + "fib(10)\ncache_clear(fib)\ncache_info(fib)"))
+        self.assertEqual((0, 0, 0), (info["size"], info["hits"], info["misses"]))
+
+    def test_arguments_are_keyed_by_type_and_value(self):
+        self.assertEqual([1, 1.0, 2], [i.value for i in run("@cache\nfn f(x) {\n    return x\n}\n[f(1), f(1.0), len(f([1, 2]))]")])
+
+    def test_auto_memo_detects_pure_functions(self):
+        text = self.FIB + "let counter = 0\nfn impure(n) {\n    counter += 1\n    return n\n}\nfn reads_outer(n) {\n    return n + counter\n}\nfn prints(n) {\n    print(n)\n}\nfn calls_pure(n) {\n    return fib(n) + len([n])\n}"
+        program = parse(text, auto_memo=True)
+        cached = {i.function.name for i in program.statements if hasattr(i, "function") and i.function.memo is not None}
+        self.assertEqual({"fib", "calls_pure"}, cached)
+
+    def test_auto_memo_copies_mutable_results(self):
+        text = "fn mk(n) {\n    return ([n], n)\n}\nappend(mk(1)[0], 2)\nlet first = mk(1)\nappend(first[0], 3)\n[first, mk(1)]"
+        self.assertEqual("[([1, 3], 1), ([1], 1)]", str(run(text, auto_memo=True)))
+
+    def test_auto_memo_copies_records(self):
+        text = "struct P { x }\nfn origin() {\n    return P(1)\n}\nlet p = origin()\np.x = 5\norigin().x"
+        self.assertEqual(1, run(text).value)
+        self.assertEqual(1, run(text, auto_memo=True).value)
+
+
+class TestPersistentMemo(unittest.TestCase):
+    SLOW = "@persist\nfn slow(n) {\n    return [n, n * 2]\n}\n"
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.default = memo.persistent_store
+        memo.persistent_store = memo.PersistentStore(Path(self.directory.name).joinpath("memo.sqlite3"), 1024 * 1024)
+
+    def tearDown(self):
+        memo.persistent_store.close()
+        memo.persistent_store = self.default
+        self.directory.cleanup()
+
+    def info(self, out):
+        return {k: v.value for k, v in out.entries.items()}
+
+    def test_results_survive_a_new_parse(self):
+        run(self.SLOW + "slow(3)")
+        out = run(self.SLOW + "let r = slow(3)\n(r, cache_info(slow))")
+        self.assertEqual([3, 6], [i.value for i in out.value[0]])
+        self.assertEqual((1, 0), (self.info(out.value[1])["disk_hits"], self.info(out.value[1])["misses"]))
+
+    def test_changing_the_function_invalidates(self):
+        run(self.SLOW + "slow(3)")
+        out = run("@persist\nfn slow(n) {\n    return [n, n * 3]\n}\nlet r = slow(3)\n(r, cache_info(slow))")
+        self.assertEqual([3, 9], [i.value for i in out.value[0]])
+        self.assertEqual(0, self.info(out.value[1])["disk_hits"])
+
+    def test_parentheses_change_the_digest(self):
+        self.assertEqual(10, run("@persist\nfn f(a, b, c) {\n    return a * b + c\n}\nf(2, 3, 4)").value)
+        out = run("@persist\nfn f(a, b, c) {\n    return a * (b + c)\n}\n(f(2, 3, 4), cache_info(f))")
+        self.assertEqual(14, out.value[0].value)
+        self.assertEqual(0, self.info(out.value[1])["disk_hits"])
+
+    def test_callees_and_globals_change_the_digest(self):
+        text = "let scale = {}\nfn helper(n) {{\n    return n + {}\n}}\n@persist\nfn f(n) {{\n    return helper(n) * scale\n}}\n(f(1), cache_info(f))"
+        self.assertEqual(2, run(text.format(1, 1)).value[0].value)
+        for edited, expected in ((text.format(1, 2), 3), (text.format(2, 1), 4)):
+            out = run(edited)
+            self.assertEqual((expected, 0), (out.value[0].value, self.info(out.value[1])["disk_hits"]))
+        out = run(text.format(1, 1))
+        self.assertEqual((2, 1), (out.value[0].value, self.info(out.value[1])["disk_hits"]))
+
+    def test_eviction_and_clear(self):
+        memo.persistent_store.max_bytes = 400
+        run(self.SLOW + "for i in range(20) {\n    slow(i)\n}")
+        connection = memo.persistent_store.connection
+        self.assertLessEqual(connection.execute("SELECT SUM(size) FROM memo").fetchone()[0], 400)
+        info = self.info(run(self.SLOW + "slow(19)\nslow(0)\ncache_info(slow)"))
+        self.assertEqual((1, 1), (info["disk_hits"], info["misses"]))
+        memo.persistent_store.clear()
+        self.assertEqual(0, connection.execute("SELECT COUNT(*) FROM memo").fetchone()[0])
+
+    def test_hits_are_written_with_the_next_put(self):
+        run(self.SLOW + "slow(1)\nslow(2)")
+        store = memo.persistent_store
+        connection = store.connection
+        size = "SELECT (SELECT total FROM memo_size), (SELECT SUM(size) FROM memo)"
+        total, summed = connection.execute(size).fetchone()
+        self.assertEqual(total, summed)
+        changes = connection.total_changes
+        self.assertEqual(1, self.info(run(self.SLOW + "slow(1)\ncache_info(slow)"))["disk_hits"])
+        self.assertEqual(changes, connection.total_changes)
+        # the hit on slow(1) is written with the put of slow(3), it is now used more recently than slow(2)
+        run(self.SLOW + "slow(3)")
+        used = [row[0] for row in connection.execute("SELECT used FROM memo ORDER BY rowid")]
+        self.assertGreater(used[0], used[1])
@@ -1,6 +1,55 @@
-from unittest import TestCase
+from pathlib import Path
+from unittest import TestCase, mock
 from src.cobralang import parser
 from src.cobralang import lexer
+from tests.helpers import run, DirectoryTestCase
 
 
 # test this stuff
+class TestImportPrefetch(DirectoryTestCase):
+    def tokens(self, text: str):
+        return lexer.Lexer(text, "<stdin>").tokenize()
+
+    def test_import_paths_skip_native_modules(self):
+        paths = parser.import_paths(self.tokens("import math\nimport a\nfrom b import fn f"))
+        self.assertEqual([Path("a.cb").absolute(), Path("b.cb").absolute()], paths)
+
+    def write_graph(self):
+        self.write("a.cb", "import b\nimport c\nimport d\nlet a = 1\n")
+        self.write("b.cb", "import c\nlet b = 2\n")
+        self.write("c.cb", "let c = 3\n")
+        self.write("d.cb", "let d = 4\n")
+
+    def assert_graph_parsed(self):
+        for name in ("a.cb", "b.cb", "c.cb", "d.cb"):
+            path = Path(name).absolute()
+            self.assertIn((str(path), path.stat().st_mtime_ns, False), parser.parsed_modules)
+        self.assertEqual(10, run("import a\na + b + c + d").value)
+
+    def test_whole_graph_is_parsed_before_the_main_parse(self):
+        self.write_graph()
+        parser.prefetch_modules([Path("a.cb").absolute()], max_workers=2)
+        self.assert_graph_parsed()
+
+    def test_small_graphs_are_lexed_without_a_pool(self):
+        self.write_graph()
+        with mock.patch("concurrent.futures.ProcessPoolExecutor", side_effect=AssertionError("pool started")):
+            parser.prefetch_modules([Path("a.cb").absolute()], max_workers=2)
+        self.assert_graph_parsed()
+
+    def test_large_levels_are_lexed_in_a_pool(self):
+        self.write_graph()
+        with mock.patch.object(parser, "parallel_threshold", 0):
+            parser.prefetch_modules([Path("a.cb").absolute()], max_workers=2)
+        self.assert_graph_parsed()
+
+    def test_circular_import_raises(self):
+        self.write("a.cb", "import b\n")
+        self.write("b.cb", "import a\n")
+        with self.assertRaisesRegex(ImportError, "a.cb -> b.cb -> a.cb"):
+            run("import a")
+
+    def test_missing_module_is_reported_by_the_import(self):
+        self.write("a.cb", "import missing\n")
+        with self.assertRaises(FileNotFoundError):
+            run("import a")
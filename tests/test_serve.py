@@ -0,0 +1,120 @@
+import contextlib
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from src.cobralang import cli
+from src.cobralang import serve
+from tests.helpers import DirectoryTestCase
+
+
+class TestServe(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = Path(cls.directory.name, "cobra.sock")
+        cls.server = serve.Server(cls.path, workers=1, timeout=5)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.directory.cleanup()
+
+    def submit(self, **job) -> dict:
+        with serve.Client(self.path) as client:
+            return client.submit(**job)
+
+    def test_source(self):
+        result = self.submit(source='print("hi")\n1 + 2')
+        self.assertEqual((True, "3", "hi\n", None), (result["ok"], result["result"], result["stdout"], result["error"]))
+
+    def test_path_and_imports(self):
+        with tempfile.TemporaryDirectory() as directory:
+            Path(directory, "shapes.cb").write_text("fn area(r) {\n    return 3 * r * r\n}\n")
+            Path(directory, "main.cb").write_text("import shapes\nimport math\nfloor(area(2) / 5)\n")
+            result = self.submit(path=Path(directory, "main.cb"), cwd=directory)
+        self.assertEqual("2", result["result"], result["error"])
+
+    def test_errors(self):
+        result = self.submit(source="missing(1)")
+        self.assertFalse(result["ok"])
+        self.assertIn("missing", result["error"])
+        self.assertEqual("2", self.submit(source="1 + 1")["result"])
+
+    def test_exit_keeps_the_worker(self):
+        workers = set(self.server.pool.workers)
+        result = self.submit(source='print("a")\nexit(3)')
+        self.assertEqual((False, 3, "a\n", None), (result["ok"], result["exit_code"], result["stdout"], result["error"]))
+        self.assertTrue(self.submit(source="exit()")["ok"])
+        self.assertEqual("2", self.submit(source="1 + 1")["result"])
+        self.assertEqual(workers, self.server.pool.workers)
+
+    def test_timeout_replaces_the_worker(self):
+        result = self.submit(source="while True {\n}", timeout=0.5)
+        self.assertEqual((False, "TimeoutError"), (result["ok"], result["error"].split(":")[0]))
+        self.assertEqual("2", self.submit(source="1 + 1")["result"])
+
+    def test_jobs_do_not_share_state(self):
+        with serve.Client(self.path) as client:
+            client.submit(source="let leaked = 1")
+            self.assertFalse(client.submit(source="leaked")["ok"])
+
+    def test_bad_job(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(str(self.path))
+            connection.sendall(b"not json\n")
+            self.assertFalse(json.loads(connection.makefile("rb").readline())["ok"])
+
+    def test_second_server_on_the_same_socket(self):
+        with self.assertRaises(OSError):
+            serve.Server(self.path, workers=1)
+
+    def test_submit(self):
+        output, errors = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+            self.assertEqual(0, cli.main(["submit", "--socket", str(self.path), "-c", 'print("a")\n2']))
+            self.assertEqual(1, cli.main(["submit", "--socket", str(self.path), "-c", "missing()"]))
+            self.assertEqual(3, cli.main(["submit", "--socket", str(self.path), "-c", "exit(3)"]))
+        self.assertEqual("a\n2\n", output.getvalue())
+        self.assertIn("missing", errors.getvalue())
+
+
+class TestServerProcess(DirectoryTestCase):
+    # A server started the way the runner starts it. Its workers import the script again, so they lex every level of
+    # a job's imports in a process pool of two, whatever the machine.
+    SERVER = ("import os\nfrom src.cobralang import cli, parser\nos.cpu_count = lambda: 2\nparser.parallel_threshold = 0\n"
+              "if __name__ == \"__main__\":\n    cli.main([\"serve\", \"--socket\", \"cobra.sock\", \"--workers\", \"1\", \"--timeout\", \"30\"])\n")
+    ROOT = Path(__file__).parent.parent
+
+    def setUp(self):
+        super().setUp()
+        self.write("server.py", self.SERVER)
+        self.server = subprocess.Popen([sys.executable, "server.py"], stdout=subprocess.DEVNULL, env={**os.environ, "PYTHONPATH": str(self.ROOT)})
+        deadline = time.monotonic() + 30
+        while not Path("cobra.sock").exists():
+            self.assertIsNone(self.server.poll(), "the server exited")
+            self.assertLess(time.monotonic(), deadline, "the server didn't start")
+            time.sleep(0.05)
+
+    def tearDown(self):
+        self.server.terminate()
+        self.server.wait(30)
+        super().tearDown()
+
+    def test_imports_prefetched_in_a_pool(self):
+        self.write("a.cb", "let a = 1\n")
+        self.write("b.cb", "let b = 2\n")
+        self.write("main.cb", "import a\nimport b\na + b\n")
+        with serve.Client("cobra.sock") as client:
+            result = client.submit(path="main.cb")
+        self.assertEqual(("3", None), (result["result"], result["error"]))
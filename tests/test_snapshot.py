@@ -0,0 +1,63 @@
+import contextlib
+import io
+from src.cobralang.interpreter.interpreter import Context
+from tests.helpers import run, DirectoryTestCase
+
+
+class TestSnapshot(DirectoryTestCase):
+    PRELUDE = ("import utils\nimport math\nstruct P { x }\nlet table = {\"a\": 1}\nlet xs = [1, 2]\nlet p = P(1)\nlet n = 5\n"
+               "fn helper(x) {\n    return x + n\n}\nlet t = ([1], 2)\nfrom rows import var rows\n")
+
+    def setUp(self):
+        super().setUp()
+        self.write("rows.cb", "let rows = [1]\nlet pair = ([1], 2)\n")
+        self.ctx = Context()
+        run(self.PRELUDE, self.ctx)
+        self.snapshot = self.ctx.snapshot()
+
+    def test_fork_sees_the_prelude(self):
+        self.assertEqual("[6, a-b, 2, 1]", str(run('[helper(1), join("-", ["a", "b"]), floor(2.5), p.x]', self.snapshot.fork())))
+
+    def test_forks_do_not_change_the_snapshot(self):
+        fork = self.snapshot.fork()
+        run('append(xs, 3)\ntable["b"] = 2\np.x = 2\nn = 6\nlet extra = 1', fork)
+        self.assertEqual("[[1, 2, 3], {a: 1, b: 2}, 2, 7]", str(run("[xs, table, p.x, helper(1)]", fork)))
+        other = self.snapshot.fork()
+        self.assertEqual("[[1, 2], {a: 1}, 1, 6]", str(run("[xs, table, p.x, helper(1)]", other)))
+        with self.assertRaises(KeyError):
+            run("extra", other)
+
+    def test_snapshot_is_frozen(self):
+        run("append(xs, 3)\nn = 0", self.ctx)
+        self.assertEqual("[[1, 2], 5]", str(run("[xs, n]", self.snapshot.fork())))
+
+    def test_copied_records_keep_their_struct(self):
+        fork = self.snapshot.fork()
+        self.assertEqual("P", run("p.x = 3\ntype(p)", fork).value)
+        self.assertIs(fork.get_function("P"), self.ctx.get_function("P"))
+
+    def test_values_inside_tuples_are_copied(self):
+        run("append(t[0], 99)", self.snapshot.fork())
+        self.assertEqual("([1], 2)", str(run("t", self.snapshot.fork())))
+        self.assertEqual("([1], 2)", str(run("t", self.ctx)))
+
+    def test_module_namespaces_are_forked(self):
+        fork = self.snapshot.fork()
+        run("from rows import var pair\nappend(pair[0], 5)\nappend(rows, 5)", fork)
+        # rows is the module's list, importing it again gives the fork's copy of it
+        self.assertEqual("[1, 5]", str(run("import rows\nrows", fork)))
+        self.assertEqual("[([1], 2), [1]]", str(run("from rows import var (pair, rows)\n[pair, rows]", self.snapshot.fork())))
+        self.assertEqual("[([1], 2), [1]]", str(run("from rows import var (pair, rows)\n[pair, rows]", self.ctx)))
+
+    def test_fork_names_are_listed_once_in_order(self):
+        fork = self.snapshot.fork()
+        run("n = 6\nlet extra = 1", fork)
+        variables = fork.scopes[0].variables
+        names = list(self.ctx.scopes[0].variables) + ["extra"]
+        self.assertEqual(names, [name for name, _ in variables.items()])
+        self.assertEqual(names, list(variables))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            run("dump(show_funcs=False)", fork)
+        listed = [line.strip().split("=")[0] for line in output.getvalue().splitlines() if "=" in line]
+        self.assertEqual(names, listed[:len(names)])